@@ -0,0 +1,124 @@
+"""Gemini 응답 파서 처리량 벤치마크.
+
+기존 parse_gemini_response (블록마다 re.search 7회) 방식과 quizgen.parser 의 단일 패스 파서를
+수 MB 크기의 합성 응답으로 비교합니다. 저장소 루트에서 실행하세요:
+
+    python benchmarks/bench_parser.py --sizes 1 4 16
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quizgen.parser import BLOOKET_COLUMNS, parse_response  # noqa: E402
+
+BLOCK_TEMPLATE = """[질문시작]
+질문: {n}번 문항 - 다음 중 광합성에 대한 설명으로 옳은 것은 무엇인가요? {pad}
+보기1: 빛에너지를 화학에너지로 전환한다
+보기2: 산소를 흡수하고 이산화탄소를 방출한다
+보기3: 미토콘드리아에서 일어난다
+보기4: 밤에만 일어난다
+정답번호: {answer}
+시간제한: 20
+[질문끝]
+---
+"""
+MALFORMED_BLOCK = """[질문시작]
+질문: 보기가 누락된 문항
+보기1: 하나
+정답번호: 5
+[질문끝]
+---
+"""
+
+
+def legacy_parse(response_text, default_time_limit):
+    """변경 전 parse_gemini_response 와 같은 알고리즘 (st.warning 호출만 제거)."""
+    quiz_items = []
+    if not response_text:
+        return quiz_items
+    question_blocks = re.findall(r"\[질문시작\](.*?)\[질문끝\]", response_text, re.DOTALL)
+    question_number_counter = 1
+    for block in question_blocks:
+        block = block.strip()
+        item = {
+            BLOOKET_COLUMNS[0]: question_number_counter,
+            BLOOKET_COLUMNS[1]: "",
+            BLOOKET_COLUMNS[2]: "",
+            BLOOKET_COLUMNS[3]: "",
+            BLOOKET_COLUMNS[4]: "",
+            BLOOKET_COLUMNS[5]: "",
+            BLOOKET_COLUMNS[7]: "",
+            BLOOKET_COLUMNS[6]: default_time_limit
+        }
+        q_match = re.search(r"질문:\s*(.+)", block)
+        o1_match = re.search(r"보기1:\s*(.+)", block)
+        o2_match = re.search(r"보기2:\s*(.+)", block)
+        o3_match = re.search(r"보기3:\s*(.+)", block)
+        o4_match = re.search(r"보기4:\s*(.+)", block)
+        ans_num_match = re.search(r"정답번호:\s*([1-4])", block)
+        time_match = re.search(r"시간제한:\s*(\d+)", block)
+        if q_match: item[BLOOKET_COLUMNS[1]] = q_match.group(1).strip()
+        if o1_match: item[BLOOKET_COLUMNS[2]] = o1_match.group(1).strip()
+        if o2_match: item[BLOOKET_COLUMNS[3]] = o2_match.group(1).strip()
+        if o3_match: item[BLOOKET_COLUMNS[4]] = o3_match.group(1).strip()
+        if o4_match: item[BLOOKET_COLUMNS[5]] = o4_match.group(1).strip()
+        item[BLOOKET_COLUMNS[7]] = int(ans_num_match.group(1)) if ans_num_match else ""
+        if time_match:
+            item[BLOOKET_COLUMNS[6]] = int(time_match.group(1))
+        if all(item[col] != "" for col in BLOOKET_COLUMNS[1:6]) and isinstance(item[BLOOKET_COLUMNS[7]], int):
+            quiz_items.append(item)
+            question_number_counter += 1
+    return quiz_items
+
+
+def make_response(target_mb, malformed_ratio=0.05, seed=0):
+    """target_mb 크기 이상의 합성 응답 텍스트를 만듭니다 (일부 블록은 의도적으로 잘못된 형식)."""
+    rng = random.Random(seed)
+    parts, size, n = [], 0, 0
+    target = int(target_mb * 1024 * 1024)
+    while size < target:
+        if rng.random() < malformed_ratio:
+            block = MALFORMED_BLOCK
+        else:
+            n += 1
+            block = BLOCK_TEMPLATE.format(n=n, answer=rng.randint(1, 4), pad="설명 " * rng.randint(0, 20))
+        parts.append(block)
+        size += len(block.encode("utf-8"))
+    return "".join(parts)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="합성 응답 크기 (MB)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'MB':>6} {'blocks':>8} {'legacy s':>10} {'new s':>10} {'legacy MB/s':>12} {'new MB/s':>10} {'speedup':>8}")
+    for size_mb in args.sizes:
+        text = make_response(size_mb)
+        actual_mb = len(text.encode("utf-8")) / (1024 * 1024)
+        legacy_time, legacy_items = best_of(lambda: legacy_parse(text, 20), args.repeat)
+        new_time, result = best_of(lambda: parse_response(text, 20), args.repeat)
+        if legacy_items != result.items:
+            raise SystemExit("결과 불일치: 두 파서가 서로 다른 문항을 반환했습니다.")
+        print(f"{actual_mb:6.1f} {result.blocks_seen:8d} {legacy_time:10.3f} {new_time:10.3f} "
+              f"{actual_mb / legacy_time:12.1f} {actual_mb / new_time:10.1f} {legacy_time / new_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
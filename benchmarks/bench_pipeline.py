@@ -0,0 +1,188 @@
+"""오프라인 파이프라인 벤치마크 (Gemini 키, 외부 네트워크 불필요).
+
+합성 PDF / 웹사이트 / 유튜브 자막을 1~1000 페이지 규모로 만들어
+추출 → 전처리 → 생성(로컬 대체 모델) → 파싱 → CSV/XLSX 변환을 끝까지 실행하고,
+단계별 시간(quizgen.metrics), 처리량, 최대 메모리(tracemalloc)를 결과 JSON 파일로 저장합니다.
+저장소 루트에서 실행하세요:
+
+    python benchmarks/bench_pipeline.py --pages 1 10 100 1000
+    python benchmarks/bench_pipeline.py --kinds pdf --latency 0.2 --malformed 0.1 --output before.json
+    python benchmarks/bench_pipeline.py --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import FakeModel, fake_transcripts, make_pdf, make_pdf_pages, make_site, make_transcript, serve_site  # noqa: E402
+from quizgen.export import convert_to_blooket_csv, convert_to_blooket_xlsx  # noqa: E402
+from quizgen.extractors import extract_text_from_pdf, extract_text_from_websites, get_youtube_transcript  # noqa: E402
+from quizgen.generation import generate_quiz_chunked  # noqa: E402
+from quizgen.metrics import get_metrics  # noqa: E402
+from quizgen.parser import parse_response  # noqa: E402
+from quizgen.preprocess import preprocess_context  # noqa: E402
+
+KINDS = ("pdf", "html", "transcript")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- 1. 추출 (종류별) ---
+def extract_pdf(page_count):
+    data = make_pdf(make_pdf_pages(page_count))
+    return len(data), lambda: extract_text_from_pdf(data)
+
+
+def extract_html(page_count):
+    site = make_site(page_count)
+    size = sum(len(html.encode("utf-8")) for html in site.values())
+
+    def run():
+        with serve_site(site) as base_url:
+            return extract_text_from_websites([base_url], follow_links_depth=1, max_pages=page_count + 1)
+    return size, run
+
+
+def extract_transcript(page_count):
+    segments = make_transcript(page_count)
+    size = sum(len(s["text"].encode("utf-8")) for s in segments)
+
+    def run():
+        with fake_transcripts(segments):
+            return get_youtube_transcript("https://www.youtube.com/watch?v=benchmark01")
+    return size, run
+
+
+EXTRACTORS = {"pdf": extract_pdf, "html": extract_html, "transcript": extract_transcript}
+
+
+# --- 2. 시나리오 실행 ---
+def run_scenario(kind, page_count, model, args):
+    input_bytes, extract = EXTRACTORS[kind](page_count)
+    metrics = get_metrics()
+    metrics.reset()
+    if args.memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    text = extract()
+    if text and not args.no_preprocess:
+        text, _ = preprocess_context(text, token_budget=args.context_tokens or None,
+                                     remove_filler_words=kind == "transcript")
+    raw_output = generate_quiz_chunked(model, text or "", args.num_questions, 20, "선택 안 함", "전체 (선택 안 함)",
+                                       max_workers=args.model_workers)
+    result = parse_response(raw_output, 20)
+    convert_to_blooket_csv(result.items)
+    convert_to_blooket_xlsx(result.items)
+
+    wall = time.perf_counter() - started
+    peak = None
+    if args.memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    stages = {
+        stage: {"count": s["count"], "sum_ms": s["sum_ms"], "p95_ms": s["p95_ms"], "failures": s["failures"]}
+        for stage, s in metrics.snapshot()["stages"].items()
+    }
+    return {
+        "kind": kind, "pages": page_count, "input_bytes": input_bytes, "text_chars": len(text or ""),
+        "questions": len(result.items), "skipped_blocks": len(result.diagnostics),
+        "wall_sec": round(wall, 4), "pages_per_sec": round(page_count / wall, 2),
+        "input_mb_per_sec": round(input_bytes / (1024 * 1024) / wall, 3),
+        "peak_mb": round(peak / (1024 * 1024), 2) if peak is not None else None,
+        "stages": stages,
+    }
+
+
+def print_header():
+    print(f"{'kind':<11} {'pages':>6} {'wall s':>8} {'pages/s':>9} {'MB/s':>7} {'peak MB':>8} {'Q':>4}  stages (ms)")
+
+
+def print_results(results):
+    for r in results:
+        stages = ", ".join(f"{name} {s['sum_ms']:.0f}" for name, s in r["stages"].items())
+        peak = f"{r['peak_mb']:8.1f}" if r["peak_mb"] is not None else f"{'-':>8}"
+        print(f"{r['kind']:<11} {r['pages']:6d} {r['wall_sec']:8.3f} {r['pages_per_sec']:9.1f} "
+              f"{r['input_mb_per_sec']:7.2f} {peak} {r['questions']:4d}  {stages}")
+
+
+# --- 3. 결과 비교 ---
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old_path} ({old['revision']}) → {new_path} ({new['revision']})")
+    old_by_key = {(r["kind"], r["pages"]): r for r in old["results"]}
+    print(f"{'kind':<11} {'pages':>6} {'stage':<20} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for r in new["results"]:
+        before = old_by_key.get((r["kind"], r["pages"]))
+        if before is None:
+            continue
+        rows = [("(전체)", before["wall_sec"] * 1000, r["wall_sec"] * 1000)]
+        rows += [(stage, before["stages"][stage]["sum_ms"], s["sum_ms"])
+                 for stage, s in r["stages"].items() if stage in before["stages"]]
+        for stage, old_ms, new_ms in rows:
+            ratio = new_ms / old_ms if old_ms else float("nan")
+            print(f"{r['kind']:<11} {r['pages']:6d} {stage:<20} {old_ms:10.1f} {new_ms:10.1f} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000], help="합성 입력 규모 (페이지 수)")
+    parser.add_argument("--num-questions", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="대체 모델 호출당 지연(초)")
+    parser.add_argument("--latency-per-question", type=float, default=0.0, help="대체 모델 문항당 추가 지연(초)")
+    parser.add_argument("--padding-words", type=int, default=0, help="질문마다 덧붙일 단어 수 (응답 크기)")
+    parser.add_argument("--malformed", type=float, default=0.05, help="잘못된 형식 블록 비율")
+    parser.add_argument("--model-workers", type=int, default=4)
+    parser.add_argument("--context-tokens", type=int, default=0, help="전처리 토큰 예산 (0: 제한 없음)")
+    parser.add_argument("--no-preprocess", action="store_true")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="tracemalloc 측정 생략 (시간 측정 오차 감소)")
+    parser.add_argument("--output", help=f"결과 JSON 경로 (기본값: {RESULTS_DIR}/<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일의 단계별 시간 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    model = FakeModel(latency=args.latency, latency_per_question=args.latency_per_question,
+                      padding_words=args.padding_words, malformed_ratio=args.malformed)
+    results = []
+    print_header()
+    for kind in args.kinds:
+        for page_count in args.pages:
+            results.append(run_scenario(kind, page_count, model, args))
+            print_results(results[-1:])
+
+    revision = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    report = {
+        "revision": revision, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "options": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "model_calls": model.calls, "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""앱 시작(콜드 스타트) 벤치마크 (Gemini 키, 외부 네트워크 불필요).
+
+입력 방식마다 새 파이썬 프로세스에서
+- streamlit / quizgen 모듈을 가져오는 시간
+- 첫 화면을 그리는 시간 (streamlit.testing AppTest, 가짜 API 키)
+- 해당 입력 방식으로 바꾼 뒤 다시 그리는 시간
+- 그때까지 실제로 불러온 무거운 라이브러리 목록
+을 측정합니다. 저장소 루트에서 실행하세요:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "blooket.py")
+INPUT_MODES = ('텍스트 직접 입력', 'PDF 파일 업로드', '유튜브 URL', '웹사이트 URL')
+HEAVY_MODULES = ("pandas", "numpy", "PyPDF2", "bs4", "openpyxl", "google.generativeai", "google.api_core",
+                 "youtube_transcript_api")
+QUIZGEN_MODULES = ("quizgen.cache", "quizgen.chunking", "quizgen.parser", "quizgen.extractors", "quizgen.generation",
+                   "quizgen.export", "quizgen.metrics", "quizgen.pdf_pages", "quizgen.preprocess",
+                   "quizgen.response_cache", "quizgen.scheduler")
+
+
+# --- 1. 측정 (자식 프로세스) ---
+def measure(input_mode):
+    """현재 프로세스에서 한 입력 방식의 시작 시간을 측정해 dict 로 반환합니다."""
+    import importlib
+    import warnings
+    warnings.filterwarnings("ignore")
+    sys.path.insert(0, ROOT)
+
+    started = time.perf_counter()
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+    streamlit_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for name in QUIZGEN_MODULES:
+        importlib.import_module(name)
+    quizgen_ms = (time.perf_counter() - started) * 1000
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.secrets["GEMINI_API_KEY"] = "startup-benchmark"
+    started = time.perf_counter()
+    app.run()
+    first_render_ms = (time.perf_counter() - started) * 1000
+
+    mode_render_ms = 0.0
+    if input_mode != INPUT_MODES[0]:
+        started = time.perf_counter()
+        app.radio(key="input_type_radio").set_value(input_mode).run()
+        mode_render_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "mode": input_mode,
+        "streamlit_import_ms": round(streamlit_ms, 1),
+        "quizgen_import_ms": round(quizgen_ms, 1),
+        "first_render_ms": round(first_render_ms, 1),
+        "mode_render_ms": round(mode_render_ms, 1),
+        "exceptions": [str(e.value) for e in app.exception],
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def run_child(input_mode):
+    """새 프로세스에서 measure 를 실행해 결과를 받아옵니다 (모듈 캐시가 없는 콜드 스타트)."""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", input_mode],
+                               capture_output=True, text=True, cwd=ROOT, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# --- 2. 집계 ---
+def summarize(runs):
+    """반복 측정값을 항목별 중앙값으로 줄입니다."""
+    summary = dict(runs[-1])
+    for field in ("streamlit_import_ms", "quizgen_import_ms", "first_render_ms", "mode_render_ms"):
+        summary[field] = round(statistics.median(r[field] for r in runs), 1)
+    return summary
+
+
+def print_results(results):
+    print(f"{'mode':<12} {'streamlit':>10} {'quizgen':>9} {'1st render':>11} {'mode render':>12}  heavy modules")
+    for r in results:
+        print(f"{r['mode']:<12} {r['streamlit_import_ms']:10.1f} {r['quizgen_import_ms']:9.1f} "
+              f"{r['first_render_ms']:11.1f} {r['mode_render_ms']:12.1f}  {', '.join(r['heavy_modules']) or '-'}")
+        for error in r["exceptions"]:
+            print(f"  ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=INPUT_MODES, default=list(INPUT_MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="입력 방식별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child), ensure_ascii=False))
+        return
+
+    results = [summarize([run_child(mode) for _ in range(max(1, args.repeat))]) for mode in args.modes]
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+                       "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
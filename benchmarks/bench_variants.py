@@ -0,0 +1,100 @@
+"""여러 수준 변형 생성 벤치마크 (Gemini 키, 외부 네트워크 불필요).
+
+같은 합성 콘텐츠로 난이도 × 학년 변형을 만들 때
+- repeat: 변형마다 generate_for_source 를 따로 실행 (변형마다 전처리, 콘텐츠 전체 전송)
+- variants: generate_variants 한 번 (전처리 한 번, 로컬 컨텍스트 캐시, 변형 동시 실행)
+의 실행 시간, 모델 호출 수, 모델에 보낸 추정 토큰 수를 비교합니다. 로컬 컨텍스트 캐시는 콘텐츠를 매번 보내므로
+variants 의 토큰 수는 Gemini 컨텍스트 캐시였다면 보내지 않았을 토큰(simulated_saved_tokens)을 뺀 값입니다. 응답 캐시와 퀴즈 보관함은 사용하지 않습니다.
+저장소 루트에서 실행하세요:
+
+    python benchmarks/bench_variants.py
+    python benchmarks/bench_variants.py --paragraphs 400 --latency 0.5 --output variants.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ["BLOOKET_RESPONSE_CACHE_PATH"] = ""
+os.environ["BLOOKET_QUIZ_BANK_PATH"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import KOREAN_WORDS, FakeModel, sentence  # noqa: E402
+from quizgen.chunking import estimate_tokens  # noqa: E402
+from quizgen.context_cache import LocalContextCache  # noqa: E402
+from quizgen.metrics import get_metrics  # noqa: E402
+from quizgen.pipeline import build_options, build_variants, generate_for_source, generate_variants  # noqa: E402
+from quizgen.scheduler import with_scheduler  # noqa: E402
+
+
+class CountingModel(FakeModel):
+    """FakeModel 에 전달된 프롬프트의 추정 토큰 수를 합산합니다."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompt_tokens = 0
+        self._count_lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._count_lock:
+            self.prompt_tokens += estimate_tokens(prompt)
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+def make_text(paragraphs, seed=0):
+    rng = random.Random(seed)
+    return "\n\n".join(" ".join(sentence(rng, KOREAN_WORDS, 12) for _ in range(4)) for _ in range(paragraphs))
+
+
+def run_repeat(text, variants, options, args):
+    model = CountingModel(latency=args.latency)
+    started = time.perf_counter()
+    for variant in variants:
+        generate_for_source(with_scheduler(model), text, dict(options, **variant))
+    return {"mode": "repeat", "seconds": round(time.perf_counter() - started, 3), "calls": model.calls,
+            "prompt_tokens": model.prompt_tokens}
+
+
+def run_variants(text, variants, options, args):
+    model = CountingModel(latency=args.latency)
+    get_metrics().reset()
+    started = time.perf_counter()
+    generate_variants(model, text, variants, options, context_cache=LocalContextCache())
+    seconds = time.perf_counter() - started
+    saved = get_metrics().snapshot()["counters"].get("context_cache.simulated_saved_tokens", 0)
+    return {"mode": "variants", "seconds": round(seconds, 3), "calls": model.calls,
+            "prompt_tokens": model.prompt_tokens - saved}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=100, help="합성 콘텐츠 문단 수")
+    parser.add_argument("--difficulties", nargs="+", default=["쉬움", "보통", "어려움"])
+    parser.add_argument("--grade-levels", nargs="+", default=["중학교 1학년", "고등학교 1학년"])
+    parser.add_argument("--num-questions", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="대체 모델 호출당 지연(초)")
+    parser.add_argument("--model-workers", type=int, default=4)
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    text = make_text(args.paragraphs)
+    variants = build_variants(args.difficulties, args.grade_levels, args.num_questions)
+    options = build_options(args.num_questions, chunked=False, model_workers=args.model_workers)
+    results = [run_repeat(text, variants, options, args), run_variants(text, variants, options, args)]
+
+    print(f"콘텐츠 추정 토큰 {estimate_tokens(text):,} · 변형 {len(variants)}개")
+    print(f"{'mode':<10} {'seconds':>8} {'calls':>6} {'prompt tokens':>14}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['seconds']:8.3f} {r['calls']:6d} {r['prompt_tokens']:14,d}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "options": vars(args), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
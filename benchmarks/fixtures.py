@@ -0,0 +1,272 @@
+"""오프라인 벤치마크용 합성 입력과 로컬 대체 모델.
+
+Gemini API 키나 외부 네트워크 없이 파이프라인 전체를 실행할 수 있도록
+- FakeModel: 지연 시간, 응답 크기, 잘못된 형식 블록 비율을 설정할 수 있는 generate_content 대체 모델
+- make_pdf: 텍스트 레이어가 있는 N페이지 PDF (표준 라이브러리만 사용)
+- serve_site: N개 문서 페이지로 링크된 사이트를 127.0.0.1 에서 제공하는 로컬 HTTP 서버
+- FakeTranscriptProvider / fake_transcripts: youtube-transcript-api 대신 합성 자막을 돌려주는 자막 제공자
+을 제공합니다.
+"""
+import http.server
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+WORDS = (
+    "photosynthesis chlorophyll energy glucose oxygen carbon dioxide water plant cell reaction enzyme "
+    "membrane nucleus protein gene evolution species ecosystem climate energy transfer respiration"
+).split()
+KOREAN_WORDS = "광합성 엽록체 빛에너지 포도당 산소 이산화탄소 물 식물 세포 반응 효소 세포막 단백질 유전자 생태계".split()
+
+_QUESTION_COUNT_RE = re.compile(r"객관식 퀴즈 (\d+)개")
+_BLOCK = """[질문시작]
+질문: {n}번 문항 - {topic}에 대한 설명으로 옳은 것은 무엇인가요? {pad}
+보기1: {options[0]}
+보기2: {options[1]}
+보기3: {options[2]}
+보기4: {options[3]}
+정답번호: {answer}
+시간제한: 20
+[질문끝]
+---
+"""
+_MALFORMED_BLOCK = """[질문시작]
+질문: 보기가 누락된 문항
+보기1: 하나
+정답번호: 5
+[질문끝]
+---
+"""
+
+
+def sentence(rng, words=WORDS, length=14):
+    return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+
+# --- 1. 대체 모델 ---
+class FakeResponse:
+    """Gemini 응답처럼 .text 를 제공하고, 스트리밍 응답처럼 조각 단위로 반복할 수 있습니다."""
+
+    def __init__(self, text, chunk_chars=64, chunk_delay=0.0):
+        self.text = text
+        self._chunk_chars = chunk_chars
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        for i in range(0, len(self.text), self._chunk_chars):
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield FakeResponse(self.text[i:i + self._chunk_chars])
+
+
+class FakeModel:
+    """프롬프트가 요청한 문항 수만큼 퀴즈 블록을 돌려주는 로컬 모델.
+
+    latency: 호출당 지연(초), latency_per_question: 문항당 추가 지연(초),
+    padding_words: 질문 하나에 덧붙일 단어 수(응답 크기), malformed_ratio: 잘못된 형식 블록 비율
+    """
+
+    def __init__(self, latency=0.05, latency_per_question=0.0, padding_words=0, malformed_ratio=0.0, seed=0,
+                 model_name="fake-model"):
+        self.latency = latency
+        self.latency_per_question = latency_per_question
+        self.padding_words = padding_words
+        self.malformed_ratio = malformed_ratio
+        self.model_name = model_name
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def build_response(self, num_questions):
+        with self._lock:
+            self.calls += 1
+            blocks = []
+            for n in range(1, num_questions + 1):
+                if self._rng.random() < self.malformed_ratio:
+                    blocks.append(_MALFORMED_BLOCK)
+                else:
+                    pad = " ".join(self._rng.choice(KOREAN_WORDS) for _ in range(self.padding_words))
+                    # 문항마다 주제와 보기를 달리 해 비슷한 문항 제외(quizgen.dedupe)에 걸리지 않도록 함
+                    topic = " ".join(self._rng.sample(KOREAN_WORDS, 3))
+                    options = [" ".join(self._rng.sample(KOREAN_WORDS, 4)) for _ in range(4)]
+                    blocks.append(_BLOCK.format(n=n, topic=topic, options=options, pad=pad, answer=self._rng.randint(1, 4)))
+        return "".join(blocks)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        match = _QUESTION_COUNT_RE.search(prompt)
+        num_questions = int(match.group(1)) if match else 5
+        delay = self.latency + self.latency_per_question * num_questions
+        text = self.build_response(num_questions)
+        if stream:
+            chunks = max(1, len(text) // 64)
+            return FakeResponse(text, chunk_delay=delay / chunks)
+        time.sleep(delay)
+        return FakeResponse(text)
+
+
+# --- 2. PDF ---
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """페이지별 텍스트(ASCII) 목록으로 최소한의 PDF 바이트를 만듭니다."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_id = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>")
+        lines = " T* ".join(f"({_pdf_escape(line)})Tj" for line in text.split("\n"))
+        stream = f"BT /F1 10 Tf 12 TL 56 740 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def make_pdf_pages(page_count, lines_per_page=40, seed=0):
+    """머리말, 쪽 번호, 본문 줄로 이루어진 교과서 형태의 페이지 텍스트 목록."""
+    rng = random.Random(seed)
+    pages = []
+    for page in range(1, page_count + 1):
+        body = [sentence(rng) for _ in range(lines_per_page)]
+        pages.append("\n".join(["Biology Textbook - Chapter 3"] + body + [f"- {page} -"]))
+    return pages
+
+
+# --- 3. 웹사이트 ---
+def make_site(page_count, paragraphs_per_page=12, seed=0):
+    """경로 → HTML. "/" 는 모든 문서 페이지로 링크된 목차이며, 각 페이지에는 반복되는 메뉴/꼬리말이 있습니다."""
+    rng = random.Random(seed)
+    nav = "<nav><a href='/'>Home</a> <a href='/about'>About this site and its many sections</a></nav>"
+    footer = "<footer><p>Copyright Example School Science Department, all rights reserved</p></footer>"
+    links = "".join(f"<li><a href='/p{i}'>Lesson {i}</a></li>" for i in range(1, page_count + 1))
+    site = {"/": f"<html><body>{nav}<main><h1>Lessons index page for biology</h1><ul>{links}</ul></main>{footer}</body></html>"}
+    for i in range(1, page_count + 1):
+        paragraphs = "".join(f"<p>{sentence(rng, length=40)}</p>" for _ in range(paragraphs_per_page))
+        site[f"/p{i}"] = (f"<html><head><meta charset='utf-8'></head><body>{nav}<article><h2>Lesson {i} on cell biology topics</h2>"
+                          f"{paragraphs}</article>{footer}</body></html>")
+    return site
+
+
+@contextmanager
+def serve_site(site):
+    """site(경로 → HTML)를 127.0.0.1 의 임의 포트로 제공하고 기본 URL을 넘겨줍니다."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = site.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --- 4. 유튜브 자막 ---
+def make_transcript(page_count, segments_per_page=40, seed=0):
+    """자막 조각 목록 ({"text", "start", "duration"}). 한 "페이지"는 segments_per_page 조각입니다."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    for i in range(page_count * segments_per_page):
+        text = sentence(rng, KOREAN_WORDS, length=8)
+        if i % 15 == 0:
+            text = "[음악] " + text
+        segments.append({"text": text, "start": round(start, 2), "duration": 3.5})
+        start += 3.5
+    return segments
+
+
+class FakeTranscriptProvider:
+    """quizgen.transcripts 의 자막 제공자 대체 구현.
+
+    transcripts: 비디오 ID → 자막 조각 목록 (없는 ID 는 default 사용), failing: 목록 조회가 실패하는 비디오 ID,
+    latency: 호출당 지연(초). 목록/자막 호출 수를 list_calls, fetch_calls 에 집계합니다.
+    """
+
+    def __init__(self, transcripts=None, default=None, failing=(), latency=0.0, language_code="ko"):
+        self.transcripts = dict(transcripts or {})
+        self.default = default
+        self.failing = set(failing)
+        self.latency = latency
+        self.language_code = language_code
+        self.list_calls = 0
+        self.fetch_calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def list_transcripts(self, video_id):
+        self._call("list_calls")
+        if video_id in self.failing:
+            raise RuntimeError(f"transcripts unavailable for {video_id}")
+        if self.transcripts.get(video_id, self.default) is None:
+            return []
+        return [{"language_code": self.language_code, "language": "Korean", "is_generated": False}]
+
+    def fetch(self, video_id, language_code, is_generated):
+        self._call("fetch_calls")
+        return list(self.transcripts.get(video_id, self.default))
+
+
+@contextmanager
+def fake_transcripts(segments=None, provider=None):
+    """quizgen.transcripts 의 자막 제공자를 대체 구현(기본값: 모든 영상에 segments 를 돌려줌)으로 바꿉니다.
+
+    반복 측정이 캐시에 적중하지 않도록 그동안 자막 목록/조각 캐시도 빈 메모리 캐시로 바꿉니다.
+    """
+    from quizgen import transcripts
+    from quizgen.cache import TwoTierCache
+
+    provider = provider or FakeTranscriptProvider(default=segments)
+    cache = TwoTierCache()
+    previous = transcripts.set_transcript_provider(provider)
+    try:
+        with mock.patch.object(transcripts, "get_extraction_cache", lambda: cache):
+            yield provider
+    finally:
+        transcripts.set_transcript_provider(previous)
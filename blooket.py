@@ -1,351 +1,176 @@
 import streamlit as st
-import google.generativeai as genai
-import PyPDF2 # PDF 텍스트 추출
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, CouldNotRetrieveTranscript # 유튜브 스크립트 관련 예외
-import pandas as pd # CSV/XLSX 처리
-import io # 파일 다운로드를 위한 버퍼
-import re # Gemini 응답 파싱을 위한 정규 표현식
+import re # 파일 이름 정리
 import datetime # Copyright 연도 표시용
-from io import BytesIO # XLSX 파일 생성을 위한 BytesIO
-import requests # 웹사이트 콘텐츠 요청
-from bs4 import BeautifulSoup # HTML 파싱
-
-# --- Blooket CSV/XLSX 컬럼 정의 ---
-BLOOKET_COLUMNS = [
-    "Question #",
-    "Question Text",
-    "Answer 1",
-    "Answer 2",
-    "Answer 3",
-    "Answer 4",
-    "Time Limit (sec)",
-    "Correct Answer(s)"
-]
+import logging # quizgen 모듈 메시지를 화면에 표시
+import json # 처리 시간 지표 내보내기
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from quizgen.cache import get_extraction_cache, pdf_cache_key, youtube_cache_key, website_cache_key # 추출 결과 캐시
+from quizgen.context_cache import get_context_cache # 여러 변형이 같은 콘텐츠를 한 번만 보냄
+from quizgen.parser import BLOOKET_COLUMNS, format_diagnostic # Gemini 응답 파서 (Blooket 컬럼 정의 포함)
+from quizgen.extractors import extract_text_from_pdf, resolve_youtube_video_id, get_youtube_transcript, extract_text_from_youtube_videos, extract_text_from_website, extract_text_from_websites
+from quizgen.jobs import DONE, FAILED, STATUS_LABELS, generate_quiz_job, generate_variants_job, get_job_manager # 백그라운드 생성 작업
+from quizgen.generation import DEFAULT_MODEL_NAME, DIFFICULTY_OPTIONS, GRADE_LEVEL_OPTIONS, configure_model
+from quizgen.export import EXPORT_MIME_TYPES, build_base_filename, build_quiz_bundle, get_export
+from quizgen.metrics import get_metrics # 단계별 처리 시간 집계
+from quizgen.pdf_pages import normalize_page_ranges # PDF 페이지 범위 선택
+from quizgen.pipeline import build_options, build_variants, generate_for_source, generate_variants, save_to_quiz_bank, save_variants # 생성 경로, 작업 옵션, 여러 수준 변형
+from quizgen.quiz_bank import format_summary, get_quiz_bank, source_hash # 생성한 퀴즈 보관함
+from quizgen.response_cache import with_response_cache # Gemini 응답 영구 캐시
+from quizgen.scheduler import get_scheduler, with_scheduler # 세션 공유 호출 한도, 재시도, 동일 요청 합치기
+
+# --- 분할 생성 설정 ---
+CHUNK_TOKEN_BUDGET = 8000 # 한 번의 호출에 보낼 콘텐츠의 최대 추정 토큰 수
+MAX_PARALLEL_MODEL_CALLS = 4 # 분할 생성 시 동시에 보낼 최대 Gemini 호출 수
+JOB_POLL_SECONDS = 2 # 백그라운드 작업 상태를 다시 확인하는 간격
+
+# --- quizgen 로그를 Streamlit 메시지로 표시 ---
+class StreamlitMessageHandler(logging.Handler):
+    """quizgen 모듈이 남긴 로그를 현재 세션 화면에 st.error/st.warning/st.info 로 표시합니다.
+
+    스크립트 실행 컨텍스트가 없는 작업 스레드의 로그는 화면에 표시하지 않습니다.
+    """
+    def emit(self, record):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return
+        message = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            st.error(message)
+        elif record.levelno >= logging.WARNING:
+            st.warning(message)
+        else:
+            st.info(message)
+
+@st.cache_resource
+def install_streamlit_message_handler():
+    """프로세스당 한 번만 핸들러를 등록합니다 (스크립트 재실행마다 중복 등록 방지)."""
+    quizgen_logger = logging.getLogger("quizgen")
+    quizgen_logger.setLevel(logging.INFO)
+    handler = StreamlitMessageHandler(level=logging.INFO)
+    quizgen_logger.addHandler(handler)
+    return handler
+
+install_streamlit_message_handler()
 
 # --- Gemini API 설정 ---
+@st.cache_resource(show_spinner=False)
+def load_gemini_model(api_key, model_name=DEFAULT_MODEL_NAME):
+    """Gemini 클라이언트를 프로세스당 한 번만 만듭니다 (google.generativeai 는 첫 생성 때 가져옴)."""
+    return configure_model(api_key, model_name)
+
 try:
     gemini_api_key = st.secrets.get("GEMINI_API_KEY")
     if not gemini_api_key:
         st.error("Gemini API 키가 secrets.toml 파일에 설정되지 않았습니다. 확인해주세요.")
         st.stop()
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash-latest" # 또는 다른 원하는 모델
-    )
 except AttributeError:
     st.error("Streamlit 버전이 낮아 st.secrets를 지원하지 않을 수 있습니다. 또는 secrets.toml 파일 경로를 확인해주세요.")
     st.stop()
-except Exception as e:
-    st.error(f"Gemini API 설정 중 오류가 발생했습니다: {e}")
-    st.stop()
 
-# --- 1. 콘텐츠 추출 함수 ---
-def extract_text_from_pdf(uploaded_file):
-    text = ""
+def load_base_model():
+    """캐시된 Gemini 클라이언트 (설정 오류는 화면에 표시하고 중단)."""
     try:
-        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            text += page.extract_text() or ""
+        return load_gemini_model(gemini_api_key)
     except Exception as e:
-        st.error(f"PDF 텍스트 추출 중 오류 발생: {e}")
-        return None
-    return text
+        st.error(f"Gemini API 설정 중 오류가 발생했습니다: {e}")
+        st.stop()
 
-def get_youtube_transcript(youtube_url):
-    video_id = None
-    try:
-        # 다양한 유튜브 URL 형식에서 비디오 ID 추출
-        # 일반적인 watch, shorts, youtu.be, embed 형식
-        patterns = [
-            r"(?:v=|\/embed\/|\/shorts\/|youtu\.be\/)([a-zA-Z0-9_-]{11})",
-        ]
-        # googleusercontent.com 형식 추가 (주의: 이 형식은 불안정할 수 있음)
-        # 예시: youtube.com/watch?v=/VIDEO_ID
-        # 예시: youtu.be//VIDEO_ID
-        # 예시: youtube.com/shorts//VIDEO_ID (shorts와 유사)
-        # youtube.com/watch?v=5 (watch?v= 와 유사)
-        
-        # googleusercontent URL 패턴들
-        # youtube.com/watch?v=/VIDEO_ID
-        # youtu.be//VIDEO_ID
-        # youtube.com/shorts//VIDEO_ID (shorts)
-        # youtube.com/watch?v=5?v=VIDEO_ID (watch)
-        # googleusercontent.com/youtube.com/3 (embed) - 이 경우는 /embed/VIDEO_ID 로 변환 후 위 패턴으로 잡힐 수 있음
-        # googleusercontent.com/youtube.com//VIDEO_ID (youtu.be)
-        
-        if "googleusercontent.com/youtube.com/" in youtube_url:
-            if "/0/" in youtube_url or "/1/" in youtube_url or "/2/" in youtube_url or "/5/" in youtube_url:
-                # .../youtube.com/X/VIDEO_ID... 형태
-                match = re.search(r"\/youtube\.com\/[0125]\/([a-zA-Z0-9_-]{11})", youtube_url)
-                if match:
-                    video_id = match.group(1)
-            elif "/3?" in youtube_url: # .../youtube.com/3?v=VIDEO_ID... 형태
-                match = re.search(r"v=([a-zA-Z0-9_-]{11})", youtube_url)
-                if match:
-                    video_id = match.group(1)
-            elif "/4/" in youtube_url: # .../youtube.com/4/VIDEO_ID... (embed)
-                 match = re.search(r"\/youtube\.com\/4\/([a-zA-Z0-9_-]{11})", youtube_url)
-                 if match:
-                    video_id = match.group(1)
-
-        if not video_id: # 일반적인 URL 패턴 검사
-            for pattern in patterns:
-                match = re.search(pattern, youtube_url)
-                if match:
-                    video_id = match.group(1)
-                    break
-        
-        if not video_id:
-            st.error(f"입력하신 URL에서 유튜브 비디오 ID를 추출할 수 없습니다: {youtube_url}")
-            return None
-
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        transcript_data = None
-        # 선호하는 언어 순서: 한국어, 영어
-        preferred_languages = ['ko', 'en']
-        
-        # 수동 스크립트 먼저 시도
-        for lang in preferred_languages:
-            try:
-                transcript = transcript_list.find_manually_created_transcript([lang])
-                transcript_data = transcript.fetch()
-                st.info(f"'{lang}' 언어의 수동 생성 스크립트를 사용합니다 (비디오 ID: {video_id}).")
-                break
-            except NoTranscriptFound:
-                continue
-        
-        # 수동 스크립트 없으면 자동 생성 스크립트 시도
-        if not transcript_data:
-            for lang in preferred_languages:
-                try:
-                    transcript = transcript_list.find_generated_transcript([lang])
-                    transcript_data = transcript.fetch()
-                    st.info(f"'{lang}' 언어의 자동 생성 스크립트를 사용합니다 (비디오 ID: {video_id}).")
-                    break
-                except NoTranscriptFound:
-                    continue
-
-        # 그래도 없으면 사용 가능한 첫 번째 스크립트 시도
-        if not transcript_data:
-            st.warning(f"'{video_id}' 영상에 대해 선호하는 언어(한국어, 영어)의 스크립트를 찾을 수 없습니다. 사용 가능한 첫 번째 스크립트를 시도합니다.")
-            available_transcripts = list(transcript_list)
-            if available_transcripts:
-                transcript_to_fetch = available_transcripts[0]
-                transcript_data = transcript_to_fetch.fetch()
-                st.info(f"'{transcript_to_fetch.language}' 언어 스크립트를 사용합니다 (비디오 ID: {video_id}).")
-            else:
-                st.error(f"'{video_id}' 영상에 사용 가능한 스크립트가 전혀 없습니다.")
-                return None
-
-        if not transcript_data: # 최종적으로 스크립트 데이터를 얻지 못한 경우
-            st.error(f"'{video_id}' 영상에서 스크립트를 가져올 수 없습니다.")
-            return None
-
-        return " ".join([item['text'] for item in transcript_data])
-
-    except TranscriptsDisabled:
-        st.error(f"해당 영상(ID: {video_id or '알 수 없음'})의 스크립트가 비활성화되어 있습니다.")
-        return None
-    except NoTranscriptFound: # 이 예외는 위에서 처리되지만, 만약을 위해 남겨둠
-        st.error(f"해당 영상(ID: {video_id or '알 수 없음'})에서 요청한 언어의 스크립트를 찾을 수 없습니다.")
-        return None
-    except CouldNotRetrieveTranscript as e:
-        st.error(f"스크립트를 가져오는 중 오류가 발생했습니다 (ID: {video_id or '알 수 없음'}). 유튜브 응답에 문제가 있을 수 있습니다. 오류: {e}")
-        return None
-    except Exception as e:
-        if "no element found" in str(e).lower() or "Unexpected status code 400" in str(e):
-            st.error(f"유튜브 스크립트 데이터 파싱 또는 요청 중 오류 발생 (ID: {video_id or '알 수 없음'}). 영상의 스크립트 데이터가 비어있거나, 형식이 잘못되었거나, 접근이 차단되었을 수 있습니다. 다른 영상을 시도해보세요. (오류: {e})")
-        else:
-            st.error(f"유튜브 스크립트 추출 중 예상치 못한 오류 발생 (ID: {video_id or '알 수 없음'}): {e}")
-        print(f"Error fetching transcript for {youtube_url} (video_id: {video_id}): {e}")
-        import traceback
-        print(traceback.format_exc())
-        return None
-
-def extract_text_from_website(url):
-    """웹사이트 URL에서 텍스트 콘텐츠를 추출합니다."""
-    text = ""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        for element in soup(['script', 'style', 'nav', 'footer', 'aside', 'header', 'form', 'button', 'iframe', 'img', 'a']): # a, img 태그도 내용 추출에서 제외
-            element.decompose()
-        
-        main_content = soup.find('article') or soup.find('main') or soup.find('body')
-        
-        if main_content:
-            # p, div, span 및 제목 태그에서 텍스트 추출 개선
-            text_elements = main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'caption', 'blockquote', 'q', 'pre']) # div, span 제외하고 구체적인 태그 명시
-            text_parts = []
-            for element in text_elements:
-                # 클래스 기반 필터링 (예: 광고, 댓글 영역 제외) - 필요시 추가
-                # if 'ad' in element.get('class', []) or 'comment' in element.get('class', []):
-                #    continue
-                paragraph_text = element.get_text(separator=' ', strip=True)
-                if paragraph_text and len(paragraph_text.split()) > 3: # 너무 짧은 텍스트는 제외 (단어 3개 이상)
-                    text_parts.append(paragraph_text)
-            text = "\n\n".join(text_parts) # 문단 구분을 명확히 하기 위해 \n\n 사용
-        else:
-            text = soup.get_text(separator='\n', strip=True) # 전체 텍스트 추출 시 줄바꿈 기준으로
+def load_generation_model(refresh=False):
+    """캐시된 Gemini 클라이언트를 응답 캐시와 공유 스케줄러로 감쌉니다."""
+    # 캐시 적중은 호출 한도를 차지하지 않도록 응답 캐시를 스케줄러 바깥에 둠
+    return with_response_cache(with_scheduler(load_base_model()), refresh=refresh)
 
-        if not text.strip():
-            st.warning(f"웹사이트에서 유의미한 텍스트 콘텐츠를 추출하지 못했습니다. 페이지 구조를 확인해주세요: {url}")
-            return None
+# --- Gemini 응답 파싱 결과 표시 (실패한 블록은 화면에 경고 표시) ---
+def show_parse_result(result, response_text):
+    for diagnostic in result.diagnostics:
+        st.warning(format_diagnostic(diagnostic))
+    if not result.items and response_text:
+        st.warning("Gemini 응답에서 유효한 퀴즈 형식을 찾지 못했습니다. Gemini 원본 응답을 확인해주세요.")
+    return result.items
 
-    except requests.exceptions.RequestException as e:
-        st.error(f"웹사이트 콘텐츠 요청 중 오류 발생: {e}")
-        return None
-    except Exception as e:
-        st.error(f"웹사이트 텍스트 추출 중 오류 발생: {e}")
-        return None
-    return text
-
-
-# --- 2. Gemini API로 퀴즈 생성 함수 ---
-def generate_quiz_with_gemini(context, num_questions, default_time_limit, difficulty, grade_level):
-    difficulty_instruction = ""
-    if difficulty == "쉬움":
-        difficulty_instruction = "질문과 보기는 명확하고 이해하기 쉽게 작성해주세요. 기본적인 내용을 확인하는 질문 위주로 생성해주세요."
-    elif difficulty == "보통":
-        difficulty_instruction = "질문은 내용에 대한 이해를 바탕으로 약간의 추론이나 분석을 요구할 수 있습니다. 너무 단순하거나 너무 복잡하지 않은 중간 수준의 질문을 생성해주세요."
-    elif difficulty == "어려움":
-        difficulty_instruction = "질문은 내용에 대한 깊이 있는 이해와 비판적 사고, 복합적인 분석 능력을 요구해야 합니다. 여러 정보를 종합하거나 숨겨진 의미를 파악해야 하는 질문을 생성해주세요."
-
-    grade_level_instruction = f"대상 학년 수준은 '{grade_level}'입니다. 해당 수준의 어휘와 배경지식을 고려하여 질문과 보기를 작성해주세요."
-    if grade_level == "전체 (선택 안 함)":
-        grade_level_instruction = "대상은 일반적인 수준의 사용자입니다. 특정 학년에 치우치지 않는 보편적인 어휘와 내용을 사용해주세요."
-
-
-    prompt = f"""
-    당신은 Blooket 게임용 퀴즈를 만드는 전문가입니다. 다음 내용을 바탕으로 객관식 퀴즈 {num_questions}개를 만들어 주세요.
-    각 퀴즈는 다음 형식을 반드시 따라야 하며, 각 항목은 다음 줄로 구분해주세요:
-
-    [질문시작]
-    질문: [여기에 질문 내용]
-    보기1: [여기에 첫 번째 보기]
-    보기2: [여기에 두 번째 보기]
-    보기3: [여기에 세 번째 보기]
-    보기4: [여기에 네 번째 보기]
-    정답번호: [1, 2, 3, 또는 4 중 하나]
-    시간제한: {default_time_limit}
-    [질문끝]
-
-    ---
-    [중요 규칙]
-    1. "정답번호:" 다음에는 반드시 1, 2, 3, 4 중 하나의 숫자만 적어주세요. 이 숫자는 정답에 해당하는 보기의 번호입니다.
-    2. 각 퀴즈는 "[질문시작]"으로 시작하고 "[질문끝]"으로 끝나야 합니다.
-    3. 퀴즈와 퀴즈 사이에는 "---" 구분선을 넣어주세요. (마지막 퀴즈 뒤에는 넣지 않아도 됩니다.)
-    4. 모든 질문의 "시간제한:"은 {default_time_limit}초로 고정해주세요.
-    5. 보기는 서로 다른 내용이어야 합니다.
-    6. 제공된 내용과 관련된 질문과 보기만 생성해주세요.
-
-    [퀴즈 내용 지침]
-    - 제공된 내용의 **핵심 개념, 주요 아이디어, 중요한 사실, 인물, 사건, 용어의 정의, 핵심 표현**을 중심으로 질문을 만들어주세요.
-    - 학습자가 **반드시 알아야 할 내용**이나 **이해도를 평가할 수 있는 내용**을 질문으로 만들어주세요.
-    - 내용의 **의미를 이해하고 적용하는 능력**을 평가할 수 있는 질문을 포함해주세요.
-    - **단순히 페이지 번호, 문서의 특정 위치, 목차, 또는 매우 지엽적이거나 사소한 세부 정보에 대한 질문은 반드시 피해주세요.**
-    - 질문은 내용에 대한 **깊이 있는 이해**를 요구해야 하며, 단순 암기나 표면적인 정보 확인에 그쳐서는 안 됩니다.
-    - 예를 들어, "3페이지의 주요 내용은 무엇인가요?" 같은 질문 대신, "이 문서에서 설명하는 [핵심 개념]의 주요 특징은 무엇인가요?" 또는 "[주요 사건]이 발생한 근본적인 원인은 무엇이라고 설명하고 있나요?" 와 같이 구체적이고 심층적인 질문을 생성해주세요.
-
-    [난이도 및 학년 수준 지침]
-    - {grade_level_instruction}
-    - {difficulty_instruction}
-    ---
-
-    내용:
-    {context}
-    """
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        st.error(f"Gemini API 호출 중 오류 발생: {e}")
-        return None
-
-# --- 3. Gemini 응답 파싱 함수 ---
-def parse_gemini_response(response_text, default_time_limit):
-    quiz_items = []
-    if not response_text:
-        return quiz_items
-    question_blocks = re.findall(r"\[질문시작\](.*?)\[질문끝\]", response_text, re.DOTALL)
-    question_number_counter = 1
-
-    for block in question_blocks:
-        block = block.strip()
-        item = {
-            BLOOKET_COLUMNS[0]: question_number_counter, # "Question #"
-            BLOOKET_COLUMNS[1]: "", # "Question Text"
-            BLOOKET_COLUMNS[2]: "", # "Answer 1"
-            BLOOKET_COLUMNS[3]: "", # "Answer 2"
-            BLOOKET_COLUMNS[4]: "", # "Answer 3"
-            BLOOKET_COLUMNS[5]: "", # "Answer 4"
-            BLOOKET_COLUMNS[7]: "", # "Correct Answer(s)" (정답 번호)
-            BLOOKET_COLUMNS[6]: default_time_limit  # "Time Limit (sec)"
-        }
-
-        try:
-            q_match = re.search(r"질문:\s*(.+)", block)
-            o1_match = re.search(r"보기1:\s*(.+)", block)
-            o2_match = re.search(r"보기2:\s*(.+)", block)
-            o3_match = re.search(r"보기3:\s*(.+)", block)
-            o4_match = re.search(r"보기4:\s*(.+)", block)
-            ans_num_match = re.search(r"정답번호:\s*([1-4])", block)
-            time_match = re.search(r"시간제한:\s*(\d+)", block)
-
-            if q_match: item[BLOOKET_COLUMNS[1]] = q_match.group(1).strip()
-            if o1_match: item[BLOOKET_COLUMNS[2]] = o1_match.group(1).strip()
-            if o2_match: item[BLOOKET_COLUMNS[3]] = o2_match.group(1).strip()
-            if o3_match: item[BLOOKET_COLUMNS[4]] = o3_match.group(1).strip()
-            if o4_match: item[BLOOKET_COLUMNS[5]] = o4_match.group(1).strip()
-
-            correct_answer_number = ""
-            if ans_num_match:
-                correct_answer_number = int(ans_num_match.group(1).strip())
-            item[BLOOKET_COLUMNS[7]] = correct_answer_number
-
-            if time_match:
-                item[BLOOKET_COLUMNS[6]] = int(time_match.group(1).strip())
-
-            if all(item[col] != "" for col in [BLOOKET_COLUMNS[1], BLOOKET_COLUMNS[2], BLOOKET_COLUMNS[3], BLOOKET_COLUMNS[4], BLOOKET_COLUMNS[5]]) and \
-               isinstance(item[BLOOKET_COLUMNS[7]], int) and \
-               1 <= item[BLOOKET_COLUMNS[7]] <= 4:
-                quiz_items.append(item)
-                question_number_counter += 1
-            else:
-                st.warning(f"다음 퀴즈 블록 파싱 실패 또는 필수 정보 누락/정답 번호 오류 (내부 번호 {question_number_counter} 건너뜀):\n{block[:150]}...")
-        except Exception as e:
-            st.warning(f"퀴즈 블록 파싱 중 오류 발생 (내부 번호 {question_number_counter} 건너뜀): {e}\n블록 내용: {block[:150]}...")
-            continue
+# --- 생성 결과 유지 (세션 상태) ---
+SOURCE_KINDS = {'텍스트 직접 입력': "text", 'PDF 파일 업로드': "pdf", '유튜브 URL': "youtube", '웹사이트 URL': "website"}
 
-    if not quiz_items and response_text:
-        st.warning("Gemini 응답에서 유효한 퀴즈 형식을 찾지 못했습니다. Gemini 원본 응답을 확인해주세요.")
-    return quiz_items
-
-# --- 4. 파일 변환 함수 ---
-def convert_to_blooket_csv(quiz_data_list):
-    if not quiz_data_list:
-        return None
-    df = pd.DataFrame(quiz_data_list, columns=BLOOKET_COLUMNS)
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
-    return csv_buffer.getvalue()
-
-def convert_to_blooket_xlsx(quiz_data_list):
-    if not quiz_data_list:
-        return None
-    df = pd.DataFrame(quiz_data_list, columns=BLOOKET_COLUMNS)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Blooket Quiz')
-    return output.getvalue()
+def remember_quiz_result(quiz_items, raw_output, base_filename, quiz_id=None):
+    """생성하거나 보관함에서 불러온 퀴즈를 세션 상태에 보관합니다 (다시 실행되어도 미리보기/다운로드 유지)."""
+    remember_quiz_results([{"items": quiz_items, "raw_output": raw_output, "base_filename": base_filename, "quiz_id": quiz_id}])
+
+def remember_quiz_results(results):
+    """여러 수준 변형처럼 퀴즈 세트 여러 개를 한꺼번에 보관합니다 (각 dict 에 화면 표시용 label 이 있을 수 있음)."""
+    st.session_state["quiz_results"] = [dict(result, items=list(result["items"])) for result in results]
+
+def show_quiz_result(result, key_prefix="", show_guide=True):
+    """퀴즈 미리보기와 다운로드 버튼을 표시합니다. 파일은 다운로드 버튼을 누를 때만 만들고, 같은 퀴즈는 캐시된 결과를 재사용합니다.
+
+    세트 여러 개를 한 화면에 표시할 때는 key_prefix 로 위젯 키를 구분합니다.
+    """
+    quiz_for_export = result["items"]
+    final_base_filename = result["base_filename"]
+    st.subheader(f"📊 {result.get('label') or '생성된 퀴즈'} 미리보기")
+    if result["quiz_id"] is not None:
+        st.caption(f"📚 퀴즈 보관함 #{result['quiz_id']} 에 저장되어 있습니다.")
+    st.dataframe(quiz_for_export, use_container_width=True)
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.download_button(
+            label="📥 CSV 파일 다운로드 (.csv)",
+            data=lambda: get_export(quiz_for_export, "csv"),
+            file_name=f"{final_base_filename}.csv",
+            mime=EXPORT_MIME_TYPES["csv"],
+            on_click="ignore",
+            use_container_width=True,
+            key=f"{key_prefix}csv_download_button"
+        )
+
+    with col2:
+        st.download_button(
+            label="📥 XLSX 파일 다운로드 (.xlsx)",
+            data=lambda: get_export(quiz_for_export, "xlsx"),
+            file_name=f"{final_base_filename}.xlsx",
+            mime=EXPORT_MIME_TYPES["xlsx"],
+            on_click="ignore",
+            use_container_width=True,
+            key=f"{key_prefix}xlsx_download_button"
+        )
+
+    with col3:
+        st.download_button(
+            label="📦 CSV+XLSX 묶음 (.zip)",
+            data=lambda: build_quiz_bundle([(final_base_filename, quiz_for_export)]),
+            file_name=f"{final_base_filename}.zip",
+            mime=EXPORT_MIME_TYPES["zip"],
+            on_click="ignore",
+            use_container_width=True,
+            key=f"{key_prefix}zip_download_button"
+        )
+
+    with st.expander("🤖 Gemini API 응답 원본 보기", expanded=False):
+        st.text_area("API Response:", value=result["raw_output"], height=200, key=f"{key_prefix}quiz_result_raw_output_area")
+
+    if show_guide:
+        show_import_guide()
+
+def show_import_guide():
+    st.info(f"""
+    **다운로드된 파일 사용법:**
+    1. Blooket 웹사이트에 로그인합니다.
+    2. 'Create' 또는 'My Sets'로 이동하여 새 퀴즈 세트를 만듭니다.
+    3. 'Create Method'에서 'CSV Import' 또는 유사한 옵션을 선택합니다.
+    4. 다운로드한 CSV 또는 XLSX 파일을 업로드합니다.
+    5. Blooket의 컬럼명과 파일의 컬럼명을 **정확히** 매칭시킵니다.
+       (예: 파일의 "{BLOOKET_COLUMNS[1]}" -> Blooket의 "Question", 파일의 "{BLOOKET_COLUMNS[7]}" -> Blooket의 정답 번호 입력 필드)
+       파일의 "{BLOOKET_COLUMNS[0]}" ({BLOOKET_COLUMNS[0]})은 Blooket에서 순서 확인용으로 사용하거나 무시될 수 있습니다.
+    6. 퀴즈 세트 생성을 완료합니다!
+    """)
+
+# --- 백그라운드 작업 (새로고침 후에도 주소의 작업 id 로 다시 연결) ---
+job_manager = get_job_manager()
+if "job_ids" not in st.session_state:
+    st.session_state["job_ids"] = [job_id for job_id in st.query_params.get("jobs", "").split(",") if job_manager.get(job_id)]
+
+def remember_job(job_id):
+    st.session_state["job_ids"].append(job_id)
+    st.query_params["jobs"] = ",".join(st.session_state["job_ids"])
 
 # --- Streamlit UI 구성 ---
 st.set_page_config(page_title="Blooket 퀴즈 생성기", layout="wide", initial_sidebar_state="expanded")
@@ -364,24 +189,129 @@ with st.sidebar:
     st.header("2. 퀴즈 생성 옵션")
     num_questions = st.number_input("생성할 질문 수:", min_value=1, max_value=30, value=5, step=1, key="num_q_input")
     default_time_limit = st.number_input("질문 당 기본 시간 제한 (초):", min_value=5, max_value=300, value=20, step=5, key="time_limit_input")
+    use_chunked_generation = st.checkbox(
+        "긴 콘텐츠는 나누어 병렬 생성",
+        value=True,
+        key="chunked_generation_checkbox",
+        help="콘텐츠가 길면 여러 구간으로 나누어 문항을 고르게 배분하고 동시에 생성합니다."
+    )
+    use_streaming = st.checkbox(
+        "문항별 실시간 미리보기 (스트리밍)",
+        value=True,
+        key="streaming_checkbox",
+        help="응답을 기다리지 않고 문항이 완성되는 대로 미리보기에 표시합니다. 나누어 생성하는 긴 콘텐츠에는 적용되지 않습니다."
+    )
+    use_preprocessing = st.checkbox(
+        "콘텐츠 정리 (반복/상용구 제거)",
+        value=True,
+        key="preprocess_checkbox",
+        help="반복되는 머리말·꼬리말·쪽 번호, 메뉴 문구, 거의 같은 문단을 Gemini에 보내기 전에 제거합니다."
+    )
+    context_token_budget = st.number_input(
+        "최대 콘텐츠 토큰 수 (0: 제한 없음):", min_value=0, max_value=1000000, value=0, step=1000,
+        key="context_token_budget_input", disabled=not use_preprocessing,
+        help="콘텐츠가 이보다 길면 전체 내용과 관련도가 높은 문단만 남깁니다."
+    )
+    use_top_up = st.checkbox(
+        "부족한 문항 자동 보충",
+        value=True,
+        key="top_up_checkbox",
+        help="형식 오류로 빠진 문항이 있으면 전체를 다시 만들지 않고 부족한 개수만 추가로 요청합니다."
+    )
+    use_dedupe = st.checkbox(
+        "비슷한 문항 제외",
+        value=True,
+        key="dedupe_checkbox",
+        help="표현만 바꾼 거의 같은 문항을 한 세트에서 빼고, 퀴즈 보관함의 기존 퀴즈와 비슷한 문항이 있으면 알려줍니다."
+    )
+    drop_bank_duplicates = st.checkbox(
+        "보관함에 이미 있는 비슷한 문항도 제외",
+        value=False,
+        key="drop_bank_duplicates_checkbox", disabled=not use_dedupe,
+        help="여러 자료로 퀴즈를 만들 때 이전 퀴즈와 겹치는 문항을 빼고 새 문항으로 채웁니다 (부족한 문항 자동 보충 사용 시)."
+    )
+    force_regenerate = st.checkbox(
+        "강제 재생성 (저장된 응답 사용 안 함)",
+        value=False,
+        key="force_regenerate_checkbox",
+        help="같은 콘텐츠와 옵션으로 이미 생성한 적이 있으면 저장된 응답을 즉시 재사용합니다. 새 문항이 필요하면 선택하세요."
+    )
 
     st.markdown("---")
     st.header("3. 수준 설정 (선택 사항)")
-    difficulty_options = ["선택 안 함", "쉬움", "보통", "어려움"]
+    difficulty_options = DIFFICULTY_OPTIONS
     difficulty = st.selectbox("문항 난이도:", difficulty_options, index=0, key="difficulty_select")
 
-    grade_level_options = [
-        "전체 (선택 안 함)",
-        "초등학교 1-2학년", "초등학교 3-4학년", "초등학교 5-6학년",
-        "중학교 1학년", "중학교 2학년", "중학교 3학년",
-        "고등학교 1학년", "고등학교 2학년", "고등학교 3학년",
-        "대학생", "일반 성인"
-    ]
+    grade_level_options = GRADE_LEVEL_OPTIONS
     grade_level = st.selectbox("대상 학년/수준:", grade_level_options, index=0, key="grade_level_select")
+    with st.expander("🎚️ 여러 수준 한 번에 만들기"):
+        variant_difficulties = st.multiselect("난이도 (여러 개 선택):", difficulty_options[1:], key="variant_difficulty_multiselect")
+        variant_grade_levels = st.multiselect("학년/수준 (여러 개 선택):", grade_level_options[1:], key="variant_grade_multiselect")
+        variants = build_variants(variant_difficulties or [difficulty], variant_grade_levels or [grade_level], num_questions)
+        if len(variants) > 1:
+            st.caption(f"난이도 × 학년 조합 {len(variants)}개 세트를 만듭니다. 콘텐츠는 한 번만 정리해 모든 세트가 함께 사용하고, 세트별 요청은 동시에 보냅니다.")
+        else:
+            st.caption("두 개 이상의 조합을 선택하면 같은 콘텐츠로 수준별 세트를 한꺼번에 만듭니다. 선택하지 않은 항목은 위 설정을 사용합니다.")
+
+    st.markdown("---")
+    with st.expander("⚙️ 추출 캐시 상태"):
+        cache_stats = get_extraction_cache().stats_snapshot()
+        st.caption(
+            f"메모리 적중 {cache_stats['memory_hits']}회 · 디스크 적중 {cache_stats['disk_hits']}회 · "
+            f"미스 {cache_stats['misses']}회 (적중률 {cache_stats['hit_rate']:.0%})"
+        )
+        st.caption(f"메모리 항목 {cache_stats['memory_entries']}개 (약 {cache_stats['memory_bytes'] / 1024:,.0f}KB)")
+    with st.expander("🚦 Gemini 호출 대기열"):
+        scheduler_stats = get_scheduler().stats_snapshot()
+        st.caption(f"대기 {scheduler_stats['waiting']}개 · 처리 중 {scheduler_stats['in_flight']}개")
+        st.caption(
+            f"완료 {scheduler_stats['completed']}회 · 실패 {scheduler_stats['failed']}회 · 재시도 {scheduler_stats['retries']}회 · "
+            f"동일 요청 합침 {scheduler_stats['coalesced']}회"
+        )
+        job_stats = job_manager.stats()
+        st.caption(f"백그라운드 작업: 대기 {job_stats['queued']}개 · 실행 중 {job_stats['running']}개 · 완료 {job_stats['done']}개")
+    with st.expander("📈 단계별 처리 시간"):
+        metrics_registry = get_metrics()
+        metrics_snapshot = metrics_registry.snapshot()
+        if metrics_snapshot["stages"]:
+            st.dataframe([
+                {"단계": stage, "호출": stats["count"], "실패": stats["failures"], "캐시 적중": stats["cache_hits"],
+                 "p50(ms)": stats["p50_ms"], "p95(ms)": stats["p95_ms"]}
+                for stage, stats in metrics_snapshot["stages"].items()
+            ], hide_index=True, use_container_width=True)
+            st.download_button("📥 지표 JSON", data=json.dumps(metrics_snapshot, ensure_ascii=False, indent=2),
+                               file_name="blooket_metrics.json", mime="application/json", key="metrics_json_download")
+            st.download_button("📥 Prometheus 형식", data=metrics_registry.render_prometheus(),
+                               file_name="blooket_metrics.prom", mime="text/plain", key="metrics_prom_download")
+        else:
+            st.caption("아직 기록된 처리 시간이 없습니다.")
+    quiz_bank = get_quiz_bank()
+    if quiz_bank is not None:
+        with st.expander("📚 퀴즈 보관함"):
+            bank_query = st.text_input("질문 검색:", key="quiz_bank_search_input", placeholder="예: 광합성")
+            bank_grade_level = st.selectbox("학년/수준:", GRADE_LEVEL_OPTIONS, index=0, key="quiz_bank_grade_select")
+            bank_difficulty = st.selectbox("난이도:", DIFFICULTY_OPTIONS, index=0, key="quiz_bank_difficulty_select")
+            saved_quizzes = quiz_bank.search(
+                bank_query,
+                grade_level=bank_grade_level if bank_grade_level != GRADE_LEVEL_OPTIONS[0] else None,
+                difficulty=bank_difficulty if bank_difficulty != DIFFICULTY_OPTIONS[0] else None,
+                limit=20,
+            )
+            if saved_quizzes:
+                selected_quiz = st.selectbox("저장된 퀴즈:", saved_quizzes, format_func=format_summary, key="quiz_bank_select")
+                if st.button("📂 불러오기", key="quiz_bank_load_button", use_container_width=True):
+                    saved_quiz = quiz_bank.get(selected_quiz["id"])
+                    if saved_quiz:
+                        remember_quiz_result(saved_quiz["items"], saved_quiz["raw_output"],
+                                             saved_quiz["title"] or f"blooket_quiz_{saved_quiz['id']}", saved_quiz["id"])
+            else:
+                st.caption("조건에 맞는 저장된 퀴즈가 없습니다.")
 
 
 source_content = None
+source_label = None # 퀴즈 보관함에 기록할 파일 이름 / URL
 uploaded_file_name_prefix = "blooket_quiz"
+extraction_cache = get_extraction_cache() # 스크립트 재실행 간 공유되는 추출 결과 캐시
 
 if input_type == '텍스트 직접 입력':
     st.subheader("텍스트 직접 입력")
@@ -390,11 +320,27 @@ if input_type == '텍스트 직접 입력':
 elif input_type == 'PDF 파일 업로드':
     st.subheader("PDF 파일 업로드")
     uploaded_file = st.file_uploader("퀴즈를 생성할 PDF 파일을 선택하세요.", type="pdf", key="pdf_uploader_widget")
+    pdf_page_ranges = st.text_input("추출할 페이지 범위 (선택 사항):", key="pdf_page_range_input", placeholder="예: 1-20, 35, 40- (비워두면 전체 페이지)")
+    try:
+        normalized_page_ranges = normalize_page_ranges(pdf_page_ranges)
+    except ValueError as e:
+        st.error(f"{e} (예: 1-20, 35, 40-)")
+        uploaded_file = None
     if uploaded_file:
         with st.spinner(f"'{uploaded_file.name}' 파일에서 텍스트를 추출하는 중..."):
-            source_content = extract_text_from_pdf(uploaded_file)
+            pdf_progress = st.progress(0, text="PDF 페이지 텍스트 추출 중...")
+
+            def show_pdf_progress(done, total):
+                pdf_progress.progress(done / total, text=f"PDF 페이지 텍스트 추출 중... ({done}/{total}페이지)")
+
+            source_content = extraction_cache.get_or_compute(
+                pdf_cache_key(uploaded_file.getvalue(), normalized_page_ranges),
+                lambda: extract_text_from_pdf(uploaded_file, page_ranges=normalized_page_ranges, on_progress=show_pdf_progress)
+            )
+            pdf_progress.empty()
             if source_content:
                  uploaded_file_name_prefix = uploaded_file.name.split('.')[0].replace(" ", "_") + "_quiz"
+                 source_label = uploaded_file.name
         if source_content:
             st.success(f"✅ '{uploaded_file.name}'에서 텍스트 추출 완료! (약 {len(source_content):,}자)")
             with st.expander("추출된 PDF 텍스트 미리보기 (일부)"):
@@ -404,22 +350,52 @@ elif input_type == 'PDF 파일 업로드':
 elif input_type == '유튜브 URL': # 유튜브 URL 입력 로직
     st.subheader("유튜브 영상 URL 입력")
     youtube_url_input = st.text_input("유튜브 영상 URL을 입력하세요:", key="youtube_url_input_field", placeholder="예: https://www.youtube.com/watch?v=...")
+    with st.expander("여러 영상에서 한 번에 만들기 (선택 사항)"):
+        extra_youtube_urls = st.text_area("추가 영상 URL 또는 ID (한 줄에 하나):", key="youtube_extra_urls_area", height=100, placeholder="https://www.youtube.com/watch?v=...\nhttps://youtu.be/...")
+    youtube_urls = [url.strip() for url in [youtube_url_input] + extra_youtube_urls.splitlines() if url.strip()]
     if youtube_url_input:
         with st.spinner(f"'{youtube_url_input}' 영상의 스크립트를 가져오는 중..."):
-            source_content = get_youtube_transcript(youtube_url_input)
+            youtube_video_id = resolve_youtube_video_id(youtube_url_input)
+            if len(youtube_urls) > 1:
+                source_content = extraction_cache.get_or_compute(
+                    youtube_cache_key(youtube_video_id or youtube_url_input, *[resolve_youtube_video_id(url) or url for url in youtube_urls[1:]]),
+                    lambda: extract_text_from_youtube_videos(youtube_urls)
+                )
+            elif youtube_video_id:
+                source_content = extraction_cache.get_or_compute(
+                    youtube_cache_key(youtube_video_id),
+                    lambda: get_youtube_transcript(youtube_url_input)
+                )
+            else:
+                source_content = get_youtube_transcript(youtube_url_input) # 오류 메시지 표시
         if source_content:
             st.success(f"✅ 유튜브 영상 스크립트 가져오기 완료! (약 {len(source_content):,}자)")
             with st.expander("추출된 스크립트 미리보기 (일부)"):
                 st.text_area("", value=source_content[:2000] + ("..." if len(source_content) > 2000 else ""), height=150, disabled=True)
             uploaded_file_name_prefix = "youtube_transcript_quiz"
+            source_label = youtube_url_input
         elif source_content is None and youtube_url_input:
             pass
 elif input_type == '웹사이트 URL': # 웹사이트 URL 입력 로직
     st.subheader("웹사이트 URL 입력")
     website_url_input = st.text_input("퀴즈를 생성할 웹사이트 URL을 입력하세요:", key="website_url_input_field", placeholder="예: https://ko.wikipedia.org/wiki/대한민국")
+    with st.expander("여러 페이지에서 한 번에 만들기 (선택 사항)"):
+        extra_website_urls = st.text_area("추가 웹페이지 URL (한 줄에 하나):", key="website_extra_urls_area", height=100, placeholder="https://...\nhttps://...")
+        follow_links_depth = st.number_input("같은 사이트 링크 따라가기 깊이 (0이면 입력한 페이지만):", min_value=0, max_value=2, value=0, step=1, key="website_follow_depth_input")
+        max_website_pages = st.number_input("최대 페이지 수:", min_value=1, max_value=50, value=20, step=1, key="website_max_pages_input")
+    website_urls = [url.strip() for url in [website_url_input] + extra_website_urls.splitlines() if url.strip()]
     if website_url_input:
         with st.spinner(f"'{website_url_input}' 웹사이트에서 콘텐츠를 가져오는 중..."):
-            source_content = extract_text_from_website(website_url_input)
+            if len(website_urls) == 1 and follow_links_depth == 0:
+                source_content = extraction_cache.get_or_compute(
+                    website_cache_key(website_url_input),
+                    lambda: extract_text_from_website(website_url_input)
+                )
+            else:
+                source_content = extraction_cache.get_or_compute(
+                    website_cache_key(website_url_input, *website_urls[1:], follow_links_depth, max_website_pages),
+                    lambda: extract_text_from_websites(website_urls, follow_links_depth=follow_links_depth, max_pages=max_website_pages)
+                )
         if source_content:
             st.success(f"✅ 웹사이트 콘텐츠 가져오기 완료! (약 {len(source_content):,}자)")
             with st.expander("추출된 웹사이트 텍스트 미리보기 (일부)"):
@@ -429,92 +405,163 @@ elif input_type == '웹사이트 URL': # 웹사이트 URL 입력 로직
                 uploaded_file_name_prefix = re.sub(r'[^a-zA-Z0-9_]', '', domain_name) + "_website_quiz"
             except:
                 uploaded_file_name_prefix = "website_content_quiz"
+            source_label = website_url_input
         elif source_content is None and website_url_input:
             pass
 
 
 st.markdown("---")
-if st.button("🚀 Blooket 퀴즈 생성 시작!", type="primary", use_container_width=True, disabled=(not source_content)):
+generate_clicked = st.button("🚀 Blooket 퀴즈 생성 시작!", type="primary", use_container_width=True, disabled=(not source_content))
+queue_clicked = st.button(
+    "🗂️ 백그라운드 대기열에 추가", use_container_width=True, disabled=(not source_content), key="queue_job_button",
+    help="화면을 기다리게 하지 않고 지금 설정으로 생성 작업을 대기열에 넣습니다. 소스나 옵션을 바꿔 여러 개를 넣으면 동시에 처리합니다."
+)
+job_options = build_options(
+    num_questions, default_time_limit, difficulty, grade_level, chunked=use_chunked_generation,
+    chunk_token_budget=CHUNK_TOKEN_BUDGET, model_workers=MAX_PARALLEL_MODEL_CALLS, preprocess=use_preprocessing,
+    context_token_budget=context_token_budget or None, top_up=use_top_up,
+    dedupe=use_dedupe, drop_bank_duplicates=drop_bank_duplicates,
+)
+if queue_clicked and source_content:
+    if len(variants) > 1:
+        job_title = f"{uploaded_file_name_prefix} 수준별 {len(variants)}세트"
+        job_id = job_manager.submit(
+            generate_variants_job, load_base_model(), source_content, variants, job_options,
+            source_kind=SOURCE_KINDS.get(input_type), source_label=source_label, title_prefix=uploaded_file_name_prefix,
+            refresh=force_regenerate, label=job_title,
+        )
+    else:
+        job_title = build_base_filename(uploaded_file_name_prefix, num_questions, difficulty, grade_level)
+        job_id = job_manager.submit(
+            generate_quiz_job, load_generation_model(refresh=force_regenerate), source_content, job_options,
+            source_kind=SOURCE_KINDS.get(input_type), source_label=source_label, title=job_title, label=job_title,
+        )
+    remember_job(job_id)
+    st.toast(f"🗂️ '{job_title}' 생성 작업을 대기열에 추가했습니다.")
+
+if generate_clicked and source_content and len(variants) > 1:
+    st.session_state.pop("quiz_results", None) # 이전 결과 대신 새 결과를 표시
+    st.markdown("---")
+    base_model = load_base_model()
+    with st.spinner(f"⏳ 수준별 퀴즈 {len(variants)}세트를 동시에 생성하는 중..."):
+        variant_results = generate_variants(
+            base_model, source_content, variants, job_options, kind=SOURCE_KINDS.get(input_type),
+            context_cache=get_context_cache(), refresh=force_regenerate,
+        )
+    saved_variants = save_variants(quiz_bank, source_hash(source_content), variant_results, SOURCE_KINDS.get(input_type),
+                                   source_label, uploaded_file_name_prefix, base_model.model_name)
+    if saved_variants:
+        st.success(f"🎉 {len(variants)}세트 중 {len(saved_variants)}세트를 만들었습니다. 아래 탭에서 세트별로 내려받으세요.")
+        remember_quiz_results(saved_variants)
+    else:
+        st.error("❌ 모든 수준의 퀴즈 생성에 실패했습니다.")
+
+elif generate_clicked:
     if source_content:
+        st.session_state.pop("quiz_results", None) # 이전 결과 대신 새 결과를 표시
         st.markdown("---")
         st.subheader("⏳ 퀴즈 생성 중...")
         progress_bar = st.progress(0, text="Gemini AI와 통신 중...")
-
-        gemini_output = generate_quiz_with_gemini(source_content, num_questions, default_time_limit, difficulty, grade_level)
-        progress_bar.progress(50, text="Gemini AI 응답 분석 중...")
+        original_source_hash = source_hash(source_content)
+
+        queue_depth = get_scheduler().queue_depth
+        if queue_depth:
+            st.info(f"⏳ 현재 다른 요청 {queue_depth}개가 Gemini 호출을 기다리거나 처리 중입니다. 차례가 되면 자동으로 시작됩니다.")
+        generation_model = load_generation_model(refresh=force_regenerate)
+        live_preview = st.empty()
+
+        def show_live_item(item, quiz_items):
+            done = len(quiz_items)
+            progress_bar.progress(min(90, int(done / num_questions * 90)), text=f"문항 생성 중... ({done}/{num_questions})")
+            live_preview.dataframe(quiz_items, use_container_width=True)
+
+        # 전처리 → 생성(분할/스트리밍) → 파싱 → 비슷한 문항 제외 → 보충은 대기열/CLI 와 같은 quizgen.pipeline 경로로 실행
+        gemini_output, parse_result = generate_for_source(
+            generation_model, source_content, job_options, kind=SOURCE_KINDS.get(input_type),
+            on_item=show_live_item if use_streaming else None,
+        )
+        live_preview.empty()
+        progress_bar.progress(90, text="퀴즈 데이터 파싱 및 파일 준비 중...")
+
+        if gemini_output and getattr(generation_model, "hits", 0) and not generation_model.misses:
+            st.info("♻️ 같은 콘텐츠와 옵션으로 생성했던 응답을 재사용했습니다 (API 호출 없음). 새 문항이 필요하면 '강제 재생성'을 선택하세요.")
 
         if gemini_output:
-            with st.expander("🤖 Gemini API 응답 원본 보기", expanded=False):
-                st.text_area("API Response:", value=gemini_output, height=200, key="gemini_raw_output_area")
-            parsed_quiz_data = parse_gemini_response(gemini_output, default_time_limit)
-            progress_bar.progress(80, text="퀴즈 데이터 파싱 및 파일 준비 중...")
-
+            parsed_quiz_data = show_parse_result(parse_result, gemini_output)
             if parsed_quiz_data:
-                st.subheader("📊 생성된 퀴즈 미리보기")
-                df_preview = pd.DataFrame(parsed_quiz_data)
-                st.dataframe(df_preview, use_container_width=True)
                 progress_bar.progress(100, text="퀴즈 생성 완료! 파일을 다운로드하세요.")
                 st.balloons()
                 st.success("🎉 Blooket용 퀴즈 파일 생성이 성공적으로 완료되었습니다!")
 
-                final_base_filename = f"{re.sub(r'[^a-zA-Z0-9_]', '', uploaded_file_name_prefix)}_{num_questions}q"
-                if difficulty != "선택 안 함":
-                    final_base_filename += f"_{difficulty.replace(' ', '_')}"
-                if grade_level != "전체 (선택 안 함)":
-                    grade_level_filename_part = grade_level.replace(' ', '_').replace('-', '')
-                    final_base_filename += f"_{grade_level_filename_part}"
-
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    csv_data = convert_to_blooket_csv(parsed_quiz_data)
-                    if csv_data:
-                        st.download_button(
-                            label="📥 CSV 파일 다운로드 (.csv)",
-                            data=csv_data,
-                            file_name=f"{final_base_filename}.csv",
-                            mime="text/csv",
-                            use_container_width=True,
-                            key="csv_download_button"
-                        )
-                    else:
-                        st.error("CSV 파일 데이터가 없습니다.")
-
-                with col2:
-                    xlsx_data = convert_to_blooket_xlsx(parsed_quiz_data)
-                    if xlsx_data:
-                        st.download_button(
-                            label="📥 XLSX 파일 다운로드 (.xlsx)",
-                            data=xlsx_data,
-                            file_name=f"{final_base_filename}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True,
-                            key="xlsx_download_button"
-                        )
-                    else:
-                        st.error("XLSX 파일 데이터가 없습니다.")
-
-                st.info(f"""
-                **다운로드된 파일 사용법:**
-                1. Blooket 웹사이트에 로그인합니다.
-                2. 'Create' 또는 'My Sets'로 이동하여 새 퀴즈 세트를 만듭니다.
-                3. 'Create Method'에서 'CSV Import' 또는 유사한 옵션을 선택합니다.
-                4. 다운로드한 CSV 또는 XLSX 파일을 업로드합니다.
-                5. Blooket의 컬럼명과 파일의 컬럼명을 **정확히** 매칭시킵니다.
-                   (예: 파일의 "{BLOOKET_COLUMNS[1]}" -> Blooket의 "Question", 파일의 "{BLOOKET_COLUMNS[7]}" -> Blooket의 정답 번호 입력 필드)
-                   파일의 "{BLOOKET_COLUMNS[0]}" ({BLOOKET_COLUMNS[0]})은 Blooket에서 순서 확인용으로 사용하거나 무시될 수 있습니다.
-                6. 퀴즈 세트 생성을 완료합니다!
-                """)
+                final_base_filename = build_base_filename(uploaded_file_name_prefix, num_questions, difficulty, grade_level)
+                saved_quiz_id = save_to_quiz_bank(quiz_bank, original_source_hash, parsed_quiz_data, gemini_output, job_options,
+                                                  SOURCE_KINDS.get(input_type), source_label, final_base_filename,
+                                                  generation_model.model_name)
+                remember_quiz_result(parsed_quiz_data, gemini_output, final_base_filename, saved_quiz_id)
             else:
                 progress_bar.empty()
                 st.error("❌ Gemini 응답에서 유효한 퀴즈 데이터를 파싱하지 못했습니다.")
+                with st.expander("🤖 Gemini API 응답 원본 보기", expanded=False):
+                    st.text_area("API Response:", value=gemini_output, height=200, key="gemini_raw_output_area")
         else:
             progress_bar.empty()
             st.error("❌ Gemini로부터 퀴즈를 생성하지 못했습니다.")
     else:
         st.warning("⚠️ 퀴즈를 생성할 콘텐츠가 없습니다.")
 
+# --- 백그라운드 작업 목록 (실행 중인 작업이 있으면 주기적으로 새로 고침) ---
+def show_background_jobs(polling):
+    session_jobs = job_manager.jobs(job_ids=st.session_state["job_ids"])
+    if not session_jobs:
+        return
+    st.subheader("🗂️ 백그라운드 작업")
+    for job in reversed(session_jobs):
+        with st.container(border=True):
+            st.markdown(f"**{job.label}** · {STATUS_LABELS[job.status]} · {job.elapsed():.0f}초")
+            if not job.finished:
+                st.progress(job.progress, text=job.message)
+            if job.status == FAILED:
+                st.error(f"❌ {job.error}")
+            if job.warnings:
+                with st.expander(f"⚠️ 경고 {len(job.warnings)}개"):
+                    for warning in job.warnings:
+                        st.caption(warning)
+            if not job.finished:
+                if st.button("⏹️ 취소", key=f"job_cancel_{job.id}", disabled=job.cancel_requested):
+                    job_manager.cancel(job.id)
+            elif job.status == DONE and "variants" in job.result:
+                if st.button(f"📂 결과 보기 ({len(job.result['variants'])}세트)", key=f"job_open_{job.id}"):
+                    remember_quiz_results(job.result["variants"])
+                    st.rerun()
+            elif job.status == DONE:
+                if st.button(f"📂 결과 보기 ({len(job.result['items'])}문항)", key=f"job_open_{job.id}"):
+                    remember_quiz_result(job.result["items"], job.result["raw_output"], job.result["base_filename"], job.result["quiz_id"])
+                    st.rerun()
+    if polling and all(job.finished for job in session_jobs):
+        st.rerun() # 모든 작업이 끝나면 새로 고침을 멈춤
+
+jobs_running = any(not job.finished for job in job_manager.jobs(job_ids=st.session_state["job_ids"]))
+st.fragment(run_every=JOB_POLL_SECONDS if jobs_running else None)(show_background_jobs)(jobs_running)
+
+# --- 생성/불러온 퀴즈 표시 (다른 위젯을 조작해 다시 실행되어도 유지) ---
+quiz_results = st.session_state.get("quiz_results")
+if quiz_results and len(quiz_results) == 1:
+    show_quiz_result(quiz_results[0])
+elif quiz_results:
+    st.subheader(f"📚 수준별 퀴즈 {len(quiz_results)}세트")
+    st.download_button(
+        label="📦 모든 세트 묶음 (.zip)",
+        data=lambda: build_quiz_bundle([(result["base_filename"], result["items"]) for result in quiz_results]),
+        file_name="blooket_quiz_sets.zip",
+        mime=EXPORT_MIME_TYPES["zip"],
+        on_click="ignore",
+        key="variants_zip_download_button"
+    )
+    for index, (tab, result) in enumerate(zip(st.tabs([result["label"] for result in quiz_results]), quiz_results)):
+        with tab:
+            show_quiz_result(result, key_prefix=f"variant_{index}_", show_guide=False)
+    show_import_guide()
+
 st.markdown("---")
 current_year = datetime.date.today().year
 st.markdown(f"<div style='text-align: center; color: grey;'>This app is made by SH (<a href='https://litt.ly/4sh.space' target='_blank'>litt.ly/4sh.space</a>) © {current_year}</div>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Blooket 퀴즈 생성기의 Streamlit 독립 보조 모듈 모음."""
@@ -0,0 +1,282 @@
+"""추출 결과 캐시 (메모리 LRU + 선택적 디스크 저장소).
+
+Streamlit은 위젯 값이 바뀔 때마다 스크립트 전체를 다시 실행하므로,
+같은 PDF/영상/웹페이지를 매번 다시 추출하지 않도록 콘텐츠 해시 기반 키로 결과를 보관합니다.
+이 모듈은 스크립트 재실행과 무관하게 프로세스 단위로 유지됩니다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .metrics import get_metrics
+
+# --- 캐시 설정 기본값 (환경 변수로 덮어쓸 수 있음) ---
+DEFAULT_MEMORY_MAX_ENTRIES = 64
+DEFAULT_MEMORY_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+DEFAULT_MEMORY_TTL = 60 * 60  # 1시간
+DEFAULT_DISK_TTL = 7 * 24 * 60 * 60  # 7일
+
+# 추적용 쿼리 파라미터는 URL 정규화 시 제거
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+# --- 1. 캐시 키 생성 ---
+def make_cache_key(kind, identity, *params):
+    """캐시 종류(kind), 식별자, 추가 파라미터로 고정 길이 키를 만듭니다."""
+    raw = "\x1f".join([kind, str(identity)] + [str(p) for p in params])
+    return f"{kind}-{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def content_hash(data):
+    """업로드 파일 바이트의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_url(url):
+    """스킴/호스트 소문자화, 기본 포트·프래그먼트·추적 파라미터 제거, 쿼리 정렬."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def pdf_cache_key(data, *params):
+    return make_cache_key("pdf", content_hash(data), *params)
+
+
+def youtube_cache_key(video_id, *params):
+    return make_cache_key("youtube", video_id, *params)
+
+
+def website_cache_key(url, *params):
+    return make_cache_key("web", normalize_url(url), *params)
+
+
+def _value_size(value):
+    """LRU 용량 계산용 대략적인 값 크기(바이트)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+# --- 2. 메모리 LRU 캐시 ---
+class LRUCache:
+    """항목 수와 전체 바이트 크기로 제한되는 스레드 안전 LRU 캐시."""
+
+    def __init__(self, max_entries=DEFAULT_MEMORY_MAX_ENTRIES, max_bytes=DEFAULT_MEMORY_MAX_BYTES, ttl=DEFAULT_MEMORY_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._items = OrderedDict()  # key -> (저장 시각, 크기, 값)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """값이 없거나 만료되었으면 None을 반환합니다."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            stored_at, size, value = entry
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._items[key]
+                self._total_bytes -= size
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = _value_size(value)
+        with self._lock:
+            if key in self._items:
+                self._total_bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:  # 한 항목이 전체 용량보다 크면 보관하지 않음
+                return
+            self._items[key] = (time.time(), size, value)
+            self._total_bytes += size
+            while self._items and (len(self._items) > self.max_entries or self._total_bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+
+# --- 3. 디스크 저장소 ---
+class DiskCache:
+    """키마다 JSON 파일 하나로 저장하는 단순 디스크 캐시 (세션/재시작 간 공유)."""
+
+    def __init__(self, directory, ttl=DEFAULT_DISK_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and time.time() - entry.get("stored_at", 0) > self.ttl:
+            self._remove(path)
+            return None
+        return entry.get("value")
+
+    def set(self, key, value):
+        # 동시에 여러 세션이 같은 키를 쓰더라도 깨진 파일이 남지 않도록 임시 파일 후 교체
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": time.time(), "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError):
+            self._remove(tmp_path)
+
+    def prune(self):
+        """만료된 항목을 삭제하고 삭제한 개수를 반환합니다."""
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if self.ttl and now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# --- 4. 2단계 캐시 ---
+class TwoTierCache:
+    """메모리 LRU를 먼저 확인하고, 없으면 디스크 저장소를 확인하는 2단계 캐시."""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self._stats_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._count("disk_hits")
+                self.memory.set(key, value)  # 다음 조회는 메모리에서
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        if value is None:
+            return
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def get_or_compute(self, key, compute):
+        """캐시에 없을 때만 compute()를 호출합니다. 실패(None) 결과는 저장하지 않습니다."""
+        value = self.get(key)
+        kind = key.split("-", 1)[0]
+        if value is not None:
+            get_metrics().increment(f"cache.{kind}.hit")
+            return value
+        get_metrics().increment(f"cache.{kind}.miss")
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def stats_snapshot(self):
+        with self._stats_lock:
+            snapshot = dict(self.stats)
+        lookups = snapshot["memory_hits"] + snapshot["disk_hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = (lookups - snapshot["misses"]) / lookups if lookups else 0.0
+        snapshot["memory_entries"] = len(self.memory)
+        snapshot["memory_bytes"] = self.memory.total_bytes
+        return snapshot
+
+
+def cache_from_env(prefix="BLOOKET_CACHE"):
+    """환경 변수로 2단계 캐시를 구성합니다.
+
+    {prefix}_DIR 가 설정된 경우에만 디스크 저장소를 사용합니다.
+    {prefix}_MEMORY_ENTRIES, {prefix}_MEMORY_MB, {prefix}_MEMORY_TTL, {prefix}_DISK_TTL (초)
+    """
+    def _int_env(name, default):
+        try:
+            return int(os.environ.get(f"{prefix}_{name}", default))
+        except ValueError:
+            return default
+
+    memory = LRUCache(
+        max_entries=_int_env("MEMORY_ENTRIES", DEFAULT_MEMORY_MAX_ENTRIES),
+        max_bytes=_int_env("MEMORY_MB", DEFAULT_MEMORY_MAX_BYTES // (1024 * 1024)) * 1024 * 1024,
+        ttl=_int_env("MEMORY_TTL", DEFAULT_MEMORY_TTL),
+    )
+    disk = None
+    directory = os.environ.get(f"{prefix}_DIR")
+    if directory:
+        try:
+            disk = DiskCache(directory, ttl=_int_env("DISK_TTL", DEFAULT_DISK_TTL))
+        except OSError:
+            disk = None
+    return TwoTierCache(memory=memory, disk=disk)
+
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """프로세스 전체에서 공유하는 추출 결과 캐시를 반환합니다."""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = cache_from_env()
+        return _extraction_cache
@@ -0,0 +1,145 @@
+"""긴 콘텐츠를 토큰 예산 단위로 나누어 병렬로 퀴즈를 생성하는 map-reduce 도우미.
+
+전체 문서를 한 번에 보내는 대신 구간별로 문항 수를 배분해 동시에 호출하므로,
+소요 시간은 문서 전체가 아니라 가장 큰 구간의 크기에 비례합니다.
+"""
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CHUNK_TOKEN_BUDGET = 8000
+DEFAULT_MAX_WORKERS = 4
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。！？])\s+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text):
+    """모델 토큰 수의 대략적인 추정치.
+
+    영문 등 ASCII 문자는 약 4자당 1토큰, 한글 등 그 외 문자는 대략 1자당 1토큰으로 계산합니다.
+    """
+    if not text:
+        return 0
+    ascii_count = len(text.encode("ascii", "ignore")) # 문자 단위 반복보다 훨씬 빠름
+    non_ascii = len(text) - ascii_count
+    return math.ceil(ascii_count / 4 + non_ascii)
+
+
+def _split_oversized(piece, max_tokens):
+    """한 문단이 예산을 넘으면 문장 → 고정 길이 순으로 더 잘게 나눕니다."""
+    if estimate_tokens(piece) <= max_tokens:
+        return [piece]
+    parts = []
+    for sentence in _SENTENCE_SPLIT.split(piece):
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            parts.append(sentence)
+            continue
+        # 문장 하나가 예산보다 큰 경우: 문자 수 기준으로 자름 (최악의 경우 1자=1토큰)
+        step = max(1, max_tokens)
+        parts.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+    return parts
+
+
+def split_into_chunks(text, max_tokens=DEFAULT_CHUNK_TOKEN_BUDGET):
+    """문단 경계를 최대한 유지하면서 각 구간이 max_tokens 이하가 되도록 나눕니다."""
+    if not text or not text.strip():
+        return []
+    pieces = []
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            pieces.extend(_split_oversized(paragraph, max_tokens))
+
+    chunks = []
+    current, current_tokens = [], 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def allocate_questions(chunks, num_questions):
+    """각 구간의 토큰 수에 비례해 문항 수를 배분합니다.
+
+    문서 전체(누적 토큰 축)에 문항을 같은 간격으로 배치한 뒤 해당 위치가 속한 구간에 배정하므로,
+    문항 수가 구간 수보다 적어도 앞부분에 몰리지 않고 문서 전체에 고르게 퍼집니다.
+    """
+    counts = [0] * len(chunks)
+    if not chunks or num_questions <= 0:
+        return counts
+    weights = [max(1, estimate_tokens(chunk)) for chunk in chunks]
+    total = sum(weights)
+    chunk_index, chunk_end = 0, weights[0]
+    for q in range(num_questions):
+        position = (q + 0.5) * total / num_questions
+        while position > chunk_end and chunk_index < len(chunks) - 1:
+            chunk_index += 1
+            chunk_end += weights[chunk_index]
+        counts[chunk_index] += 1
+    return counts
+
+
+def map_chunks(chunks, num_questions, generate_chunk, max_workers=DEFAULT_MAX_WORKERS):
+    """구간별 generate_chunk(chunk_text, chunk_num_questions)를 제한된 스레드 풀에서 동시에 호출합니다.
+
+    반환값은 원래 구간 순서의 결과 dict 목록입니다:
+    {"index", "num_questions", "text", "error"} (실패한 구간은 text=None, error=예외)
+    """
+    counts = allocate_questions(chunks, num_questions)
+    jobs = [(i, chunk, n) for i, (chunk, n) in enumerate(zip(chunks, counts)) if n > 0]
+    results = []
+    if not jobs:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        futures = [(i, n, executor.submit(generate_chunk, chunk, n)) for i, chunk, n in jobs]
+        for i, n, future in futures:
+            try:
+                results.append({"index": i, "num_questions": n, "text": future.result(), "error": None})
+            except Exception as e:
+                results.append({"index": i, "num_questions": n, "text": None, "error": e})
+    return results
+
+
+def merge_chunk_outputs(results):
+    """성공한 구간의 응답을 원래 순서대로 하나로 합칩니다.
+
+    파서가 블록을 순서대로 번호 매기므로 합친 결과는 1번부터 다시 번호가 매겨집니다.
+    모든 구간이 실패하면 None을 반환합니다.
+    """
+    texts = [r["text"] for r in sorted(results, key=lambda r: r["index"]) if r["text"]]
+    if not texts:
+        return None
+    return "\n---\n".join(texts)
+
+
+def select_top_up_context(chunks, covered_texts, num_questions, max_tokens=DEFAULT_CHUNK_TOKEN_BUDGET):
+    """부족한 문항을 다시 요청할 때 보낼 구간을 max_tokens 안에서 골라 원래 순서대로 합칩니다.
+
+    기존 문항(covered_texts)은 단어가 가장 많이 겹치는 구간에서 나온 것으로 보고,
+    allocate_questions 배분보다 문항이 덜 나온 구간부터 고릅니다.
+    """
+    counts = allocate_questions(chunks, num_questions)
+    chunk_words = [set(_WORD_RE.findall(chunk.lower())) for chunk in chunks]
+    covered = [0] * len(chunks)
+    for text in covered_texts:
+        words = set(_WORD_RE.findall(text.lower()))
+        if words:
+            covered[max(range(len(chunks)), key=lambda i: len(words & chunk_words[i]))] += 1
+    selected, tokens = [], 0
+    for i in sorted(range(len(chunks)), key=lambda i: (covered[i] - counts[i], i)):
+        chunk_tokens = estimate_tokens(chunks[i])
+        if selected and tokens + chunk_tokens > max_tokens:
+            continue
+        selected.append(i)
+        tokens += chunk_tokens
+    return "\n\n".join(chunks[i] for i in sorted(selected))
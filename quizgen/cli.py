@@ -0,0 +1,90 @@
+"""Blooket 퀴즈 일괄 생성 명령줄 도구.
+
+예시:
+    GEMINI_API_KEY=... python -m quizgen --pdf-dir textbooks/ --urls-file links.txt --out-dir out/
+
+같은 명령을 다시 실행하면 out/manifest.jsonl 에 완료로 기록된 소스는 건너뛰고 이어서 처리합니다.
+"""
+import argparse
+import logging
+import os
+import sys
+
+from .chunking import DEFAULT_CHUNK_TOKEN_BUDGET
+from .generation import DEFAULT_MODEL_NAME, DIFFICULTY_OPTIONS, GRADE_LEVEL_OPTIONS, configure_model
+from .pdf_pages import normalize_page_ranges
+from .pipeline import SUPPORTED_FORMATS, collect_sources, run_batch
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m quizgen",
+        description="PDF 디렉터리와 URL 목록에서 Blooket 퀴즈 CSV/XLSX 파일을 일괄 생성합니다.",
+    )
+    parser.add_argument("--pdf-dir", help="PDF 파일이 있는 디렉터리 (하위 폴더 포함)")
+    parser.add_argument("--urls-file", help="유튜브/웹사이트 URL 목록 파일 (한 줄에 하나, # 주석 허용)")
+    parser.add_argument("--out-dir", required=True, help="결과 파일과 매니페스트를 저장할 디렉터리")
+    parser.add_argument("--pdf-pages", help="모든 PDF에서 추출할 페이지 범위 (예: \"1-20, 35\", 기본값: 전체)")
+    parser.add_argument("--manifest", help="완료 기록 파일 경로 (기본값: <out-dir>/manifest.jsonl)")
+    parser.add_argument("--bundle", help="완료된 모든 퀴즈 파일을 묶을 ZIP 경로 (예: out/quizzes.zip)")
+    parser.add_argument("--metrics-file", help="단계별 처리 시간 집계(JSON) 저장 경로 (기본값: <out-dir>/metrics.json)")
+    parser.add_argument("--num-questions", type=int, default=5, help="소스당 생성할 질문 수 (기본값: 5)")
+    parser.add_argument("--time-limit", type=int, default=20, help="질문 당 기본 시간 제한(초) (기본값: 20)")
+    parser.add_argument("--difficulty", choices=DIFFICULTY_OPTIONS, default=DIFFICULTY_OPTIONS[0])
+    parser.add_argument("--grade-level", choices=GRADE_LEVEL_OPTIONS, default=GRADE_LEVEL_OPTIONS[0])
+    parser.add_argument("--formats", nargs="+", choices=SUPPORTED_FORMATS, default=list(SUPPORTED_FORMATS))
+    parser.add_argument("--io-workers", type=int, default=4, help="추출/저장 동시 실행 수 (기본값: 4)")
+    parser.add_argument("--model-workers", type=int, default=2, help="Gemini 동시 호출 수 (기본값: 2)")
+    parser.add_argument("--no-chunked", dest="chunked", action="store_false", help="긴 콘텐츠도 한 번의 호출로 생성")
+    parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKEN_BUDGET, help="분할 생성 시 구간당 최대 추정 토큰 수")
+    parser.add_argument("--no-preprocess", dest="preprocess", action="store_false", help="반복 줄/중복 문단 제거 등 전처리 없이 추출한 텍스트를 그대로 사용")
+    parser.add_argument("--context-tokens", type=int, default=0, help="전처리 후 남길 최대 추정 토큰 수 (0: 제한 없음)")
+    parser.add_argument("--no-top-up", dest="top_up", action="store_false", help="형식 오류로 빠진 문항을 추가로 요청하지 않음")
+    parser.add_argument("--no-dedupe", dest="dedupe", action="store_false", help="표현만 다른 비슷한 문항을 제외하지 않음")
+    parser.add_argument("--drop-bank-duplicates", action="store_true", help="퀴즈 보관함에 이미 있는 비슷한 문항도 제외 (기본값: 경고만)")
+    parser.add_argument("--force-regenerate", action="store_true", help="저장된 Gemini 응답을 재사용하지 않고 새로 생성")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME, help=f"Gemini 모델 이름 (기본값: {DEFAULT_MODEL_NAME})")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"), help="Gemini API 키 (기본값: 환경 변수 GEMINI_API_KEY)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="디버그 로그 출력")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if not args.pdf_dir and not args.urls_file:
+        print("--pdf-dir 또는 --urls-file 중 하나 이상을 지정해주세요.", file=sys.stderr)
+        return 2
+    if not args.api_key:
+        print("Gemini API 키가 없습니다. --api-key 또는 환경 변수 GEMINI_API_KEY 를 설정해주세요.", file=sys.stderr)
+        return 2
+
+    try:
+        normalize_page_ranges(args.pdf_pages)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    sources = collect_sources(pdf_dir=args.pdf_dir, urls_file=args.urls_file)
+    if not sources:
+        print("처리할 소스가 없습니다.", file=sys.stderr)
+        return 1
+
+    model = configure_model(args.api_key, args.model)
+    summary = run_batch(
+        model, sources, args.out_dir,
+        num_questions=args.num_questions, default_time_limit=args.time_limit,
+        difficulty=args.difficulty, grade_level=args.grade_level, formats=args.formats,
+        io_workers=args.io_workers, model_workers=args.model_workers,
+        manifest_path=args.manifest, chunked=args.chunked, chunk_token_budget=args.chunk_tokens,
+        pdf_page_ranges=args.pdf_pages, refresh=args.force_regenerate,
+        preprocess=args.preprocess, context_token_budget=args.context_tokens or None, metrics_path=args.metrics_file,
+        bundle_path=args.bundle, top_up=args.top_up,
+        dedupe=args.dedupe, drop_bank_duplicates=args.drop_bank_duplicates,
+    )
+    print(f"단계별 처리 시간 집계: {summary['metrics_path']}")
+    print(f"전체 {summary['total']}개 중 완료 {summary['done']}개, 실패 {summary['failed']}개, 이전 실행에서 완료되어 건너뜀 {summary['skipped']}개")
+    return 0 if summary["failed"] == 0 else 1
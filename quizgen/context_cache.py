@@ -0,0 +1,217 @@
+"""여러 요청이 같은 콘텐츠를 공유할 때 콘텐츠를 한 번만 보내는 컨텍스트 캐시.
+
+같은 자료로 난이도/학년이 다른 여러 변형을 만들면 프롬프트 끝의 콘텐츠 구간(generation.build_context_section)은
+모든 요청이 같습니다. bind_context 로 모델을 콘텐츠에 묶으면, 프롬프트가 그 구간으로 끝나는 호출은
+구간을 뺀 지침만 보내고 콘텐츠는 캐시된 것을 사용합니다. 그 밖의 호출은 프롬프트를 그대로 보냅니다.
+응답 캐시는 전체 프롬프트를 키로 사용하므로 한 변형씩 만든 응답과 변형 모드의 응답을 서로 재사용합니다.
+
+- GeminiContextCache: Gemini 컨텍스트 캐시 (google.generativeai.caching). 콘텐츠가 최소 토큰 수보다 짧거나
+  캐시를 만들 수 없는 모델이면 콘텐츠를 매번 그대로 보냅니다.
+- LocalContextCache: 콘텐츠를 로컬에 보관했다가 다시 붙여 보내는 대체 구현 (테스트, 오프라인 벤치마크용).
+  실제로는 콘텐츠를 매번 보내므로 줄인 토큰은 0 이며, Gemini 였다면 줄였을 토큰 수는
+  "context_cache.simulated_saved_tokens" 지표에 따로 집계합니다.
+
+환경 변수: BLOOKET_CONTEXT_CACHE (gemini | local | off, 기본값 gemini),
+BLOOKET_CONTEXT_CACHE_MIN_TOKENS (기본값 32768), BLOOKET_CONTEXT_CACHE_TTL (초, 기본값 600)
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from .chunking import estimate_tokens
+from .generation import build_context_section
+from .metrics import get_metrics
+from .response_cache import model_name_of, with_response_cache
+from .scheduler import with_scheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_CACHED_TOKENS = 32768 # Gemini 컨텍스트 캐시의 최소 입력 크기
+DEFAULT_CACHE_TTL = 600 # 초, 변형 생성이 끝나면 바로 지우므로 여유 있게만 설정
+
+
+class GeminiContextCache:
+    """Gemini 컨텍스트 캐시를 만들고 지웁니다."""
+
+    name = "gemini"
+    saves_tokens = True # 캐시된 콘텐츠는 다시 보내지 않음
+
+    def __init__(self, min_tokens=DEFAULT_MIN_CACHED_TOKENS, ttl=DEFAULT_CACHE_TTL):
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+
+    def create(self, model, context_section):
+        """(캐시 핸들, 캐시를 사용하는 모델) 을 반환합니다. 콘텐츠가 짧아 캐시할 수 없으면 None."""
+        if estimate_tokens(context_section) < self.min_tokens:
+            return None
+        import datetime
+
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        cached = caching.CachedContent.create(model=model_name_of(model), contents=[context_section],
+                                              ttl=datetime.timedelta(seconds=self.ttl))
+        return cached, genai.GenerativeModel.from_cached_content(cached_content=cached)
+
+    def release(self, handle):
+        handle.delete()
+
+
+class _LocalCachedModel:
+    """보관한 콘텐츠 구간을 지침 뒤에 다시 붙여 원래 모델을 호출합니다."""
+
+    def __init__(self, model, context_section):
+        self._model = model
+        self._context_section = context_section
+        self.model_name = model_name_of(model)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        return self._model.generate_content(prompt + self._context_section, stream=stream, **kwargs)
+
+
+class LocalContextCache:
+    """Gemini 컨텍스트 캐시 대신 쓰는 로컬 구현. 같은 모델에 같은 프롬프트가 전달되므로 결과는 캐시가 없을 때와 같습니다."""
+
+    name = "local"
+    saves_tokens = False # 콘텐츠를 매번 다시 붙여 보냄
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contexts = {}
+        self._next_handle = 0
+        self.stats = {"created": 0, "released": 0}
+
+    def create(self, model, context_section):
+        with self._lock:
+            self._next_handle += 1
+            handle = self._next_handle
+            self._contexts[handle] = context_section
+            self.stats["created"] += 1
+        return handle, _LocalCachedModel(model, context_section)
+
+    def release(self, handle):
+        with self._lock:
+            if self._contexts.pop(handle, None) is not None:
+                self.stats["released"] += 1
+
+    @property
+    def active(self):
+        with self._lock:
+            return len(self._contexts)
+
+
+class _ContextModel:
+    """캐시를 사용하는 모델. 스케줄러가 다른 콘텐츠의 같은 지침을 합치지 않도록 모델 이름에 콘텐츠 해시를 붙입니다."""
+
+    def __init__(self, model, model_name):
+        self._model = model
+        self.model_name = model_name
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        return self._model.generate_content(prompt, stream=stream, **kwargs)
+
+
+class ContextBoundModel:
+    """콘텐츠 하나에 묶인 모델. generate_content 는 일반 모델과 같은 전체 프롬프트를 받습니다.
+
+    캐시는 콘텐츠 구간으로 끝나는 프롬프트를 처음 실제로 보낼 때 만들고(응답 캐시 적중만 있으면 만들지 않음), close 에서 지웁니다.
+    saved_tokens 는 실제로 보내지 않은 토큰 수이고, 토큰을 줄이지 않는 캐시(saves_tokens=False)에서는
+    simulated_saved_tokens 에 따로 셉니다.
+    """
+
+    def __init__(self, model, context, context_cache):
+        self._model = model
+        self._scheduled_model = with_scheduler(model)
+        self._context_cache = context_cache
+        self._context_section = build_context_section(context)
+        self._context_tokens = estimate_tokens(self._context_section)
+        self.model_name = model_name_of(model)
+        self._lock = threading.Lock()
+        self._handle = None
+        self._cached_model = None
+        self._unavailable = context_cache is None
+        self.cached_calls = 0
+        self.saved_tokens = 0
+        self.simulated_saved_tokens = 0
+        self._saves_tokens = getattr(context_cache, "saves_tokens", True)
+
+    def _get_cached_model(self):
+        with self._lock:
+            if self._cached_model is None and not self._unavailable:
+                try:
+                    created = self._context_cache.create(self._model, self._context_section)
+                except Exception as e:
+                    logger.info(f"컨텍스트 캐시를 만들지 못해 콘텐츠를 요청마다 보냅니다: {e}")
+                    created = None
+                if created is None:
+                    self._unavailable = True
+                else:
+                    self._handle, cached_model = created
+                    digest = hashlib.sha256(self._context_section.encode("utf-8")).hexdigest()[:16]
+                    self._cached_model = with_scheduler(_ContextModel(cached_model, f"{self.model_name}@{digest}"))
+            return self._cached_model
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if prompt.endswith(self._context_section):
+            cached_model = self._get_cached_model()
+            if cached_model is not None:
+                counter = "saved_tokens" if self._saves_tokens else "simulated_saved_tokens"
+                with self._lock:
+                    self.cached_calls += 1
+                    setattr(self, counter, getattr(self, counter) + self._context_tokens)
+                get_metrics().increment(f"context_cache.{counter}", self._context_tokens)
+                return cached_model.generate_content(prompt[:-len(self._context_section)], stream=stream, **kwargs)
+        return self._scheduled_model.generate_content(prompt, stream=stream, **kwargs)
+
+    def close(self):
+        """캐시를 지웁니다. 지우지 못해도 TTL 이 지나면 사라지므로 경고만 남깁니다."""
+        with self._lock:
+            handle, self._handle, self._cached_model = self._handle, None, None
+        if handle is not None:
+            try:
+                self._context_cache.release(handle)
+            except Exception as e:
+                logger.warning(f"컨텍스트 캐시를 지우지 못했습니다 (TTL 이 지나면 자동으로 사라집니다): {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def bind_context(model, context, context_cache=None, refresh=False):
+    """원본 모델을 콘텐츠에 묶고 응답 캐시를 씌웁니다 (응답 캐시 → 컨텍스트 캐시 → 스케줄러 순서).
+
+    반환값: (생성 함수에 넘길 모델, close 를 호출해야 하는 ContextBoundModel)
+    """
+    bound = ContextBoundModel(model, context, context_cache)
+    return with_response_cache(bound, refresh=refresh), bound
+
+
+_context_cache = None
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache():
+    """프로세스 공유 컨텍스트 캐시 (BLOOKET_CONTEXT_CACHE 로 선택). off 이면 None."""
+    global _context_cache
+    with _context_cache_lock:
+        if _context_cache is None:
+            kind = os.environ.get("BLOOKET_CONTEXT_CACHE", GeminiContextCache.name).strip().lower()
+            if kind in ("", "off", "none"):
+                return None
+            if kind == LocalContextCache.name:
+                _context_cache = LocalContextCache()
+            else:
+                if kind != GeminiContextCache.name:
+                    logger.warning(f"알 수 없는 BLOOKET_CONTEXT_CACHE 값 '{kind}' 대신 gemini 를 사용합니다.")
+                try:
+                    min_tokens = int(os.environ.get("BLOOKET_CONTEXT_CACHE_MIN_TOKENS", DEFAULT_MIN_CACHED_TOKENS))
+                    ttl = int(os.environ.get("BLOOKET_CONTEXT_CACHE_TTL", DEFAULT_CACHE_TTL))
+                except ValueError:
+                    logger.warning("컨텍스트 캐시 환경 변수 값이 정수가 아니어서 기본값을 사용합니다.")
+                    min_tokens, ttl = DEFAULT_MIN_CACHED_TOKENS, DEFAULT_CACHE_TTL
+                _context_cache = GeminiContextCache(min_tokens=min_tokens, ttl=ttl)
+        return _context_cache
@@ -0,0 +1,236 @@
+"""표현만 바꾼 비슷한 문항을 찾는 MinHash + LSH 중복 검사.
+
+문항마다 질문과 보기 텍스트의 글자 3-gram 집합으로 64개 해시의 MinHash 서명을 만들고(numpy 로 묶음 단위 계산),
+서명을 16개 밴드로 나눈 LSH 버킷에 넣어 후보만 비교합니다. 보관함 문항이 10만 개여도 새 문항 하나는
+같은 버킷에 들어간 후보와만 비교하므로 전체 문항 수에 비례하지 않습니다.
+후보는 추정 유사도가 기준 이상이고 정답 보기 내용이 같을 때만 중복으로 판단합니다
+(같은 보기 목록에서 다른 것을 묻는 질문을 중복으로 보지 않기 위해).
+
+- 한 세트 안의 비슷한 문항: 제외 (부족해진 문항은 부족한 문항 보충 단계에서 다시 채움)
+- 보관함에 이미 있는 비슷한 문항: 경고로 알리고, 원하면 제외
+"""
+import logging
+import re
+import threading
+
+from .parser import BLOOKET_COLUMNS, renumber_items
+from .quiz_bank import get_quiz_bank
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+LSH_BANDS = 16 # 밴드당 4개 해시 → 유사도 약 0.5 부근에서 후보가 될 확률이 급격히 올라감
+DEFAULT_THRESHOLD = 0.5 # 추정 Jaccard 유사도 (글자 3-gram 기준)
+SIGNATURE_BATCH_SIZE = 64 # 한 번에 서명을 계산할 문항 수 (중간 배열이 CPU 캐시에 들어가는 크기, 1만 개 단위보다 몇 배 빠름)
+
+_COL_QUESTION = BLOOKET_COLUMNS[1]
+_COL_ANSWERS = BLOOKET_COLUMNS[2:6]
+_COL_CORRECT = BLOOKET_COLUMNS[7]
+_NORMALIZE_RE = re.compile(r"[\W_]+", re.UNICODE)
+_SEED = 20240917
+
+
+def _normalize(text):
+    return _NORMALIZE_RE.sub("", str(text or "")).lower()
+
+
+def item_text(item):
+    """서명에 사용할 문항 텍스트 (질문 + 보기)."""
+    return "\x1e".join([_normalize(item.get(_COL_QUESTION))] + [_normalize(item.get(column)) for column in _COL_ANSWERS])
+
+
+def correct_answer_text(item):
+    """정답 보기의 정규화된 내용 (번호가 아닌 내용으로 비교)."""
+    try:
+        return _normalize(item.get(_COL_ANSWERS[int(item.get(_COL_CORRECT)) - 1]))
+    except (TypeError, ValueError, IndexError):
+        return ""
+
+
+_hash_params = None
+
+
+def _permutations():
+    """MinHash 해시 함수 계수 (multiply-shift, 프로세스 내에서 고정)."""
+    global _hash_params
+    if _hash_params is None:
+        import numpy as np
+        rng = np.random.default_rng(_SEED)
+        _hash_params = (rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1),
+                        rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64))
+    return _hash_params
+
+
+def _signature_batch(texts):
+    import numpy as np
+
+    texts = [text if len(text) >= 3 else text.ljust(3, "\0") for text in texts]
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    trigrams = (codes[:-2] * np.uint64(0x9E3779B1) + codes[1:-1]) * np.uint64(0x85EBCA77) + codes[2:]
+    # 문항 경계를 넘는 3-gram 제외
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    offsets = np.arange(len(codes) - 2) - np.repeat(starts, lengths)[:len(codes) - 2]
+    valid = offsets < np.repeat(lengths - 2, lengths)[:len(codes) - 2]
+    multipliers, increments = _permutations()
+    hashed = np.multiply(trigrams[valid][:, None], multipliers[None, :])
+    hashed += increments
+    hashed >>= np.uint64(32)
+    segment_starts = np.concatenate(([0], np.cumsum(lengths - 2)[:-1]))
+    return np.minimum.reduceat(hashed.astype(np.uint32), segment_starts, axis=0)
+
+
+def minhash_signatures(texts):
+    """텍스트 목록의 MinHash 서명 배열 (문항 수 × NUM_PERM, uint32) 을 묶음 단위로 계산합니다."""
+    import numpy as np
+
+    if not texts:
+        return np.zeros((0, NUM_PERM), dtype=np.uint32)
+    return np.concatenate([_signature_batch(texts[i:i + SIGNATURE_BATCH_SIZE])
+                           for i in range(0, len(texts), SIGNATURE_BATCH_SIZE)])
+
+
+class QuestionIndex:
+    """문항 서명을 보관하는 LSH 색인. 키는 호출하는 쪽이 정합니다 (예: (퀴즈 id, 문항 번호)).
+
+    보관함 색인은 여러 세션과 작업이 함께 쓰므로 add_items / query 는 색인 잠금 안에서 실행합니다.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._rows = NUM_PERM // LSH_BANDS
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+        self._keys = []
+        self._answers = []
+        self._blocks = [] # add_items 마다 받은 서명 배열 (조회할 때 하나로 합침)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._keys)
+
+    def _band_keys(self, signatures):
+        """서명 배열 (n × NUM_PERM) 의 밴드별 버킷 키 (n × LSH_BANDS 정수 목록)."""
+        import numpy as np
+
+        bands = signatures.reshape(len(signatures), LSH_BANDS, self._rows).astype(np.uint64)
+        keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+        for row in range(self._rows):
+            keys = keys * np.uint64(0x100000001B3) + bands[:, :, row]
+        return keys.tolist()
+
+    def add_items(self, keys, items, signatures=None):
+        if signatures is None:
+            signatures = minhash_signatures([item_text(item) for item in items])
+        band_keys = self._band_keys(signatures)
+        answers = [correct_answer_text(item) for item in items]
+        with self._lock:
+            start = len(self._keys)
+            self._keys.extend(keys)
+            self._answers.extend(answers)
+            self._blocks.append(signatures)
+            for row, row_band_keys in enumerate(band_keys, start):
+                for bucket, band_key in zip(self._buckets, row_band_keys):
+                    bucket.setdefault(band_key, []).append(row)
+
+    def query(self, item, signature=None, ignore=None):
+        """가장 비슷한 (키, 추정 유사도) 를 반환합니다. 기준 이상인 후보가 없으면 None. ignore(key) 가 참인 키는 건너뜁니다."""
+        if signature is None:
+            signature = minhash_signatures([item_text(item)])[0]
+        answer = correct_answer_text(item)
+        band_keys = self._band_keys(signature[None, :])[0]
+        with self._lock:
+            candidates = set()
+            for bucket, band_key in zip(self._buckets, band_keys):
+                candidates.update(bucket.get(band_key, ()))
+            if not candidates:
+                return None
+            if len(self._blocks) > 1:
+                import numpy as np
+                self._blocks = [np.concatenate(self._blocks)]
+            signatures = self._blocks[0]
+            rows = [(self._keys[row], signatures[row]) for row in candidates if self._answers[row] == answer]
+        best = None
+        for key, row_signature in rows:
+            if ignore is not None and ignore(key):
+                continue
+            similarity = float((row_signature == signature).mean())
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+def find_duplicate_questions(quiz_items, index=None, threshold=DEFAULT_THRESHOLD, ignore=None):
+    """세트 안의 앞 문항 또는 index 의 문항(ignore(key) 가 참인 것 제외)과 비슷한 문항을 찾습니다.
+
+    반환값: {"position", "question", "match", "similarity"} 목록. 세트 안 중복의 match 는 ("set", 앞 문항 위치).
+    """
+    signatures = minhash_signatures([item_text(item) for item in quiz_items])
+    seen = QuestionIndex(threshold)
+    duplicates = []
+    for position, (item, signature) in enumerate(zip(quiz_items, signatures)):
+        match = seen.query(item, signature)
+        if match is not None:
+            match = (("set", match[0]), match[1])
+        elif index is not None:
+            match = index.query(item, signature, ignore)
+        if match is not None:
+            duplicates.append({"position": position, "question": item.get(_COL_QUESTION),
+                               "match": match[0], "similarity": round(match[1], 3)})
+            continue
+        seen.add_items([position], [item], signatures[position:position + 1])
+    return duplicates
+
+
+def remove_duplicate_questions(quiz_items, drop_bank_duplicates=False, text_hash=None):
+    """세트 안의 비슷한 문항은 빼고, 보관함에 이미 있는 비슷한 문항은 알리거나(drop_bank_duplicates=True 이면) 뺍니다.
+
+    text_hash 와 같은 소스로 만든 보관함 퀴즈는 비교하지 않습니다 (같은 자료로 다시 만든 경우).
+    남은 문항을 1번부터 다시 번호를 매겨 반환합니다.
+    """
+    if not quiz_items:
+        return quiz_items
+    duplicates = find_duplicate_questions(quiz_items, index=get_bank_index(),
+                                          ignore=lambda key: _bank_sources.get(key[0]) == text_hash)
+    if not duplicates:
+        return quiz_items
+    in_set = [d for d in duplicates if d["match"][0] == "set"]
+    in_bank = [d for d in duplicates if d["match"][0] != "set"]
+    if in_set:
+        logger.info(f"표현만 다른 비슷한 문항 {len(in_set)}개를 제외했습니다.")
+    if in_bank:
+        numbers = ", ".join(str(d["position"] + 1) for d in in_bank)
+        action = "제외했습니다" if drop_bank_duplicates else "확인해주세요"
+        logger.warning(f"보관함의 기존 퀴즈와 비슷한 문항이 {len(in_bank)}개 있어 {action} (문항 {numbers}).")
+    dropped = {d["position"] for d in (duplicates if drop_bank_duplicates else in_set)}
+    return renumber_items([item for position, item in enumerate(quiz_items) if position not in dropped])
+
+
+# --- 보관함 색인 ---
+_bank_index = None
+_bank_index_last_id = 0
+_bank_sources = {} # 퀴즈 id → 소스 해시
+_bank_index_lock = threading.Lock()
+
+
+def get_bank_index():
+    """퀴즈 보관함의 모든 문항을 담은 프로세스 공유 색인. 호출할 때마다 새로 저장된 퀴즈만 추가합니다.
+
+    보관함을 사용하지 않으면 None.
+    """
+    global _bank_index, _bank_index_last_id
+    quiz_bank = get_quiz_bank()
+    if quiz_bank is None:
+        return None
+    with _bank_index_lock:
+        if _bank_index is None:
+            _bank_index = QuestionIndex()
+        keys, items = [], []
+        for quiz_id, quiz_source_hash, quiz_items in quiz_bank.iter_quiz_items(after_id=_bank_index_last_id):
+            _bank_sources[quiz_id] = quiz_source_hash
+            keys.extend((quiz_id, item.get(BLOOKET_COLUMNS[0])) for item in quiz_items)
+            items.extend(quiz_items)
+            _bank_index_last_id = quiz_id
+        if items:
+            _bank_index.add_items(keys, items)
+        return _bank_index
@@ -0,0 +1,140 @@
+"""Blooket 가져오기용 파일 변환 함수 (CSV/XLSX, 여러 퀴즈 ZIP 묶음).
+
+DataFrame 을 거치지 않고 행을 바로 씁니다. CSV는 csv 모듈로, XLSX는 openpyxl 쓰기 전용(write-only) 통합 문서로
+한 행씩 기록하므로 문항 수와 관계없이 중간 복사본이 생기지 않으며, 파일 객체에 바로 쓸 수도 있습니다.
+화면에서는 다운로드를 누를 때만 만들고(get_export), 같은 퀴즈의 같은 형식은 메모리 캐시에서 재사용합니다.
+"""
+import csv
+import hashlib
+import io # 파일 다운로드를 위한 버퍼
+import json
+import re
+import zipfile
+from io import BytesIO # XLSX 파일 생성을 위한 BytesIO
+
+from .cache import LRUCache
+from .metrics import instrumented
+from .parser import BLOOKET_COLUMNS
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+XLSX_SHEET_NAME = 'Blooket Quiz'
+
+_export_cache = LRUCache(max_entries=64, max_bytes=64 * 1024 * 1024, ttl=0)
+
+
+def _rows(quiz_data_list):
+    """Blooket 컬럼 순서의 행을 yield 합니다 (없는 값은 빈 칸)."""
+    for item in quiz_data_list:
+        yield ["" if item.get(column) is None else item.get(column) for column in BLOOKET_COLUMNS]
+
+
+# --- 1. 파일 객체에 바로 쓰기 ---
+def write_blooket_csv(quiz_data_list, text_stream):
+    """CSV를 텍스트 스트림에 한 행씩 씁니다."""
+    writer = csv.writer(text_stream, lineterminator="\n")
+    writer.writerow(BLOOKET_COLUMNS)
+    writer.writerows(_rows(quiz_data_list))
+
+
+def write_blooket_xlsx(quiz_data_list, binary_stream):
+    """XLSX를 쓰기 전용 통합 문서로 바이너리 스트림에 씁니다."""
+    from openpyxl import Workbook # XLSX 를 처음 내보낼 때만 가져옴
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(XLSX_SHEET_NAME)
+    sheet.append(BLOOKET_COLUMNS)
+    for row in _rows(quiz_data_list):
+        sheet.append(row)
+    workbook.save(binary_stream)
+
+
+# --- 2. 메모리 버퍼로 변환 ---
+@instrumented("export.csv")
+def convert_to_blooket_csv(quiz_data_list):
+    if not quiz_data_list:
+        return None
+    csv_buffer = io.StringIO()
+    write_blooket_csv(quiz_data_list, csv_buffer)
+    return csv_buffer.getvalue()
+
+
+@instrumented("export.xlsx")
+def convert_to_blooket_xlsx(quiz_data_list):
+    if not quiz_data_list:
+        return None
+    output = BytesIO()
+    write_blooket_xlsx(quiz_data_list, output)
+    return output.getvalue()
+
+
+_CONVERTERS = {"csv": convert_to_blooket_csv, "xlsx": convert_to_blooket_xlsx}
+
+
+def quiz_fingerprint(quiz_data_list):
+    """퀴즈 내용의 해시 (내보내기 캐시 키)."""
+    payload = json.dumps(quiz_data_list, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_export(quiz_data_list, export_format):
+    """요청한 형식의 파일 데이터를 만들고, 같은 퀴즈의 같은 형식은 캐시에서 재사용합니다."""
+    if not quiz_data_list:
+        return None
+    key = f"{export_format}-{quiz_fingerprint(quiz_data_list)}"
+    data = _export_cache.get(key)
+    if data is None:
+        data = _CONVERTERS[export_format](quiz_data_list)
+        _export_cache.set(key, data)
+    return data
+
+
+# --- 3. 여러 퀴즈 ZIP 묶음 ---
+@instrumented("export.zip")
+def write_quiz_bundle(quizzes, binary_stream, formats=EXPORT_FORMATS):
+    """(기본 파일 이름, 문항 목록) 들을 형식별 파일로 하나의 ZIP 스트림에 씁니다.
+
+    quizzes 는 제너레이터여도 되며, 퀴즈 하나씩 ZIP 항목에 바로 기록하므로 전체를 메모리에 올리지 않습니다.
+    같은 이름이 여러 번 나오면 뒤에 번호를 붙입니다. 기록한 퀴즈 수를 반환합니다.
+    """
+    used_names = set()
+    count = 0
+    with zipfile.ZipFile(binary_stream, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for base_name, quiz_data_list in quizzes:
+            if not quiz_data_list:
+                continue
+            name, suffix = base_name, 2
+            while name in used_names:
+                name, suffix = f"{base_name}_{suffix}", suffix + 1
+            used_names.add(name)
+            if "csv" in formats:
+                with bundle.open(f"{name}.csv", "w") as entry:
+                    with io.TextIOWrapper(entry, encoding="utf-8-sig", newline="") as text_entry:
+                        write_blooket_csv(quiz_data_list, text_entry)
+            if "xlsx" in formats:
+                with bundle.open(f"{name}.xlsx", "w") as entry:
+                    write_blooket_xlsx(quiz_data_list, entry)
+            count += 1
+    return count
+
+
+def build_quiz_bundle(quizzes, formats=EXPORT_FORMATS):
+    """write_quiz_bundle 결과를 바이트로 반환합니다 (다운로드 버튼용)."""
+    output = BytesIO()
+    write_quiz_bundle(quizzes, output, formats)
+    return output.getvalue()
+
+
+def build_base_filename(prefix, num_questions, difficulty, grade_level):
+    """다운로드 파일 이름(확장자 제외)을 만듭니다. 예: biology_quiz_5q_쉬움_중학교_1학년"""
+    base_filename = f"{re.sub(r'[^a-zA-Z0-9_]', '', prefix)}_{num_questions}q"
+    if difficulty != "선택 안 함":
+        base_filename += f"_{difficulty.replace(' ', '_')}"
+    if grade_level != "전체 (선택 안 함)":
+        grade_level_filename_part = grade_level.replace(' ', '_').replace('-', '')
+        base_filename += f"_{grade_level_filename_part}"
+    return base_filename
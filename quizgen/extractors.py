@@ -0,0 +1,183 @@
+"""콘텐츠 추출 함수 (PDF, 유튜브 스크립트, 웹사이트).
+
+Streamlit에 의존하지 않으며, 사용자에게 보여줄 메시지는 "quizgen" 로거로 남깁니다.
+무거운 라이브러리(PyPDF2, BeautifulSoup, youtube-transcript-api)는 해당 입력을 처음 처리할 때 가져옵니다.
+(Streamlit 앱은 이 로그를 st.error/st.warning/st.info 로 표시합니다.)
+실패 시에는 기존과 같이 None을 반환합니다.
+"""
+import logging
+import re # 유튜브 URL 파싱
+
+import requests # 웹사이트 콘텐츠 요청
+
+from .metrics import instrumented # 단계별 처리 시간 기록
+from .pdf_pages import iter_pdf_pages, source_size # 페이지 단위 PDF 텍스트 추출
+from .transcripts import DEFAULT_MAX_WORKERS as DEFAULT_TRANSCRIPT_WORKERS # 캐시되는 유튜브 자막 목록/조각
+from .transcripts import DEFAULT_WINDOW_SECONDS, fetch_transcript, fetch_transcripts, segments_to_text
+from .web_fetch import DEFAULT_MAX_PAGES, fetch_html, fetch_pages, html_to_text # 공유 세션 기반 웹페이지 가져오기
+
+logger = logging.getLogger(__name__)
+
+# --- 1. 콘텐츠 추출 함수 ---
+@instrumented("extract.pdf", input_size=lambda uploaded_file, *args, **kwargs: source_size(uploaded_file))
+def extract_text_from_pdf(uploaded_file, page_ranges=None, on_progress=None):
+    """PDF에서 텍스트를 추출합니다. 페이지가 많으면 여러 프로세스로 나누어 처리합니다.
+
+    page_ranges: "1-10, 15" 형식의 페이지 범위 (None이면 전체), on_progress(처리한 페이지 수, 전체 페이지 수)
+    """
+    try:
+        page_texts = [text for _, text in iter_pdf_pages(uploaded_file, page_ranges=page_ranges, on_progress=on_progress)]
+    except ValueError as e:
+        logger.error(f"PDF 페이지 범위 오류: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"PDF 텍스트 추출 중 오류 발생: {e}")
+        return None
+    if not page_texts:
+        logger.warning("PDF에서 추출할 수 있는 텍스트가 없습니다. 스캔 이미지로만 된 PDF인지, 페이지 범위가 올바른지 확인해주세요.")
+    return "\n".join(page_texts)
+
+def extract_youtube_video_id(youtube_url):
+    """다양한 유튜브 URL 형식에서 11자리 비디오 ID를 추출합니다. 찾지 못하면 None."""
+    video_id = None
+    # 다양한 유튜브 URL 형식에서 비디오 ID 추출
+    # 일반적인 watch, shorts, youtu.be, embed 형식
+    patterns = [
+        r"(?:v=|\/embed\/|\/shorts\/|youtu\.be\/)([a-zA-Z0-9_-]{11})",
+    ]
+    # googleusercontent.com 형식 추가 (주의: 이 형식은 불안정할 수 있음)
+    # 예시: youtube.com/watch?v=/VIDEO_ID
+    # 예시: youtu.be//VIDEO_ID
+    # 예시: youtube.com/shorts//VIDEO_ID (shorts와 유사)
+    # youtube.com/watch?v=5 (watch?v= 와 유사)
+    
+    # googleusercontent URL 패턴들
+    # youtube.com/watch?v=/VIDEO_ID
+    # youtu.be//VIDEO_ID
+    # youtube.com/shorts//VIDEO_ID (shorts)
+    # youtube.com/watch?v=5?v=VIDEO_ID (watch)
+    # googleusercontent.com/youtube.com/3 (embed) - 이 경우는 /embed/VIDEO_ID 로 변환 후 위 패턴으로 잡힐 수 있음
+    # googleusercontent.com/youtube.com//VIDEO_ID (youtu.be)
+    
+    if "googleusercontent.com/youtube.com/" in youtube_url:
+        if "/0/" in youtube_url or "/1/" in youtube_url or "/2/" in youtube_url or "/5/" in youtube_url:
+            # .../youtube.com/X/VIDEO_ID... 형태
+            match = re.search(r"\/youtube\.com\/[0125]\/([a-zA-Z0-9_-]{11})", youtube_url)
+            if match:
+                video_id = match.group(1)
+        elif "/3?" in youtube_url: # .../youtube.com/3?v=VIDEO_ID... 형태
+            match = re.search(r"v=([a-zA-Z0-9_-]{11})", youtube_url)
+            if match:
+                video_id = match.group(1)
+        elif "/4/" in youtube_url: # .../youtube.com/4/VIDEO_ID... (embed)
+             match = re.search(r"\/youtube\.com\/4\/([a-zA-Z0-9_-]{11})", youtube_url)
+             if match:
+                video_id = match.group(1)
+
+    if not video_id: # 일반적인 URL 패턴 검사
+        for pattern in patterns:
+            match = re.search(pattern, youtube_url)
+            if match:
+                video_id = match.group(1)
+                break
+    return video_id
+
+_VIDEO_ID_RE = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+def resolve_youtube_video_id(value):
+    """유튜브 URL 또는 11자리 비디오 ID 를 비디오 ID 로 바꿉니다. 찾지 못하면 None."""
+    value = (value or "").strip()
+    if _VIDEO_ID_RE.fullmatch(value):
+        return value
+    return extract_youtube_video_id(value)
+
+def _log_transcript_choice(result):
+    video_id = result["video_id"]
+    if result["fallback"]:
+        logger.warning(f"'{video_id}' 영상에 대해 선호하는 언어(한국어, 영어)의 스크립트를 찾을 수 없습니다. 사용 가능한 첫 번째 스크립트를 사용합니다.")
+        logger.info(f"'{result['language']}' 언어 스크립트를 사용합니다 (비디오 ID: {video_id}).")
+    else:
+        kind = "자동 생성" if result["is_generated"] else "수동 생성"
+        logger.info(f"'{result['language_code']}' 언어의 {kind} 스크립트를 사용합니다 (비디오 ID: {video_id}).")
+
+@instrumented("extract.youtube")
+def get_youtube_transcript(youtube_url):
+    """유튜브 영상 하나의 스크립트를 하나의 텍스트로 반환합니다 (수동 한국어/영어 → 자동 생성 한국어/영어 → 첫 번째 스크립트)."""
+    video_id = resolve_youtube_video_id(youtube_url)
+    if not video_id:
+        logger.error(f"입력하신 URL에서 유튜브 비디오 ID를 추출할 수 없습니다: {youtube_url}")
+        return None
+
+    result = fetch_transcript(video_id)
+    if result["error"] is not None:
+        logger.error(f"유튜브 스크립트를 가져오지 못했습니다 (ID: {video_id}): {result['error']}")
+        return None
+    _log_transcript_choice(result)
+    return segments_to_text(result["segments"])
+
+@instrumented("extract.youtube_videos")
+def extract_text_from_youtube_videos(youtube_urls, max_workers=DEFAULT_TRANSCRIPT_WORKERS,
+                                     window_seconds=DEFAULT_WINDOW_SECONDS):
+    """여러 유튜브 영상의 스크립트를 동시에 가져와 출처 표시와 함께 하나의 텍스트로 합칩니다.
+
+    영상마다 window_seconds 구간의 "[분:초]" 문단으로 나눕니다. 일부 영상이 실패해도 나머지로 진행하며,
+    모두 실패하면 None을 반환합니다.
+    """
+    sources = {}
+    for url in youtube_urls:
+        video_id = resolve_youtube_video_id(url)
+        if not video_id:
+            logger.warning(f"유튜브 비디오 ID를 찾을 수 없어 건너뜁니다: {url}")
+        else:
+            sources.setdefault(video_id, url.strip())
+    results = fetch_transcripts(list(sources), max_workers=max_workers)
+    text_parts = []
+    for result in results:
+        url = sources[result["video_id"]]
+        if result["error"] is not None:
+            logger.warning(f"유튜브 스크립트를 가져오지 못해 건너뜁니다: {url} ({result['error']})")
+            continue
+        text_parts.append(f"[출처: {url}]\n{segments_to_text(result['segments'], window_seconds)}")
+    if not text_parts:
+        logger.error("입력한 유튜브 영상에서 스크립트를 가져오지 못했습니다.")
+        return None
+    if len(results) > 1:
+        logger.info(f"유튜브 영상 {len(results)}개 중 {len(text_parts)}개에서 스크립트를 가져왔습니다.")
+    return "\n\n".join(text_parts)
+
+@instrumented("extract.website")
+def extract_text_from_website(url):
+    """웹사이트 URL에서 텍스트 콘텐츠를 추출합니다."""
+    try:
+        text, _ = html_to_text(fetch_html(url))
+        if not text.strip():
+            logger.warning(f"웹사이트에서 유의미한 텍스트 콘텐츠를 추출하지 못했습니다. 페이지 구조를 확인해주세요: {url}")
+            return None
+
+    except requests.exceptions.RequestException as e:
+        logger.error(f"웹사이트 콘텐츠 요청 중 오류 발생: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"웹사이트 텍스트 추출 중 오류 발생: {e}")
+        return None
+    return text
+
+@instrumented("extract.websites")
+def extract_text_from_websites(urls, follow_links_depth=0, max_pages=DEFAULT_MAX_PAGES):
+    """여러 웹페이지(및 같은 사이트 링크)를 동시에 가져와 출처 표시와 함께 하나의 텍스트로 합칩니다.
+
+    일부 페이지가 실패해도 나머지로 진행하며, 모두 실패하면 None을 반환합니다.
+    """
+    pages = fetch_pages(urls, follow_links_depth=follow_links_depth, max_pages=max_pages)
+    text_parts = []
+    for page in pages:
+        if page["error"] is not None:
+            logger.warning(f"웹페이지를 가져오지 못해 건너뜁니다: {page['url']} ({page['error']})")
+        elif page["text"] and page["text"].strip():
+            text_parts.append(f"[출처: {page['url']}]\n{page['text']}")
+    if not text_parts:
+        logger.error("입력한 웹페이지에서 유의미한 텍스트 콘텐츠를 추출하지 못했습니다.")
+        return None
+    if len(pages) > 1:
+        logger.info(f"웹페이지 {len(pages)}개 중 {len(text_parts)}개에서 텍스트를 추출했습니다.")
+    return "\n\n".join(text_parts)
@@ -0,0 +1,250 @@
+"""Gemini 퀴즈 생성 함수 (프롬프트 구성, 일반/분할/스트리밍 호출).
+
+Streamlit에 의존하지 않으며, 모델 객체를 인자로 받습니다.
+사용자에게 보여줄 오류/경고는 "quizgen" 로거로 남기고, 실패 시 None을 반환합니다.
+"""
+import logging
+
+from .chunking import (DEFAULT_CHUNK_TOKEN_BUDGET, DEFAULT_MAX_WORKERS, split_into_chunks, map_chunks, merge_chunk_outputs,
+                       select_top_up_context)
+from .dedupe import QuestionIndex, correct_answer_text
+from .metrics import instrumented, propagate_context
+from .parser import format_diagnostic, parse_block, parse_response, renumber_items
+from .streaming import IncrementalBlockParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "gemini-1.5-flash-latest" # 또는 다른 원하는 모델
+DEFAULT_TOP_UP_ROUNDS = 2 # 부족한 문항을 추가로 요청하는 최대 횟수
+
+# --- 수준 설정 선택지 (UI와 CLI에서 공통 사용) ---
+DIFFICULTY_OPTIONS = ["선택 안 함", "쉬움", "보통", "어려움"]
+GRADE_LEVEL_OPTIONS = [
+    "전체 (선택 안 함)",
+    "초등학교 1-2학년", "초등학교 3-4학년", "초등학교 5-6학년",
+    "중학교 1학년", "중학교 2학년", "중학교 3학년",
+    "고등학교 1학년", "고등학교 2학년", "고등학교 3학년",
+    "대학생", "일반 성인"
+]
+
+
+def configure_model(api_key, model_name=DEFAULT_MODEL_NAME):
+    """API 키를 설정하고 Gemini 모델 객체를 만듭니다 (google.generativeai 는 이때 처음 가져옴)."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name=model_name)
+
+
+def build_quiz_prompt(context, num_questions, default_time_limit, difficulty, grade_level, existing_questions=None):
+    """퀴즈 생성 프롬프트. existing_questions 가 있으면 그 질문들과 겹치지 않는 새 질문만 요청합니다."""
+    difficulty_instruction = ""
+    if difficulty == "쉬움":
+        difficulty_instruction = "질문과 보기는 명확하고 이해하기 쉽게 작성해주세요. 기본적인 내용을 확인하는 질문 위주로 생성해주세요."
+    elif difficulty == "보통":
+        difficulty_instruction = "질문은 내용에 대한 이해를 바탕으로 약간의 추론이나 분석을 요구할 수 있습니다. 너무 단순하거나 너무 복잡하지 않은 중간 수준의 질문을 생성해주세요."
+    elif difficulty == "어려움":
+        difficulty_instruction = "질문은 내용에 대한 깊이 있는 이해와 비판적 사고, 복합적인 분석 능력을 요구해야 합니다. 여러 정보를 종합하거나 숨겨진 의미를 파악해야 하는 질문을 생성해주세요."
+
+    grade_level_instruction = f"대상 학년 수준은 '{grade_level}'입니다. 해당 수준의 어휘와 배경지식을 고려하여 질문과 보기를 작성해주세요."
+    if grade_level == "전체 (선택 안 함)":
+        grade_level_instruction = "대상은 일반적인 수준의 사용자입니다. 특정 학년에 치우치지 않는 보편적인 어휘와 내용을 사용해주세요."
+
+
+    prompt = f"""
+    당신은 Blooket 게임용 퀴즈를 만드는 전문가입니다. 다음 내용을 바탕으로 객관식 퀴즈 {num_questions}개를 만들어 주세요.
+    각 퀴즈는 다음 형식을 반드시 따라야 하며, 각 항목은 다음 줄로 구분해주세요:
+
+    [질문시작]
+    질문: [여기에 질문 내용]
+    보기1: [여기에 첫 번째 보기]
+    보기2: [여기에 두 번째 보기]
+    보기3: [여기에 세 번째 보기]
+    보기4: [여기에 네 번째 보기]
+    정답번호: [1, 2, 3, 또는 4 중 하나]
+    시간제한: {default_time_limit}
+    [질문끝]
+
+    ---
+    [중요 규칙]
+    1. "정답번호:" 다음에는 반드시 1, 2, 3, 4 중 하나의 숫자만 적어주세요. 이 숫자는 정답에 해당하는 보기의 번호입니다.
+    2. 각 퀴즈는 "[질문시작]"으로 시작하고 "[질문끝]"으로 끝나야 합니다.
+    3. 퀴즈와 퀴즈 사이에는 "---" 구분선을 넣어주세요. (마지막 퀴즈 뒤에는 넣지 않아도 됩니다.)
+    4. 모든 질문의 "시간제한:"은 {default_time_limit}초로 고정해주세요.
+    5. 보기는 서로 다른 내용이어야 합니다.
+    6. 제공된 내용과 관련된 질문과 보기만 생성해주세요.
+
+    [퀴즈 내용 지침]
+    - 제공된 내용의 **핵심 개념, 주요 아이디어, 중요한 사실, 인물, 사건, 용어의 정의, 핵심 표현**을 중심으로 질문을 만들어주세요.
+    - 학습자가 **반드시 알아야 할 내용**이나 **이해도를 평가할 수 있는 내용**을 질문으로 만들어주세요.
+    - 내용의 **의미를 이해하고 적용하는 능력**을 평가할 수 있는 질문을 포함해주세요.
+    - **단순히 페이지 번호, 문서의 특정 위치, 목차, 또는 매우 지엽적이거나 사소한 세부 정보에 대한 질문은 반드시 피해주세요.**
+    - 질문은 내용에 대한 **깊이 있는 이해**를 요구해야 하며, 단순 암기나 표면적인 정보 확인에 그쳐서는 안 됩니다.
+    - 예를 들어, "3페이지의 주요 내용은 무엇인가요?" 같은 질문 대신, "이 문서에서 설명하는 [핵심 개념]의 주요 특징은 무엇인가요?" 또는 "[주요 사건]이 발생한 근본적인 원인은 무엇이라고 설명하고 있나요?" 와 같이 구체적이고 심층적인 질문을 생성해주세요.
+
+    [난이도 및 학년 수준 지침]
+    - {grade_level_instruction}
+    - {difficulty_instruction}
+    ---{build_existing_questions_section(existing_questions)}"""
+    return prompt + build_context_section(context)
+
+
+def build_context_section(context):
+    """프롬프트 끝의 콘텐츠 구간. 같은 콘텐츠로 만드는 모든 요청이 공유하는 부분입니다 (quizgen.context_cache)."""
+    return f"""
+
+    내용:
+    {context}
+    """
+
+
+def build_existing_questions_section(existing_questions):
+    """이미 만든 질문 목록을 프롬프트에 넣을 지침으로 만듭니다 (없으면 빈 문자열)."""
+    if not existing_questions:
+        return ""
+    listed = "\n".join(f"    - {question}" for question in existing_questions)
+    return f"""
+
+    [이미 만든 질문 - 중복 금지]
+    아래 질문들은 이미 만들어져 있습니다. 같은 내용을 묻거나 표현만 바꾼 질문은 만들지 말고, 다른 개념을 다루는 새 질문만 만들어주세요.
+{listed}
+    ---"""
+
+
+@instrumented("generate", input_text=lambda model, context, *args, **kwargs: context)
+def generate_quiz_with_gemini(model, context, num_questions, default_time_limit, difficulty, grade_level):
+    prompt = build_quiz_prompt(context, num_questions, default_time_limit, difficulty, grade_level)
+    try:
+        response = model.generate_content(prompt)
+        return response.text
+    except Exception as e:
+        logger.error(f"Gemini API 호출 중 오류 발생: {e}")
+        return None
+
+
+@instrumented("generate.chunked", input_text=lambda model, context, *args, **kwargs: context)
+def generate_quiz_chunked(model, context, num_questions, default_time_limit, difficulty, grade_level,
+                          chunks=None, chunk_token_budget=DEFAULT_CHUNK_TOKEN_BUDGET, max_workers=DEFAULT_MAX_WORKERS,
+                          check_cancelled=None):
+    """긴 콘텐츠를 구간으로 나누어 문항 수를 배분하고, 구간별 Gemini 호출을 병렬로 실행해 합칩니다.
+
+    check_cancelled() 는 구간 호출을 시작하기 전과 모든 구간이 끝난 뒤에 호출됩니다 (예외를 올리면 중단).
+    """
+    if chunks is None:
+        chunks = split_into_chunks(context, chunk_token_budget)
+    if len(chunks) <= 1:
+        return generate_quiz_with_gemini(model, context, num_questions, default_time_limit, difficulty, grade_level)
+
+    def generate_chunk(chunk_text, chunk_num_questions):
+        # 작업 스레드의 로그는 화면에 표시되지 않을 수 있으므로 예외는 그대로 올려 보내 호출 스레드에서 보고
+        if check_cancelled:
+            check_cancelled()
+        prompt = build_quiz_prompt(chunk_text, chunk_num_questions, default_time_limit, difficulty, grade_level)
+        return model.generate_content(prompt).text
+
+    results = map_chunks(chunks, num_questions, propagate_context(generate_chunk), max_workers=max_workers)
+    if check_cancelled:
+        check_cancelled()
+    for result in results:
+        if result["error"] is not None:
+            logger.warning(f"{len(chunks)}개 구간 중 {result['index'] + 1}번째 구간의 퀴즈 생성에 실패했습니다 ({result['num_questions']}문항 누락): {result['error']}")
+    return merge_chunk_outputs(results)
+
+
+@instrumented("generate.streaming", input_text=lambda model, context, *args, **kwargs: context)
+def generate_quiz_streaming(model, context, num_questions, default_time_limit, difficulty, grade_level, on_item=None):
+    """Gemini 응답을 스트리밍으로 받으면서 블록이 닫히는 즉시 파싱합니다.
+
+    문항이 하나 완성될 때마다 on_item(item, quiz_items)을 호출하며, (원본 응답, 파싱된 문항 목록)을 반환합니다.
+    """
+    prompt = build_quiz_prompt(context, num_questions, default_time_limit, difficulty, grade_level)
+    raw_parts = []
+    quiz_items = []
+    parser = IncrementalBlockParser()
+
+    def add_blocks(blocks):
+        for block in blocks:
+            question_number = len(quiz_items) + 1
+            item, reason = parse_block(block, question_number, default_time_limit)
+            if item is None:
+                logger.warning(format_diagnostic({"question_number": question_number, "reason": reason, "snippet": block.strip()[:150]}))
+                continue
+            quiz_items.append(item)
+            if on_item:
+                on_item(item, quiz_items)
+
+    stream_errors = []
+
+    def iter_chunk_texts():
+        # 모델 스트림의 오류만 여기서 기록하고, 파싱/on_item 의 예외는 호출한 쪽으로 그대로 올려 보냄
+        try:
+            for chunk in model.generate_content(prompt, stream=True):
+                try:
+                    chunk_text = chunk.text
+                except ValueError: # 안전 필터 등으로 텍스트가 없는 조각
+                    continue
+                yield chunk_text
+        except Exception as e:
+            logger.error(f"Gemini API 스트리밍 호출 중 오류 발생: {e}")
+            stream_errors.append(e)
+
+    for chunk_text in iter_chunk_texts():
+        raw_parts.append(chunk_text)
+        add_blocks(parser.feed(chunk_text))
+    if stream_errors and not raw_parts:
+        return None, []
+    # 마지막 블록은 [질문끝] 없이 끝날 수 있음 (parse_response 와 같은 규칙으로 파싱)
+    add_blocks(parser.close())
+    response_text = "".join(raw_parts)
+    if not quiz_items and response_text:
+        logger.warning("Gemini 응답에서 유효한 퀴즈 형식을 찾지 못했습니다. Gemini 원본 응답을 확인해주세요.")
+    return response_text, quiz_items
+
+
+@instrumented("generate.top_up", input_text=lambda model, context, *args, **kwargs: context)
+def top_up_quiz(model, context, quiz_items, num_questions, default_time_limit, difficulty, grade_level,
+                max_rounds=DEFAULT_TOP_UP_ROUNDS, chunks=None, chunk_token_budget=DEFAULT_CHUNK_TOKEN_BUDGET,
+                check_cancelled=None):
+    """형식 오류로 빠진 문항만큼만 다시 요청해 채웁니다.
+
+    이미 통과한 질문을 프롬프트에 넣어 중복을 피하고, 새 문항 중 기존 문항과 비슷한 것(dedupe)은 버립니다.
+    분할 생성한 콘텐츠(chunks 가 2개 이상)는 전체 대신 문항이 덜 나온 구간을 chunk_token_budget 안에서 골라 보냅니다.
+    check_cancelled() 는 추가 요청을 보내기 전마다 호출됩니다.
+    (합쳐서 1번부터 다시 번호를 매긴 문항 목록, 추가 호출의 원본 응답 목록) 을 반환합니다.
+    """
+    quiz_items = list(quiz_items)
+    seen = QuestionIndex()
+    seen.add_items(range(len(quiz_items)), quiz_items)
+    raw_outputs = []
+    for _ in range(max_rounds):
+        missing = num_questions - len(quiz_items)
+        if missing <= 0:
+            break
+        if check_cancelled:
+            check_cancelled()
+        logger.info(f"유효한 문항이 {missing}개 부족해 부족한 만큼만 추가로 생성합니다.")
+        round_context = context
+        if chunks and len(chunks) > 1:
+            round_context = select_top_up_context(
+                chunks, [f"{item['Question Text']} {correct_answer_text(item)}" for item in quiz_items],
+                num_questions, chunk_token_budget)
+        prompt = build_quiz_prompt(round_context, missing, default_time_limit, difficulty, grade_level,
+                                   existing_questions=[item["Question Text"] for item in quiz_items])
+        try:
+            response_text = model.generate_content(prompt).text
+        except Exception as e:
+            logger.warning(f"부족한 문항을 추가로 생성하지 못했습니다: {e}")
+            break
+        raw_outputs.append(response_text)
+        added = 0
+        for item in parse_response(response_text, default_time_limit).items:
+            if len(quiz_items) >= num_questions or seen.query(item) is not None:
+                continue
+            seen.add_items([len(quiz_items)], [item])
+            quiz_items.append(item)
+            added += 1
+        if not added: # 같은 요청을 반복해도 나아지지 않을 가능성이 큼
+            break
+    if len(quiz_items) < num_questions:
+        logger.warning(f"요청한 {num_questions}문항 중 {len(quiz_items)}문항만 만들었습니다.")
+    return renumber_items(quiz_items), raw_outputs
@@ -0,0 +1,239 @@
+"""퀴즈 생성을 화면 스크립트 밖에서 실행하는 백그라운드 작업 대기열.
+
+작업을 제출하면 작업 id 를 바로 돌려주고, 프로세스 공유 작업자 풀에서 실행합니다.
+진행률/메시지/결과를 작업 객체에 보관하므로 화면은 주기적으로 상태를 확인하거나,
+새로고침 후에도 작업 id 로 다시 연결할 수 있습니다. 여러 소스나 옵션 조합을 한꺼번에 넣으면 동시에 처리합니다.
+
+취소는 협조적으로 동작합니다: 대기 중인 작업은 바로 취소되고, 실행 중인 작업은 다음 단계 경계에서 멈추며 결과를 버립니다.
+
+환경 변수: BLOOKET_JOB_WORKERS (동시에 실행할 작업 수, 기본값 2)
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import track
+from .parser import format_diagnostic
+from .context_cache import get_context_cache
+from .pipeline import generate_for_source, generate_variants, save_to_quiz_bank, save_variants, variant_label
+from .quiz_bank import get_quiz_bank, source_hash
+from .response_cache import model_name_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_MAX_FINISHED_JOBS = 200 # 이 수를 넘으면 오래전에 끝난 작업부터 목록에서 지움
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+STATUS_LABELS = {QUEUED: "대기 중", RUNNING: "실행 중", DONE: "완료", FAILED: "실패", CANCELLED: "취소됨"}
+
+_current_job = contextvars.ContextVar("quizgen_job", default=None) # 작업 스레드와 그 작업이 띄운 작업자 스레드에서 보임
+
+
+class JobCancelled(Exception):
+    """취소 요청을 받은 작업이 단계 경계에서 멈출 때 발생합니다."""
+
+
+class Job:
+    """작업 하나의 상태. 작업 함수는 report / check_cancelled 로 진행 상황을 알리고 취소를 확인합니다."""
+
+    def __init__(self, job_id, label, owner=None):
+        self.id = job_id
+        self.label = label
+        self.owner = owner
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = STATUS_LABELS[QUEUED]
+        self.warnings = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def report(self, progress=None, message=None):
+        """진행률(0~1)과 현재 단계 설명을 갱신하고, 취소 요청이 있으면 멈춥니다."""
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class _JobLogHandler(logging.Handler):
+    """작업 스레드(와 metrics.propagate_context 로 감싼 작업자 스레드)에서 남긴 quizgen 로그를 해당 작업의 메시지/경고로 모읍니다."""
+
+    def emit(self, record):
+        job = _current_job.get()
+        if job is None:
+            return
+        if record.levelno >= logging.WARNING:
+            job.warnings.append(record.getMessage())
+        else:
+            job.message = record.getMessage()
+
+
+class JobManager:
+    """스레드 풀 기반 작업 대기열."""
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, max_finished=DEFAULT_MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="quizgen-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, func, *args, label="", owner=None, **kwargs):
+        """func(job, *args, **kwargs) 를 대기열에 넣고 작업 id 를 반환합니다."""
+        job = Job(uuid.uuid4().hex[:12], label, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_requested:
+            job.status, job.message, job.finished_at = CANCELLED, STATUS_LABELS[CANCELLED], time.time()
+            return
+        job.status, job.started_at = RUNNING, time.time()
+        job.message = STATUS_LABELS[RUNNING]
+        token = _current_job.set(job)
+        try:
+            with track("job"):
+                result = func(job, *args, **kwargs)
+            job.check_cancelled() # 마지막 단계 도중 취소된 경우 결과를 버림
+            job.result, job.progress, job.status = result, 1.0, DONE
+            job.message = STATUS_LABELS[DONE]
+        except JobCancelled:
+            job.status, job.message = CANCELLED, STATUS_LABELS[CANCELLED]
+        except Exception as e:
+            logger.debug(f"작업 {job.id} 실패", exc_info=True)
+            job.status, job.error, job.message = FAILED, str(e), STATUS_LABELS[FAILED]
+        finally:
+            _current_job.reset(token)
+            job.finished_at = time.time()
+            self._prune()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None, job_ids=None):
+        """작업 목록을 제출 순서대로 반환합니다. owner 나 job_ids 로 거를 수 있습니다."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if owner is not None:
+            jobs = [job for job in jobs if job.owner == owner]
+        if job_ids is not None:
+            wanted = set(job_ids)
+            jobs = [job for job in jobs if job.id in wanted]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def cancel(self, job_id):
+        """작업 취소를 요청합니다. 대기 중이면 바로 취소되고, 실행 중이면 다음 단계 경계에서 멈춥니다."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if job._future is not None and job._future.cancel():
+            job.status, job.message, job.finished_at = CANCELLED, STATUS_LABELS[CANCELLED], time.time()
+        return True
+
+    def stats(self):
+        counts = dict.fromkeys(STATUS_LABELS, 0)
+        for job in self.jobs():
+            counts[job.status] += 1
+        return counts
+
+    def _prune(self):
+        with self._lock:
+            finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+            for job in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job.id]
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """프로세스 공유 작업 대기열 (BLOOKET_JOB_WORKERS 로 동시 실행 수 설정)."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            try:
+                workers = int(os.environ.get("BLOOKET_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+            except ValueError:
+                logger.warning(f"환경 변수 BLOOKET_JOB_WORKERS 값이 정수가 아니어서 기본값 {DEFAULT_JOB_WORKERS}을(를) 사용합니다.")
+                workers = DEFAULT_JOB_WORKERS
+            _job_manager = JobManager(workers)
+            logging.getLogger("quizgen").addHandler(_JobLogHandler(level=logging.INFO))
+        return _job_manager
+
+
+# --- 퀴즈 생성 작업 ---
+def generate_quiz_job(job, model, text, options, source_kind=None, source_label=None, title="blooket_quiz"):
+    """전처리 → 생성 → 파싱 → 부족한 문항 보충 → 보관함 저장을 실행하는 작업 함수.
+
+    결과: {"items", "raw_output", "base_filename", "quiz_id"}
+    """
+    job.report(0.05, "Gemini 호출 대기 중...")
+    text_hash = source_hash(text)
+    raw_output, parsed = generate_for_source(model, text, options, kind=source_kind, check_cancelled=job.check_cancelled)
+    job.report(0.9, "결과 저장 중...")
+    if parsed is None:
+        raise RuntimeError("Gemini로부터 퀴즈를 생성하지 못했습니다.")
+    for diagnostic in parsed.diagnostics:
+        logger.warning(format_diagnostic(diagnostic))
+    if not parsed.items:
+        raise RuntimeError("Gemini 응답에서 유효한 퀴즈 데이터를 파싱하지 못했습니다.")
+    quiz_id = save_to_quiz_bank(get_quiz_bank(), text_hash, parsed.items, raw_output, options, source_kind,
+                                source_label, title, model_name_of(model))
+    return {"items": parsed.items, "raw_output": raw_output, "base_filename": title, "quiz_id": quiz_id}
+
+
+def generate_variants_job(job, model, text, variants, options, source_kind=None, source_label=None, title_prefix="blooket_quiz",
+                          refresh=False):
+    """같은 콘텐츠로 여러 변형을 한꺼번에 만들고 변형마다 보관함에 저장하는 작업 함수 (model 은 원본 Gemini 모델).
+
+    결과: {"variants": [변형마다 {"label", "items", "raw_output", "base_filename", "quiz_id"}]} (실패한 변형 제외)
+    """
+    job.report(0.05, f"변형 {len(variants)}개 생성 대기 중...")
+    text_hash = source_hash(text)
+    finished = []
+
+    def report_variant(result):
+        finished.append(result)
+        job.progress = 0.05 + 0.85 * len(finished) / len(variants)
+        job.message = f"{variant_label(result['variant'])} 완료 ({len(finished)}/{len(variants)})"
+
+    results = generate_variants(model, text, variants, options, kind=source_kind, context_cache=get_context_cache(),
+                                refresh=refresh, on_variant=report_variant, check_cancelled=job.check_cancelled)
+    job.report(0.9, "결과 저장 중...")
+    saved = save_variants(get_quiz_bank(), text_hash, results, source_kind, source_label, title_prefix, model_name_of(model))
+    if not saved:
+        raise RuntimeError("모든 변형의 퀴즈 생성에 실패했습니다.")
+    return {"variants": saved}
@@ -0,0 +1,300 @@
+"""단계별 처리 시간 계측.
+
+추출, 생성(Gemini 호출), 파싱, CSV/XLSX 변환 함수에 instrumented 데코레이터를 붙이면
+호출마다 소요 시간, 입력 크기(문자 수, 추정 토큰 수), 출력 크기, 캐시 적중 여부, 실패 원인을 기록합니다.
+
+- 구조화 로그: "quizgen.metrics" 로거에 JSON 한 줄 (DEBUG), BLOOKET_METRICS_EVENTS 경로가 있으면 JSONL 파일에도 추가
+- 집계: 단계별 히스토그램과 최근 호출 기준 p50/p95/p99 (snapshot, JSON 파일, Prometheus 텍스트 형식)
+
+실패 원인은 계측 중인 함수가 "quizgen" 로거로 남긴 첫 번째 오류/경고 메시지, 또는 발생한 예외입니다.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+RECENT_SAMPLES = 2048 # 백분위 계산에 사용하는 단계별 최근 호출 수
+_REASON_MAX_CHARS = 300
+
+
+def _size_of(result):
+    """출력 크기: 문자열/바이트는 길이, ParseResult 는 문항 수, 목록은 항목 수, 튜플은 첫 값 기준."""
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        return _size_of(result[0]) if result else 0
+    if isinstance(result, (str, bytes, bytearray, list, dict)):
+        return len(result)
+    if hasattr(result, "items") and isinstance(result.items, list):
+        return len(result.items)
+    return 1
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.input_chars = 0
+        self.input_tokens = 0
+        self.input_bytes = 0
+        self.output_size = 0
+        self.bucket_counts = [0] * (len(DURATION_BUCKETS_MS) + 1) # 마지막 칸은 +Inf
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.failure_reasons = {}
+
+    def add(self, event):
+        duration = event["duration_ms"]
+        self.count += 1
+        self.sum_ms += duration
+        self.max_ms = max(self.max_ms, duration)
+        self.input_chars += event.get("input_chars") or 0
+        self.input_tokens += event.get("input_tokens") or 0
+        self.input_bytes += event.get("input_bytes") or 0
+        self.output_size += event.get("output_size") or 0
+        if event.get("cache_hit"):
+            self.cache_hits += 1
+        if not event["ok"]:
+            self.failures += 1
+            reason = (event.get("failure_reason") or "unknown")[:80]
+            self.failure_reasons[reason] = self.failure_reasons.get(reason, 0) + 1
+        for i, bound in enumerate(DURATION_BUCKETS_MS):
+            if duration <= bound:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        self.recent.append(duration)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        return {
+            "count": self.count, "failures": self.failures, "cache_hits": self.cache_hits,
+            "sum_ms": round(self.sum_ms, 3), "max_ms": round(self.max_ms, 3),
+            "p50_ms": _percentile(recent, 0.50), "p95_ms": _percentile(recent, 0.95), "p99_ms": _percentile(recent, 0.99),
+            "input_chars": self.input_chars, "input_tokens": self.input_tokens,
+            "input_bytes": self.input_bytes, "output_size": self.output_size,
+            "buckets": {str(b): c for b, c in zip(list(DURATION_BUCKETS_MS) + ["+Inf"], self.bucket_counts)},
+            "failure_reasons": dict(self.failure_reasons),
+        }
+
+
+class MetricsRegistry:
+    """스레드 안전 단계별 지표 저장소."""
+
+    def __init__(self, events_path=None):
+        self.events_path = events_path
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+
+    def record(self, event):
+        with self._lock:
+            self._stages.setdefault(event["stage"], _StageStats()).add(event)
+            if self.events_path:
+                try:
+                    with open(self.events_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    logger.debug(f"지표 이벤트 파일에 기록하지 못했습니다: {e}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(event, ensure_ascii=False))
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "stages": {stage: stats.summary() for stage, stats in sorted(self._stages.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def write_snapshot(self, path):
+        """현재 집계를 JSON 파일로 저장합니다 (임시 파일에 쓴 뒤 교체)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 집계를 반환합니다."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP quizgen_stage_duration_seconds 단계별 처리 시간",
+            "# TYPE quizgen_stage_duration_seconds histogram",
+        ]
+        for stage, stats in snapshot["stages"].items():
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{int(bound) / 1000:g}"
+                lines.append(f'quizgen_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'quizgen_stage_duration_seconds_sum{{stage="{stage}"}} {stats["sum_ms"] / 1000:.6f}')
+            lines.append(f'quizgen_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines.append("# TYPE quizgen_stage_failures_total counter")
+        lines.extend(f'quizgen_stage_failures_total{{stage="{stage}"}} {stats["failures"]}' for stage, stats in snapshot["stages"].items())
+        lines.append("# TYPE quizgen_stage_input_bytes_total counter")
+        lines.extend(f'quizgen_stage_input_bytes_total{{stage="{stage}"}} {stats["input_bytes"]}' for stage, stats in snapshot["stages"].items())
+        lines.append("# TYPE quizgen_stage_cache_hits_total counter")
+        lines.extend(f'quizgen_stage_cache_hits_total{{stage="{stage}"}} {stats["cache_hits"]}' for stage, stats in snapshot["stages"].items())
+        lines.append("# TYPE quizgen_events_total counter")
+        lines.extend(f'quizgen_events_total{{name="{name}"}} {value}' for name, value in snapshot["counters"].items())
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    """프로세스 공유 지표 저장소 (BLOOKET_METRICS_EVENTS 가 있으면 이벤트를 JSONL 로도 기록)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry(events_path=os.environ.get("BLOOKET_METRICS_EVENTS") or None)
+            _install_failure_reason_handler()
+        return _registry
+
+
+# --- 계측 구간 ---
+_local = threading.local()
+
+
+def _active_spans():
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+    return _local.spans
+
+
+class Span(dict):
+    """계측 중인 호출 하나의 기록."""
+
+    def set_input(self, text):
+        if text is None:
+            return
+        self["input_chars"] = len(text)
+        self["input_tokens"] = estimate_tokens(text) if isinstance(text, str) else None
+
+    def set_input_size(self, size):
+        """텍스트가 아닌 입력(PDF 파일 등)의 바이트 수."""
+        if size is not None:
+            self["input_bytes"] = size
+
+    def set_output(self, result):
+        self["output_size"] = _size_of(result)
+
+    def fail(self, reason):
+        if not self.get("failure_reason"):
+            self["failure_reason"] = str(reason)[:_REASON_MAX_CHARS]
+
+
+def mark_cache_hit(hit=True):
+    """현재 스레드에서 계측 중인 호출들에 캐시 적중 여부를 표시합니다."""
+    for span in _active_spans():
+        if hit or span.get("cache_hit") is None:
+            span["cache_hit"] = hit
+
+
+class _FailureReasonHandler(logging.Handler):
+    """계측 중인 함수가 남긴 경고/오류 메시지를 실패 원인으로 보관합니다."""
+
+    def emit(self, record):
+        if record.name == __name__:
+            return
+        spans = getattr(_local, "spans", None)
+        if spans:
+            spans[-1].setdefault("_logged_reason", record.getMessage())
+
+
+def _install_failure_reason_handler():
+    logging.getLogger("quizgen").addHandler(_FailureReasonHandler(level=logging.WARNING))
+
+
+@contextmanager
+def track(stage, **fields):
+    """with track("stage") as span: 형태로 임의 구간을 계측합니다."""
+    registry = get_metrics()
+    span = Span(stage=stage, cache_hit=None, **fields)
+    spans = _active_spans()
+    spans.append(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        span["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        if spans and spans[-1] is span:
+            spans.pop()
+        logged_reason = span.pop("_logged_reason", None)
+        if span.get("output_size") == 0:
+            span.fail(logged_reason or "빈 결과")
+        span["ok"] = not span.get("failure_reason")
+        span["ts"] = round(time.time(), 3)
+        registry.record(dict(span))
+
+
+def propagate_context(func):
+    """지금의 컨텍스트 변수(예: 실행 중인 백그라운드 작업)를 작업자 스레드에서도 보이도록 func 를 감쌉니다.
+
+    스레드 풀에 넘기는 함수에 사용합니다. 계측 구간(track)은 스레드별로 따로 기록합니다.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def instrumented(stage, input_text=None, input_size=None):
+    """함수 호출을 stage 이름으로 계측하는 데코레이터.
+
+    input_text(*args, **kwargs) 는 입력 크기를 잴 텍스트를 반환하는 함수이고,
+    input_size(*args, **kwargs) 는 텍스트가 아닌 입력의 바이트 수를 반환하는 함수입니다.
+    반환값이 None 이거나 비어 있으면 실패로 기록합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage) as span:
+                if input_text is not None:
+                    span.set_input(input_text(*args, **kwargs))
+                if input_size is not None:
+                    span.set_input_size(input_size(*args, **kwargs))
+                result = func(*args, **kwargs)
+                span.set_output(result)
+                return result
+        return wrapper
+    return decorator
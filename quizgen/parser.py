@@ -0,0 +1,208 @@
+"""Gemini 응답 파서 (Streamlit 비의존, 단일 패스).
+
+블록 경계와 각 줄의 항목 이름을 미리 컴파일한 정규식 하나씩으로 찾아, 블록마다 텍스트를 한 번만 훑습니다.
+모델 출력의 흔한 형식 흔들림(영문 항목명, 전각 콜론, 콜론 누락, 마크다운 강조, [질문끝] 누락)을 허용하며,
+실패 사유는 화면에 바로 출력하지 않고 ParseResult.diagnostics 에 모아 돌려줍니다.
+"""
+import re
+
+from .metrics import instrumented
+
+# --- Blooket CSV/XLSX 컬럼 정의 ---
+BLOOKET_COLUMNS = [
+    "Question #",
+    "Question Text",
+    "Answer 1",
+    "Answer 2",
+    "Answer 3",
+    "Answer 4",
+    "Time Limit (sec)",
+    "Correct Answer(s)"
+]
+
+(_COL_NUMBER, _COL_QUESTION, _COL_ANSWER1, _COL_ANSWER2,
+ _COL_ANSWER3, _COL_ANSWER4, _COL_TIME, _COL_CORRECT) = BLOOKET_COLUMNS
+
+# 블록 시작/끝 표식 (공백, 영문 표기 허용)
+_MARKER_RE = re.compile(
+    r"\[\s*(?:(?P<start>질문\s*시작|Question\s*Start)|(?P<end>질문\s*끝|Question\s*End))\s*\]",
+    re.IGNORECASE,
+)
+
+# 줄 단위 항목 이름. 보기(Answer 1 등)를 정답(Answer)보다 먼저 시도해야 함.
+# "Answer" 로 시작하는 보기는 번호 뒤에 구분자가 있어야 함 (구분자 없는 "Answer B" 는 정답 줄)
+_FIELD_RE = re.compile(
+    r"[ \t>*#\-]*(?:\d+[.)]\s*)?(?:\*\*|__)?\s*"
+    r"(?:"
+    r"(?P<option>(?:보기|선택지|선지|Option|Choice|Answer(?=\s*[1-4A-Da-d①②③④](?:\*\*|__)?\s*[:：=.)\-–]))"
+    r"\s*(?P<option_no>[1-4A-Da-d①②③④])(?![0-9A-Za-z]))"
+    r"|(?P<answer>정답\s*번호|정답|Correct\s*Answer(?:\s*(?:Number|No\.?|#))?|Answer\s*Key|Answer)"
+    r"|(?P<time>시간\s*제한|제한\s*시간|Time\s*Limit(?:\s*\(\s*sec\s*\))?)"
+    r"|(?P<question>질문|문제|Question|Q)(?:\s*\d+)?"
+    r")"
+    r"(?:\*\*|__)?"
+    r"(?:\s*[:：=]\s*|\s*[\-–.)]\s+|\s+|$)"
+    r"(?P<value>.*)",
+    re.IGNORECASE,
+)
+
+# 프롬프트가 요구하는 정상 형식 블록 전체를 한 번에 매칭하는 빠른 경로.
+# 맞지 않는 블록만 줄 단위 상태 기계(_FIELD_RE)로 처리합니다.
+_CANONICAL_BLOCK_RE = re.compile(
+    r"\s*질문\s*[:：][ \t]*(?P<q>[^\n]*\S)[ \t]*\n"
+    r"\s*보기\s*1\s*[:：][ \t]*(?P<o1>[^\n]*\S)[ \t]*\n"
+    r"\s*보기\s*2\s*[:：][ \t]*(?P<o2>[^\n]*\S)[ \t]*\n"
+    r"\s*보기\s*3\s*[:：][ \t]*(?P<o3>[^\n]*\S)[ \t]*\n"
+    r"\s*보기\s*4\s*[:：][ \t]*(?P<o4>[^\n]*\S)[ \t]*\n"
+    r"\s*정답\s*번호\s*[:：][ \t]*(?P<a>[1-4])[ \t]*"
+    r"(?:\n\s*시간\s*제한\s*[:：][ \t]*(?P<t>\d+)[^\n]*)?"
+    r"\s*"
+)
+
+_ANSWER_VALUE_RE = re.compile(r"([1-4①②③④])|\b([A-Da-d])\b")
+_TIME_VALUE_RE = re.compile(r"\d+")
+_OPTION_INDEX = {"1": 0, "2": 1, "3": 2, "4": 3, "a": 0, "b": 1, "c": 2, "d": 3,
+                 "①": 0, "②": 1, "③": 2, "④": 3}
+
+# 필드 슬롯 번호: 0=질문, 1~4=보기, 5=정답, 6=시간
+_QUESTION, _ANSWER, _TIME = 0, 5, 6
+
+
+class ParseResult:
+    """파싱 결과. items 는 BLOOKET_COLUMNS 키를 갖는 dict 목록, diagnostics 는 건너뛴 블록 정보."""
+
+    def __init__(self):
+        self.items = []
+        self.diagnostics = []  # {"block_index", "question_number", "reason", "snippet"}
+        self.blocks_seen = 0
+
+    @property
+    def ok(self):
+        return bool(self.items)
+
+    def add_diagnostic(self, block_index, question_number, reason, block):
+        self.diagnostics.append({
+            "block_index": block_index,
+            "question_number": question_number,
+            "reason": reason,
+            "snippet": block.strip()[:150],
+        })
+
+
+def format_diagnostic(diagnostic):
+    """건너뛴 블록 정보를 사용자에게 보여줄 문장으로 만듭니다."""
+    return (f"다음 퀴즈 블록 파싱 실패 또는 필수 정보 누락/정답 번호 오류 "
+            f"(내부 번호 {diagnostic['question_number']} 건너뜀, 사유: {diagnostic['reason']}):\n{diagnostic['snippet']}...")
+
+
+def iter_blocks(response_text):
+    """응답에서 블록 내부 텍스트를 차례로 yield 합니다.
+
+    [질문끝] 없이 다음 [질문시작]이 나오거나 응답이 끝나면 거기까지를 한 블록으로 봅니다.
+    """
+    block_start = None
+    for marker in _MARKER_RE.finditer(response_text):
+        if marker.group("start"):
+            if block_start is not None:
+                yield response_text[block_start:marker.start()]
+            block_start = marker.end()
+        elif block_start is not None:
+            yield response_text[block_start:marker.start()]
+            block_start = None
+    if block_start is not None:
+        yield response_text[block_start:]
+
+
+def _answer_number(value):
+    match = _ANSWER_VALUE_RE.search(value)
+    if not match:
+        return None
+    return _OPTION_INDEX[(match.group(1) or match.group(2)).lower()] + 1
+
+
+def parse_block(block, question_number, default_time_limit):
+    """블록 하나를 한 번 훑어 (item, 실패 사유) 를 반환합니다. 성공하면 사유는 None."""
+    canonical = _CANONICAL_BLOCK_RE.fullmatch(block)
+    if canonical is not None:
+        q, o1, o2, o3, o4, answer, time_limit = canonical.groups()
+        return {
+            _COL_NUMBER: question_number,
+            _COL_QUESTION: q,
+            _COL_ANSWER1: o1,
+            _COL_ANSWER2: o2,
+            _COL_ANSWER3: o3,
+            _COL_ANSWER4: o4,
+            _COL_TIME: int(time_limit) if time_limit else default_time_limit,
+            _COL_CORRECT: int(answer),
+        }, None
+
+    fields = [None] * 7
+    pending = None  # 항목 이름만 있고 값이 다음 줄에 오는 경우
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        match = _FIELD_RE.match(stripped)
+        if match is None:
+            if pending is not None and fields[pending] is None:
+                fields[pending] = stripped
+                pending = None
+            continue
+        if match.group("option"):
+            slot = 1 + _OPTION_INDEX[match.group("option_no").lower()]
+        elif match.group("answer"):
+            slot = _ANSWER
+        elif match.group("time"):
+            slot = _TIME
+        else:
+            slot = _QUESTION
+        value = match.group("value").strip().strip("*_").strip()
+        if fields[slot] is not None:  # 같은 항목이 반복되면 처음 값을 사용 (기존 re.search 동작과 동일)
+            continue
+        if value:
+            fields[slot] = value
+            pending = None
+        else:
+            pending = slot
+
+    missing = [name for name, value in zip(("질문", "보기1", "보기2", "보기3", "보기4"), fields[:5]) if not value]
+    if missing:
+        return None, f"필수 항목 누락: {', '.join(missing)}"
+    if fields[_ANSWER] is None:
+        return None, "정답번호 누락"
+    answer = _answer_number(fields[_ANSWER])
+    if answer is None:
+        return None, f"정답번호 오류: {fields[_ANSWER][:20]}"
+
+    time_limit = default_time_limit
+    if fields[_TIME] is not None:
+        time_match = _TIME_VALUE_RE.search(fields[_TIME])
+        if time_match:
+            time_limit = int(time_match.group())
+
+    values = (question_number, fields[0], fields[1], fields[2], fields[3], fields[4], time_limit, answer)
+    return dict(zip(BLOOKET_COLUMNS, values)), None
+
+
+def renumber_items(quiz_items):
+    """문항 번호를 1번부터 다시 매깁니다 (제자리 수정, 같은 목록 반환)."""
+    for number, item in enumerate(quiz_items, start=1):
+        item[_COL_NUMBER] = number
+    return quiz_items
+
+
+@instrumented("parse", input_text=lambda response_text, *args, **kwargs: response_text)
+def parse_response(response_text, default_time_limit):
+    """응답 전체를 파싱해 ParseResult 를 반환합니다. 유효한 문항만 1번부터 번호를 매깁니다."""
+    result = ParseResult()
+    if not response_text:
+        return result
+    for block_index, block in enumerate(iter_blocks(response_text)):
+        result.blocks_seen += 1
+        question_number = len(result.items) + 1
+        item, reason = parse_block(block, question_number, default_time_limit)
+        if item is None:
+            result.add_diagnostic(block_index, question_number, reason, block)
+        else:
+            result.items.append(item)
+    return result
@@ -0,0 +1,185 @@
+"""페이지 단위 PDF 텍스트 추출 엔진.
+
+페이지 범위를 선택할 수 있고, 텍스트가 없는 페이지(스캔 이미지 등)는 건너뜁니다.
+페이지가 많은 PDF는 프로세스 풀에 페이지 묶음 단위로 나누어 모든 코어를 사용하며,
+동시에 처리 중인 묶음 수를 제한해 메모리 사용량이 문서 크기와 무관하게 일정하도록 합니다.
+결과는 (페이지 번호, 텍스트) 제너레이터로 순서대로 흘려보냅니다.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_PAGE_THRESHOLD = 48 # 이보다 페이지가 적으면 프로세스 풀 시작 비용이 더 커서 순차 처리
+PAGES_PER_BATCH = 8
+_RANGE_PART = re.compile(r"^\s*(\d*)\s*(?:(-|~)\s*(\d*))?\s*$")
+
+
+# --- 1. 페이지 범위 ---
+def parse_page_ranges(spec):
+    """ "1-10, 15, 30-" 형식의 문자열을 (시작, 끝) 목록으로 바꿉니다 (1부터 시작, 끝 포함, 끝이 None이면 마지막 페이지까지).
+
+    빈 문자열이면 None(전체 페이지)을 반환하며, 형식이 잘못되면 ValueError 를 발생시킵니다.
+    """
+    if spec is None or not str(spec).strip():
+        return None
+    ranges = []
+    for part in str(spec).split(","):
+        if not part.strip():
+            continue
+        match = _RANGE_PART.match(part)
+        if not match or (not match.group(1) and not match.group(3)):
+            raise ValueError(f"페이지 범위 형식이 올바르지 않습니다: '{part.strip()}'")
+        start = int(match.group(1)) if match.group(1) else 1
+        if match.group(2):
+            end = int(match.group(3)) if match.group(3) else None
+        else:
+            end = start
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"페이지 범위 형식이 올바르지 않습니다: '{part.strip()}'")
+        ranges.append((start, end))
+    return ranges or None
+
+
+def normalize_page_ranges(spec):
+    """캐시 키에 쓸 수 있도록 페이지 범위를 정규화한 문자열로 만듭니다 (전체 페이지는 빈 문자열)."""
+    ranges = parse_page_ranges(spec)
+    if not ranges:
+        return ""
+    return ",".join(f"{s}-{'' if e is None else e}" for s, e in sorted(ranges, key=lambda r: (r[0], r[1] or 0)))
+
+
+def resolve_pages(ranges, page_count):
+    """페이지 범위를 실제 문서 범위 안의 0부터 시작하는 페이지 인덱스 목록(중복 제거, 오름차순)으로 바꿉니다."""
+    if not ranges:
+        return list(range(page_count))
+    selected = set()
+    for start, end in ranges:
+        end = page_count if end is None else min(end, page_count)
+        selected.update(range(start - 1, end))
+    return sorted(i for i in selected if 0 <= i < page_count)
+
+
+# --- 2. 프로세스 풀 작업자 ---
+_worker_reader = None
+
+
+def _init_worker(path):
+    """작업 프로세스마다 PDF를 한 번만 엽니다."""
+    import PyPDF2
+
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(path)
+
+
+def _extract_page(reader, index):
+    try:
+        return reader.pages[index].extract_text() or ""
+    except Exception as e:
+        logger.debug(f"{index + 1}페이지 텍스트 추출 실패: {e}")
+        return ""
+
+
+def _extract_batch(indices):
+    return [(i, _extract_page(_worker_reader, i)) for i in indices]
+
+
+# --- 3. 추출 ---
+def _read_source(source):
+    """경로, 바이트, 파일 객체(Streamlit 업로드 포함)를 모두 받아 (경로 또는 None, PdfReader 입력)을 반환합니다."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), os.fspath(source)
+    if isinstance(source, (bytes, bytearray)):
+        return None, io.BytesIO(source)
+    return None, source
+
+
+def source_size(source):
+    """_read_source 가 받는 입력의 바이트 수 (계측용). 알 수 없으면 None."""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return None
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    size = getattr(source, "size", None) # Streamlit UploadedFile
+    if isinstance(size, int):
+        return size
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    return None
+
+
+def _iter_sequential(reader, indices):
+    for i in indices:
+        yield i, _extract_page(reader, i)
+
+
+def _iter_parallel(path, indices, workers, batch_size):
+    batches = [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+    max_in_flight = workers * 2
+    # Streamlit 서버처럼 스레드가 있는 프로세스에서 fork 하지 않도록 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(path,)) as executor:
+        in_flight = []
+        next_batch = 0
+        while next_batch < len(batches) or in_flight:
+            while next_batch < len(batches) and len(in_flight) < max_in_flight:
+                in_flight.append(executor.submit(_extract_batch, batches[next_batch]))
+                next_batch += 1
+            for item in in_flight.pop(0).result():
+                yield item
+
+
+def iter_pdf_pages(source, page_ranges=None, workers=None, parallel_threshold=PARALLEL_PAGE_THRESHOLD,
+                   batch_size=PAGES_PER_BATCH, on_progress=None):
+    """선택한 페이지의 (페이지 번호(1부터), 텍스트)를 순서대로 yield 합니다. 텍스트가 없는 페이지는 건너뜁니다.
+
+    page_ranges 는 "1-10, 15" 같은 문자열 또는 parse_page_ranges 결과입니다.
+    on_progress(처리한 페이지 수, 전체 선택 페이지 수) 는 페이지마다 호출됩니다.
+    """
+    import PyPDF2 # PDF 입력을 처음 처리할 때만 가져옴
+
+    if isinstance(page_ranges, str) or page_ranges is None:
+        page_ranges = parse_page_ranges(page_ranges)
+    path, reader_input = _read_source(source)
+    reader = PyPDF2.PdfReader(reader_input)
+    indices = resolve_pages(page_ranges, len(reader.pages))
+    total = len(indices)
+    workers = workers or os.cpu_count() or 1
+
+    temp_path = None
+    try:
+        if total >= parallel_threshold and workers > 1:
+            if path is None:
+                # 작업 프로세스마다 업로드 전체를 넘기지 않도록 임시 파일로 한 번만 기록
+                reader_input.seek(0)
+                fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+                with os.fdopen(fd, "wb") as f:
+                    while True:
+                        block = reader_input.read(1024 * 1024)
+                        if not block:
+                            break
+                        f.write(block)
+                path = temp_path
+            pages = _iter_parallel(path, indices, min(workers, total), batch_size)
+        else:
+            pages = _iter_sequential(reader, indices)
+
+        for done, (index, text) in enumerate(pages, start=1):
+            if on_progress:
+                on_progress(done, total)
+            if text.strip():
+                yield index + 1, text
+    finally:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -0,0 +1,469 @@
+"""여러 소스(PDF, 유튜브, 웹사이트)에서 퀴즈를 일괄 생성하는 헤드리스 파이프라인.
+
+추출 → 전처리 → 생성 → 파싱 → CSV/XLSX 저장 단계를 파이프라인으로 실행합니다.
+I/O(추출, 파일 저장)와 모델 호출은 각각 별도의 동시 실행 한도를 가지며,
+완료된 소스는 매니페스트(JSONL)에 기록되어 중단 후 다시 실행하면 남은 소스만 처리합니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from .cache import get_extraction_cache, pdf_cache_key, youtube_cache_key, website_cache_key
+from .chunking import DEFAULT_CHUNK_TOKEN_BUDGET, split_into_chunks
+from .context_cache import bind_context
+from .dedupe import remove_duplicate_questions
+from .export import build_base_filename, write_blooket_csv, write_blooket_xlsx
+from .extractors import extract_text_from_pdf, extract_text_from_website, extract_youtube_video_id, get_youtube_transcript
+from .generation import generate_quiz_chunked, generate_quiz_streaming, generate_quiz_with_gemini, top_up_quiz
+from .metrics import get_metrics, instrumented, propagate_context, track
+from .parser import format_diagnostic, parse_response
+from .pdf_pages import normalize_page_ranges
+from .preprocess import preprocess_context
+from .quiz_bank import get_quiz_bank, source_hash
+from .response_cache import model_name_of, with_response_cache
+from .scheduler import with_scheduler
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "xlsx")
+_YOUTUBE_HOSTS = ("youtube.com", "youtu.be", "googleusercontent.com")
+
+
+# --- 1. 소스 목록 ---
+def make_source(kind, location):
+    """소스 dict 를 만듭니다. id 는 매니페스트에서 재개 여부를 판단하는 기준입니다."""
+    if kind == "pdf":
+        location = os.path.abspath(location)
+        source_id = f"pdf:{location}"
+        name = os.path.splitext(os.path.basename(location))[0]
+    elif kind == "youtube":
+        video_id = extract_youtube_video_id(location)
+        source_id = f"youtube:{video_id or location}"
+        name = f"youtube_{video_id or 'video'}"
+    else:
+        source_id = f"web:{location}"
+        name = urlsplit(location).netloc.replace("www.", "").replace(".", "_") + "_website"
+    return {"id": source_id, "kind": kind, "location": location, "name": name}
+
+
+def classify_url(url):
+    host = (urlsplit(url).hostname or "").lower()
+    if any(host == h or host.endswith("." + h) for h in _YOUTUBE_HOSTS) and extract_youtube_video_id(url):
+        return "youtube"
+    return "web"
+
+
+def collect_sources(pdf_dir=None, urls_file=None):
+    """PDF 디렉터리(하위 폴더 포함)와 URL 목록 파일(한 줄에 하나, # 주석 허용)에서 소스를 모읍니다."""
+    sources = []
+    if pdf_dir:
+        for root, _, files in os.walk(pdf_dir):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(".pdf"):
+                    sources.append(make_source("pdf", os.path.join(root, file_name)))
+    if urls_file:
+        with open(urls_file, "r", encoding="utf-8") as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    sources.append(make_source(classify_url(url), url))
+    # 같은 소스가 여러 번 나오면 한 번만 처리
+    unique = {}
+    for source in sources:
+        unique.setdefault(source["id"], source)
+    return list(unique.values())
+
+
+# --- 2. 매니페스트 (재개용 완료 기록) ---
+def load_manifest(path):
+    """소스 id → 마지막 기록 dict. 파일이 없거나 마지막 줄이 깨져 있어도 읽을 수 있는 부분만 사용합니다."""
+    records = {}
+    if not path or not os.path.exists(path):
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record.get("id")] = record
+    return records
+
+
+class ManifestWriter:
+    """한 줄씩 추가 기록하고 즉시 디스크에 반영하는 JSONL 매니페스트."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# --- 3. 모델 동시 호출 제한 ---
+class ConcurrencyLimitedModel:
+    """generate_content 동시 호출 수를 제한하는 모델 래퍼 (분할 생성의 내부 병렬 호출까지 포함)."""
+
+    def __init__(self, model, max_concurrent_calls):
+        self._model = model
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrent_calls))
+
+    def generate_content(self, *args, **kwargs):
+        with self._semaphore:
+            return self._model.generate_content(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+# --- 4. 단계별 작업 ---
+def extract_source(source, pdf_page_ranges=None):
+    """소스에서 텍스트를 추출합니다 (추출 캐시 사용). 실패 시 None."""
+    cache = get_extraction_cache()
+    kind, location = source["kind"], source["location"]
+    if kind == "pdf":
+        page_ranges = normalize_page_ranges(pdf_page_ranges)
+        with open(location, "rb") as f:
+            cache_key = pdf_cache_key(f.read(), page_ranges)
+        return cache.get_or_compute(cache_key, lambda: extract_text_from_pdf(location, page_ranges=page_ranges))
+    if kind == "youtube":
+        video_id = extract_youtube_video_id(location)
+        if not video_id:
+            return get_youtube_transcript(location) # 오류 기록
+        return cache.get_or_compute(youtube_cache_key(video_id), lambda: get_youtube_transcript(location))
+    return cache.get_or_compute(website_cache_key(location), lambda: extract_text_from_website(location))
+
+
+def output_base_name(source, options):
+    """같은 이름의 파일이 여러 개여도 겹치지 않도록 소스 id 해시를 붙입니다."""
+    suffix = hashlib.sha1(source["id"].encode("utf-8")).hexdigest()[:8]
+    base = build_base_filename(source["name"], options["num_questions"], options["difficulty"], options["grade_level"])
+    if base.startswith("_"):  # 영문/숫자가 없는 이름 (예: 한글 파일명)
+        base = source["kind"] + base
+    return f"{base}_{suffix}"
+
+
+def write_outputs(source, quiz_items, raw_output, out_dir, options):
+    """CSV/XLSX 및 원본 응답을 저장하고 저장한 파일 경로 목록을 반환합니다 (메모리 버퍼 없이 파일에 바로 씀)."""
+    os.makedirs(out_dir, exist_ok=True)
+    base_path = os.path.join(out_dir, output_base_name(source, options))
+    paths = []
+    if "csv" in options["formats"]:
+        with track("export.csv") as span:
+            with open(base_path + ".csv", "w", encoding="utf-8-sig", newline="") as f:
+                write_blooket_csv(quiz_items, f)
+            span.set_output(os.path.getsize(base_path + ".csv"))
+        paths.append(base_path + ".csv")
+    if "xlsx" in options["formats"]:
+        with track("export.xlsx") as span:
+            with open(base_path + ".xlsx", "wb") as f:
+                write_blooket_xlsx(quiz_items, f)
+            span.set_output(os.path.getsize(base_path + ".xlsx"))
+        paths.append(base_path + ".xlsx")
+    with open(base_path + ".raw.txt", "w", encoding="utf-8") as f:
+        f.write(raw_output)
+    paths.append(base_path + ".raw.txt")
+    return paths
+
+
+def write_bundle(manifest_path, bundle_path, formats=SUPPORTED_FORMATS):
+    """매니페스트에 완료로 기록된 모든 소스의 CSV/XLSX 파일을 하나의 ZIP으로 묶고 묶은 파일 수를 반환합니다.
+
+    파일을 ZIP 항목으로 스트리밍 복사하므로 퀴즈 수가 많아도 메모리 사용량이 늘지 않습니다.
+    """
+    extensions = tuple("." + f for f in formats)
+    count = 0
+    with track("export.zip") as span:
+        with zipfile.ZipFile(bundle_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            for record in load_manifest(manifest_path).values():
+                if record.get("status") != "done":
+                    continue
+                for path in record.get("outputs", []):
+                    if path.endswith(extensions) and os.path.exists(path):
+                        bundle.write(path, arcname=os.path.basename(path))
+                        count += 1
+        span.set_output(count)
+    return count
+
+
+def build_options(num_questions=5, default_time_limit=20, difficulty="선택 안 함", grade_level="전체 (선택 안 함)",
+                  chunked=True, chunk_token_budget=DEFAULT_CHUNK_TOKEN_BUDGET, model_workers=2, preprocess=True,
+                  context_token_budget=None, top_up=True, dedupe=True, drop_bank_duplicates=False,
+                  formats=SUPPORTED_FORMATS):
+    """generate_for_source / write_outputs 가 사용하는 생성 옵션 dict."""
+    return {
+        "num_questions": num_questions, "default_time_limit": default_time_limit,
+        "difficulty": difficulty, "grade_level": grade_level, "formats": tuple(formats),
+        "chunked": chunked, "chunk_token_budget": chunk_token_budget, "model_workers": model_workers,
+        "preprocess": preprocess, "context_token_budget": context_token_budget, "top_up": top_up,
+        "dedupe": dedupe, "drop_bank_duplicates": drop_bank_duplicates,
+    }
+
+
+def prepare_context(text, options, kind=None):
+    """옵션에 따라 전처리한 콘텐츠를 반환합니다."""
+    if not options["preprocess"]:
+        return text
+    text, report = preprocess_context(text, token_budget=options["context_token_budget"],
+                                      remove_filler_words=kind == "youtube")
+    logger.info(f"전처리: 추정 토큰 {report['original_tokens']:,} → {report['final_tokens']:,} "
+                f"(반복 줄 {report['removed_lines']}개, 중복 문단 {report['duplicate_passages']}개, 제외 문단 {report['dropped_passages']}개)")
+    return text
+
+
+def finish_parsing(model, text, raw_output, options, text_hash, check_cancelled=None):
+    """응답을 파싱하고 비슷한 문항 제외, 부족한 문항 보충까지 실행해 (원본 응답, ParseResult) 를 반환합니다.
+
+    check_cancelled() 는 보충 단계 전과 보충 요청마다 호출됩니다 (예외를 올리면 중단).
+    """
+    parsed = parse_response(raw_output, options["default_time_limit"])
+    if options.get("dedupe", True): # 보충 단계가 제외한 만큼 다시 채움
+        parsed.items = remove_duplicate_questions(parsed.items, options.get("drop_bank_duplicates", False), text_hash)
+    if check_cancelled:
+        check_cancelled()
+    if options["top_up"] and len(parsed.items) < options["num_questions"]:
+        chunks = split_into_chunks(text, options["chunk_token_budget"]) if options["chunked"] else None
+        parsed.items, top_up_outputs = top_up_quiz(model, text, parsed.items, options["num_questions"],
+                                                   options["default_time_limit"], options["difficulty"], options["grade_level"],
+                                                   chunks=chunks, chunk_token_budget=options["chunk_token_budget"],
+                                                   check_cancelled=check_cancelled)
+        raw_output = "\n---\n".join([raw_output] + top_up_outputs)
+    return raw_output, parsed
+
+
+def generate_for_source(model, text, options, kind=None, check_cancelled=None, on_item=None):
+    """(원본 응답, ParseResult) 를 반환합니다. 모델 호출이 실패하면 (None, None).
+
+    check_cancelled() 는 전처리 뒤, 생성 뒤, 보충 요청마다 호출됩니다 (예외를 올리면 중단).
+    on_item(item, quiz_items) 를 주면 한 번의 호출로 보내는 콘텐츠는 스트리밍으로 받아 문항이 완성될 때마다 호출합니다
+    (여러 구간으로 나누어 생성할 때는 호출하지 않음).
+    """
+    text_hash = source_hash(text)
+    text = prepare_context(text, options, kind)
+    if check_cancelled:
+        check_cancelled()
+    args = (text, options["num_questions"], options["default_time_limit"], options["difficulty"], options["grade_level"])
+    chunks = split_into_chunks(text, options["chunk_token_budget"]) if options["chunked"] else []
+    if len(chunks) > 1:
+        raw_output = generate_quiz_chunked(model, *args, chunks=chunks, max_workers=options["model_workers"],
+                                           check_cancelled=check_cancelled)
+    elif on_item:
+        raw_output, _ = generate_quiz_streaming(model, *args, on_item=on_item)
+    else:
+        raw_output = generate_quiz_with_gemini(model, *args)
+    if check_cancelled:
+        check_cancelled()
+    if not raw_output:
+        return None, None
+    return finish_parsing(model, text, raw_output, options, text_hash, check_cancelled)
+
+
+# --- 4-1. 여러 수준 변형 ---
+def build_variants(difficulties, grade_levels, num_questions):
+    """난이도 × 학년 조합마다 변형 dict ({"difficulty", "grade_level", "num_questions"}) 목록을 만듭니다."""
+    return [{"difficulty": difficulty, "grade_level": grade_level, "num_questions": num_questions}
+            for difficulty in difficulties for grade_level in grade_levels]
+
+
+def variant_label(variant):
+    """화면/로그에 표시할 변형 이름. 예: 쉬움 · 중학교 1학년 · 5문항"""
+    return f"{variant['difficulty']} · {variant['grade_level']} · {variant['num_questions']}문항"
+
+
+@instrumented("generate.variants", input_text=lambda model, text, *args, **kwargs: text)
+def generate_variants(model, text, variants, options, kind=None, context_cache=None, refresh=False, on_variant=None,
+                      check_cancelled=None):
+    """같은 콘텐츠로 여러 변형(난이도, 학년, 문항 수)을 한꺼번에 만듭니다.
+
+    콘텐츠는 한 번만 전처리하고, 원본 모델(model)을 컨텍스트 캐시(quizgen.context_cache)에 묶어
+    변형별 프롬프트를 options["model_workers"] 개씩 동시에 보냅니다. 변형마다 콘텐츠 전체를 한 번의 호출로 보내므로
+    분할 생성(chunked)은 사용하지 않습니다. on_variant(result) 는 변형 하나가 끝날 때마다 호출되고,
+    check_cancelled() 는 변형을 시작하기 전에 호출됩니다 (예외를 올리면 남은 변형을 건너뜀).
+
+    반환값: 변형 순서대로 {"variant", "options", "raw_output", "parsed", "error"} 목록
+    """
+    text_hash = source_hash(text)
+    text = prepare_context(text, options, kind)
+    generation_model, bound = bind_context(model, text, context_cache, refresh=refresh)
+
+    def generate_variant(variant):
+        if check_cancelled:
+            check_cancelled()
+        variant_options = dict(options, chunked=False, **variant)
+        result = {"variant": variant, "options": variant_options, "raw_output": None, "parsed": None, "error": None}
+        raw_output = generate_quiz_with_gemini(generation_model, text, variant["num_questions"],
+                                               options["default_time_limit"], variant["difficulty"], variant["grade_level"])
+        if raw_output:
+            result["raw_output"], result["parsed"] = finish_parsing(generation_model, text, raw_output, variant_options, text_hash,
+                                                                    check_cancelled)
+        else:
+            result["error"] = "Gemini 호출 실패"
+        if on_variant:
+            on_variant(result)
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(options["model_workers"], len(variants))),
+                                thread_name_prefix="quizgen-variant") as executor:
+            results = list(executor.map(propagate_context(generate_variant), variants))
+    finally:
+        bound.close()
+    if bound.saved_tokens:
+        logger.info(f"컨텍스트 캐시로 콘텐츠 재전송 {bound.cached_calls}회 (추정 {bound.saved_tokens:,} 토큰)를 줄였습니다.")
+    return results
+
+
+def save_to_quiz_bank(quiz_bank, text_hash, quiz_items, raw_output, options, source_kind, source_label, title, model_name):
+    """생성한 퀴즈를 보관함에 저장하고 id 를 반환합니다. 보관함을 쓰지 않거나 저장에 실패하면 None."""
+    if quiz_bank is None:
+        return None
+    try:
+        return quiz_bank.save(
+            text_hash, quiz_items, raw_output, options["num_questions"], options["default_time_limit"],
+            options["difficulty"], options["grade_level"], source_kind=source_kind, source_label=source_label,
+            title=title, model_name=model_name,
+            options={k: options.get(k) for k in ("preprocess", "context_token_budget", "chunked", "top_up", "dedupe")},
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"[{source_label or title}] 퀴즈 보관함에 저장하지 못했습니다: {e}")
+        return None
+
+
+def save_variants(quiz_bank, text_hash, results, source_kind, source_label, title_prefix, model_name):
+    """generate_variants 결과 중 성공한 변형을 보관함에 저장하고 화면 표시용 dict 목록을 반환합니다.
+
+    반환값: 변형마다 {"label", "items", "raw_output", "base_filename", "quiz_id"} (실패한 변형은 경고만 남기고 제외)
+    """
+    saved = []
+    for result in results:
+        label = variant_label(result["variant"])
+        parsed = result["parsed"]
+        if parsed is None or not parsed.items:
+            logger.warning(f"[{label}] {result['error'] or 'Gemini 응답에서 유효한 퀴즈 데이터를 파싱하지 못했습니다.'}")
+            continue
+        for diagnostic in parsed.diagnostics:
+            logger.warning(f"[{label}] {format_diagnostic(diagnostic)}")
+        variant = result["variant"]
+        title = build_base_filename(title_prefix, variant["num_questions"], variant["difficulty"], variant["grade_level"])
+        quiz_id = save_to_quiz_bank(quiz_bank, text_hash, parsed.items, result["raw_output"], result["options"],
+                                    source_kind, source_label, title, model_name)
+        saved.append({"label": label, "items": parsed.items, "raw_output": result["raw_output"],
+                      "base_filename": title, "quiz_id": quiz_id})
+    return saved
+
+
+# --- 5. 파이프라인 실행 ---
+def run_batch(model, sources, out_dir, num_questions=5, default_time_limit=20, difficulty="선택 안 함",
+              grade_level="전체 (선택 안 함)", formats=SUPPORTED_FORMATS, io_workers=4, model_workers=2,
+              manifest_path=None, chunked=True, chunk_token_budget=DEFAULT_CHUNK_TOKEN_BUDGET, pdf_page_ranges=None,
+              refresh=False, preprocess=True, context_token_budget=None, metrics_path=None, bundle_path=None,
+              on_event=None, top_up=True, dedupe=True, drop_bank_duplicates=False):
+    """소스 목록을 추출 → 생성 → 저장 파이프라인으로 처리하고 요약 dict 를 반환합니다.
+
+    manifest_path 를 지정하면 이미 완료("done")로 기록된 소스는 건너뜁니다.
+    pdf_page_ranges ("1-20, 35" 형식) 는 모든 PDF 소스에 적용됩니다.
+    refresh=True 이면 저장된 Gemini 응답을 재사용하지 않고 새로 생성합니다.
+    preprocess=True 이면 반복 줄/중복 문단을 제거하고, context_token_budget 이 있으면 관련도 높은 문단만 그 안에서 남깁니다.
+    on_event(record) 는 소스 하나가 끝날 때마다(성공/실패) 호출됩니다.
+    top_up=True 이면 형식 오류로 빠진 문항만큼만 추가로 요청해 문항 수를 채웁니다.
+    dedupe=True 이면 표현만 다른 비슷한 문항을 빼고, 보관함의 기존 퀴즈와 비슷한 문항을 경고합니다
+    (drop_bank_duplicates=True 이면 그 문항도 뺍니다).
+    bundle_path 를 지정하면 실행이 끝난 뒤 완료된 모든 소스의 파일을 하나의 ZIP으로 묶습니다.
+    생성한 퀴즈는 퀴즈 보관함(quizgen.quiz_bank)에도 저장되며, 매니페스트에 보관함 id(quiz_id)를 기록합니다.
+    실행이 끝나면 단계별 처리 시간 집계를 metrics_path (기본값: <out_dir>/metrics.json) 에 저장합니다.
+    """
+    options = build_options(num_questions, default_time_limit, difficulty, grade_level, chunked=chunked,
+                            chunk_token_budget=chunk_token_budget, model_workers=model_workers, preprocess=preprocess,
+                            context_token_budget=context_token_budget, top_up=top_up, dedupe=dedupe,
+                            drop_bank_duplicates=drop_bank_duplicates, formats=formats)
+    manifest_path = manifest_path or os.path.join(out_dir, "manifest.jsonl")
+    finished = {sid for sid, record in load_manifest(manifest_path).items() if record.get("status") == "done"}
+    manifest = ManifestWriter(manifest_path)
+    # 캐시 적중은 동시 호출 한도를 차지하지 않도록 캐시를 바깥에 두고, 실제 호출은 공유 스케줄러(분당 한도, 재시도)를 거침
+    limited_model = with_response_cache(ConcurrencyLimitedModel(with_scheduler(model), model_workers), refresh=refresh)
+    quiz_bank = get_quiz_bank()
+    todo = [source for source in sources if source["id"] not in finished]
+    summary = {"total": len(sources), "skipped": len(sources) - len(todo), "done": 0, "failed": 0}
+    if len(todo) < len(sources):
+        logger.info(f"매니페스트에 완료로 기록된 {summary['skipped']}개 소스를 건너뜁니다.")
+
+    def finish(source, status, started_at, **extra):
+        record = {"id": source["id"], "kind": source["kind"], "location": source["location"], "status": status,
+                  "elapsed_sec": round(time.time() - started_at, 3), "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        record.update(extra)
+        manifest.record(record)
+        summary[status if status == "done" else "failed"] += 1
+        if status == "done":
+            logger.info(f"완료: {source['location']} ({record.get('questions', 0)}문항)")
+        else:
+            logger.warning(f"실패: {source['location']} ({record.get('error')})")
+        if on_event:
+            on_event(record)
+
+    with ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="quizgen-io") as io_pool, \
+         ThreadPoolExecutor(max_workers=max(1, model_workers), thread_name_prefix="quizgen-model") as model_pool:
+        pending = {}
+        started = {}
+        source_hashes = {}
+        quiz_ids = {}
+        for source in todo:
+            started[source["id"]] = time.time()
+            pending[io_pool.submit(extract_source, source, pdf_page_ranges)] = ("extract", source, 0)
+
+        while pending:
+            done_futures, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done_futures:
+                stage, source, question_count = pending.pop(future)
+                started_at = started[source["id"]]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.debug(f"{stage} 단계 예외: {source['location']}", exc_info=True)
+                    finish(source, "failed", started_at, stage=stage, error=str(e))
+                    continue
+
+                if stage == "extract":
+                    if not result or not result.strip():
+                        finish(source, "failed", started_at, stage=stage, error="추출된 텍스트 없음")
+                        continue
+                    source_hashes[source["id"]] = source_hash(result)
+                    pending[model_pool.submit(generate_for_source, limited_model, result, options, source["kind"])] = ("generate", source, 0)
+                elif stage == "generate":
+                    raw_output, parsed = result
+                    if parsed is None:
+                        finish(source, "failed", started_at, stage=stage, error="Gemini 호출 실패")
+                        continue
+                    for diagnostic in parsed.diagnostics:
+                        logger.warning(f"[{source['location']}] {format_diagnostic(diagnostic)}")
+                    if not parsed.items:
+                        finish(source, "failed", started_at, stage="parse", error="유효한 퀴즈 문항 없음")
+                        continue
+                    quiz_ids[source["id"]] = save_to_quiz_bank(
+                        quiz_bank, source_hashes[source["id"]], parsed.items, raw_output, options,
+                        source["kind"], source["location"], output_base_name(source, options), model_name_of(limited_model))
+                    future = io_pool.submit(write_outputs, source, parsed.items, raw_output, out_dir, options)
+                    pending[future] = ("export", source, len(parsed.items))
+                else:
+                    finish(source, "done", started_at, outputs=result, questions=question_count,
+                           quiz_id=quiz_ids.get(source["id"]))
+
+    if bundle_path:
+        summary["bundled_files"] = write_bundle(manifest_path, bundle_path, options["formats"])
+        logger.info(f"ZIP 묶음 저장: {bundle_path} ({summary['bundled_files']}개 파일)")
+    summary["metrics_path"] = get_metrics().write_snapshot(metrics_path or os.path.join(out_dir, "metrics.json"))
+    return summary
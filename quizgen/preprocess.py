@@ -0,0 +1,250 @@
+"""추출된 콘텐츠를 프롬프트에 넣기 전에 정리하는 전처리 단계.
+
+1. 반복되는 머리말/꼬리말, 쪽 번호, 메뉴 문구 같은 상용구 줄 제거
+2. 거의 같은 문단은 단어 3-gram SimHash 지문으로 비교해 하나만 남김
+3. 남은 문단을 TF-IDF 중심성(문서 전체와의 유사도)으로 순위를 매겨 토큰 예산 안에서 선택 (원래 순서 유지)
+
+프롬프트가 모델에게 쪽 번호 같은 사소한 정보를 피하라고 지시하는데, 그런 내용을 보내기 전에 미리 덜어냅니다.
+numpy 는 앱 시작 시간을 줄이기 위해 전처리를 처음 실행할 때 가져옵니다.
+"""
+import hashlib
+import re
+from collections import Counter
+
+from .chunking import estimate_tokens
+from .metrics import instrumented
+
+PASSAGE_MAX_TOKENS = 300 # 문단 구분이 없는 텍스트(PDF 등)는 이 크기 정도로 묶어 한 구절로 취급
+REPEATED_LINE_MIN_COUNT = 3 # 이 횟수 이상 반복되는 짧은 줄은 상용구로 간주
+REPEATED_LINE_MAX_CHARS = 120
+NEAR_DUPLICATE_MAX_DISTANCE = 3 # SimHash 64비트 중 다른 비트 수가 이 값 이하면 거의 같은 문단
+_MIN_SHINGLE_WORDS = 8 # 이보다 짧은 구절은 정확히 같은 경우만 중복으로 처리
+
+_NUMBER_ONLY_RE = re.compile(r"^[-–—\s]*(\d{1,4})[-–—\s]*$")
+_PAGE_MARKER_RE = re.compile(
+    r"(?:page|p\.)\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|\d{1,4}\s*/\s*\d{1,4}|\d{1,4}\s*(?:쪽|페이지|면)",
+    re.IGNORECASE,
+)
+PAGE_NUMBER_MAX_STEP = 2 # 숫자만 있는 줄은 앞뒤 숫자 줄과 이 간격 이내로 증가할 때만 쪽 번호로 간주
+_DIGITS_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+# 한 음절 '그', '어', '아', '음' 은 지시어/감탄사일 수 있으므로 ("그 당시") 길게 끌거나 되풀이한 경우만 군말로 봄
+_FILLER_RE = re.compile(
+    r"\[(?:음악|박수|웃음|music|applause|laughter)\]"
+    r"|\b(?:um+|uh+)\b"
+    r"|(?<!\S)(?:음{2,}|어{2,}|(?:음|어)~+)(?=[\s,.!?]|$)"
+    r"|(?<!\S)(음|어|아|그)(?:[\s,]+\1)+(?=[\s,.!?]|$)",
+    re.IGNORECASE,
+)
+
+
+# --- 1. 상용구 줄 제거 ---
+def _line_signature(line):
+    """숫자만 다른 줄(예: '3장 - 12쪽', '3장 - 13쪽')을 같은 줄로 보도록 정규화합니다."""
+    return _DIGITS_RE.sub("#", line.strip().lower())
+
+
+def _page_number_lines(stripped_lines):
+    """숫자만 있는 줄 중 쪽 번호처럼 차례로 증가하는 줄의 위치 집합 (그런 줄이 충분히 많을 때만).
+
+    연도나 표의 값처럼 혼자 있거나 순서 없이 나오는 숫자 줄은 남깁니다.
+    """
+    numbers = [(i, int(match.group(1))) for i, line in enumerate(stripped_lines)
+               for match in [_NUMBER_ONLY_RE.match(line)] if match]
+    positions = set()
+    for k, (i, value) in enumerate(numbers):
+        previous_close = k > 0 and 0 < value - numbers[k - 1][1] <= PAGE_NUMBER_MAX_STEP
+        next_close = k + 1 < len(numbers) and 0 < numbers[k + 1][1] - value <= PAGE_NUMBER_MAX_STEP
+        if previous_close or next_close:
+            positions.add(i)
+    return positions if len(positions) >= REPEATED_LINE_MIN_COUNT else set()
+
+
+def remove_boilerplate_lines(text):
+    """반복되는 머리말/꼬리말과 쪽 번호 줄을 제거하고 (텍스트, 제거한 줄 수) 를 반환합니다.
+
+    - 똑같은 짧은 줄이 여러 번 반복되면 제거
+    - 숫자만 다르게 반복되는 줄은 쪽 표시('12쪽', 'page 3', '3 / 10')가 있을 때만 제거
+      ('제1장', 'Chapter 2' 같은 제목은 남김)
+    - 숫자만 있는 줄은 쪽 번호처럼 차례로 증가할 때만 제거
+    """
+    lines = text.split("\n")
+    stripped_lines = [line.strip() for line in lines]
+    short = [line for line in stripped_lines if line and len(line) <= REPEATED_LINE_MAX_CHARS]
+    exact_counts = Counter(line.lower() for line in short)
+    page_marker_counts = Counter(_line_signature(line) for line in short if _PAGE_MARKER_RE.search(line))
+    page_numbers = _page_number_lines(stripped_lines)
+    kept, removed = [], 0
+    for i, (line, stripped) in enumerate(zip(lines, stripped_lines)):
+        if i in page_numbers or (
+                stripped and len(stripped) <= REPEATED_LINE_MAX_CHARS
+                and (exact_counts[stripped.lower()] >= REPEATED_LINE_MIN_COUNT
+                     or page_marker_counts[_line_signature(stripped)] >= REPEATED_LINE_MIN_COUNT)):
+            removed += 1
+            continue
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def remove_filler(text):
+    """영상 스크립트의 [음악], 'um', '음음', '어 어' 같은 군말을 제거합니다."""
+    return re.sub(r"[ \t]{2,}", " ", _FILLER_RE.sub("", text))
+
+
+# --- 2. 구절 나누기 ---
+def split_passages(text, max_tokens=PASSAGE_MAX_TOKENS):
+    """빈 줄 기준 문단으로 나누고, 너무 긴 문단은 줄 단위로 max_tokens 정도씩 묶습니다."""
+    passages = []
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            passages.append(paragraph)
+            continue
+        current, current_tokens = [], 0
+        for line in paragraph.split("\n"):
+            line_tokens = estimate_tokens(line)
+            if current and current_tokens + line_tokens > max_tokens:
+                passages.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += line_tokens
+        if current:
+            passages.append("\n".join(current))
+    return passages
+
+
+# --- 3. 거의 같은 구절 제거 (SimHash) ---
+def _words(passage):
+    return [w.lower() for w in _WORD_RE.findall(passage)]
+
+
+def simhash_fingerprints(passages):
+    """구절마다 단어 3-gram 해시로 64비트 SimHash 지문을 계산합니다 (비트 연산은 numpy 로 일괄 처리)."""
+    import numpy as np
+
+    fingerprints = np.zeros(len(passages), dtype=np.uint64)
+    for i, passage in enumerate(passages):
+        words = _words(passage)
+        shingles = [" ".join(words[j:j + 3]) for j in range(max(1, len(words) - 2))]
+        hashes = np.frombuffer(
+            b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles),
+            dtype=np.uint64,
+        )
+        bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)  # (shingle 수, 64)
+        votes = (bits.astype(np.int32) * 2 - 1).sum(axis=0) > 0
+        fingerprints[i] = np.packbits(votes).view(np.uint64)[0]
+    return fingerprints
+
+
+def _popcount(values):
+    import numpy as np
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def find_near_duplicates(passages, max_distance=NEAR_DUPLICATE_MAX_DISTANCE):
+    """앞에 이미 나온 구절과 거의 같은 구절의 인덱스 집합을 반환합니다."""
+    import numpy as np
+
+    fingerprints = simhash_fingerprints(passages)
+    exact_seen = set()
+    kept_fingerprints = np.zeros(len(passages), dtype=np.uint64)
+    kept_count = 0
+    duplicates = set()
+    for i, passage in enumerate(passages):
+        normalized = " ".join(_words(passage))
+        if normalized in exact_seen:
+            duplicates.add(i)
+            continue
+        exact_seen.add(normalized)
+        if len(normalized.split()) >= _MIN_SHINGLE_WORDS and kept_count:
+            distances = _popcount(kept_fingerprints[:kept_count] ^ fingerprints[i])
+            if distances.min() <= max_distance:
+                duplicates.add(i)
+                continue
+        if len(normalized.split()) >= _MIN_SHINGLE_WORDS:
+            kept_fingerprints[kept_count] = fingerprints[i]
+            kept_count += 1
+    return duplicates
+
+
+# --- 4. TF-IDF 중심성 점수 ---
+def tfidf_centrality(passages):
+    """각 구절의 TF-IDF 벡터와 문서 전체 중심 벡터 사이의 코사인 유사도를 계산합니다.
+
+    (구절, 단어, 빈도) 희소 표현으로 numpy bincount 만 사용하므로 메모리가 구절 수 × 어휘 수에 비례하지 않습니다.
+    """
+    import numpy as np
+
+    n = len(passages)
+    if n == 0:
+        return np.zeros(0)
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for i, passage in enumerate(passages):
+        for word, count in Counter(w for w in _words(passage) if len(w) > 1).items():
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+            counts.append(count)
+    if not vocabulary:
+        return np.zeros(n)
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+    tf = 1.0 + np.log(np.asarray(counts, dtype=np.float64)) # 부선형 TF
+    document_frequency = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1.0
+    weights = tf * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n))
+    centroid = np.bincount(cols, weights=weights / np.maximum(norms[rows], 1e-12), minlength=len(vocabulary)) / n
+    dots = np.bincount(rows, weights=weights * centroid[cols], minlength=n)
+    return dots / np.maximum(norms * np.linalg.norm(centroid), 1e-12)
+
+
+def select_passages(passages, token_budget):
+    """점수가 높은 구절부터 토큰 예산 안에서 고르고, 원래 순서대로 인덱스 목록을 반환합니다."""
+    import numpy as np
+
+    tokens = [estimate_tokens(p) for p in passages]
+    if not token_budget or sum(tokens) <= token_budget:
+        return list(range(len(passages)))
+    scores = tfidf_centrality(passages)
+    selected, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        if used + tokens[i] <= token_budget:
+            selected.append(int(i))
+            used += tokens[i]
+    return sorted(selected)
+
+
+# --- 5. 전체 전처리 ---
+@instrumented("preprocess", input_text=lambda text, *args, **kwargs: text)
+def preprocess_context(text, token_budget=None, remove_filler_words=False):
+    """전처리된 텍스트와 보고서 dict 를 반환합니다.
+
+    보고서: original_tokens, final_tokens, saved_tokens, removed_lines, duplicate_passages, dropped_passages
+    """
+    original_tokens = estimate_tokens(text)
+    report = {"original_tokens": original_tokens, "final_tokens": original_tokens, "saved_tokens": 0,
+              "removed_lines": 0, "duplicate_passages": 0, "dropped_passages": 0}
+    if not text or not text.strip():
+        return text, report
+
+    cleaned, report["removed_lines"] = remove_boilerplate_lines(text)
+    if remove_filler_words:
+        cleaned = remove_filler(cleaned)
+    passages = split_passages(cleaned)
+    duplicates = find_near_duplicates(passages)
+    report["duplicate_passages"] = len(duplicates)
+    passages = [p for i, p in enumerate(passages) if i not in duplicates]
+    selected = select_passages(passages, token_budget)
+    report["dropped_passages"] = len(passages) - len(selected)
+
+    result = "\n\n".join(passages[i] for i in selected)
+    report["final_tokens"] = estimate_tokens(result)
+    report["saved_tokens"] = original_tokens - report["final_tokens"]
+    return result, report
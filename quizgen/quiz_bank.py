@@ -0,0 +1,259 @@
+"""생성한 퀴즈를 보관하는 로컬 퀴즈 보관함 (SQLite).
+
+퀴즈마다 소스 텍스트 해시, 생성 옵션, 파싱된 문항, 원본 응답을 저장합니다.
+소스 / 학년 / 난이도 / 생성 시각 인덱스와 질문 전문 검색(FTS5 trigram, 한글 부분 일치)을 제공하므로
+지난 퀴즈를 다시 열거나 다시 내려받을 때 새로 생성하지 않고 바로 불러올 수 있습니다.
+
+    python -m quizgen.quiz_bank stats
+    python -m quizgen.quiz_bank search 광합성 --grade "중학교 1학년"
+    python -m quizgen.quiz_bank export 12 --format xlsx --output quiz.xlsx
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "blooket", "quiz_bank.sqlite3")
+DEFAULT_SEARCH_LIMIT = 50
+_TRIGRAM_MIN_CHARS = 3 # trigram 색인은 3자 이상 검색어에만 사용 (더 짧으면 부분 문자열 검사)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    quiz_key TEXT NOT NULL UNIQUE,
+    source_hash TEXT NOT NULL,
+    source_kind TEXT,
+    source_label TEXT,
+    title TEXT,
+    model TEXT,
+    num_questions INTEGER NOT NULL,
+    time_limit INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    grade_level TEXT NOT NULL,
+    options TEXT NOT NULL,
+    items TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    raw_output TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quizzes_source ON quizzes (source_hash, created_at);
+CREATE INDEX IF NOT EXISTS quizzes_grade_level ON quizzes (grade_level, created_at);
+CREATE INDEX IF NOT EXISTS quizzes_difficulty ON quizzes (difficulty, created_at);
+CREATE INDEX IF NOT EXISTS quizzes_created_at ON quizzes (created_at);
+"""
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS quiz_questions USING fts5(question, quiz_id UNINDEXED, tokenize='trigram')"
+_PLAIN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz_questions (question TEXT NOT NULL, quiz_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS quiz_questions_quiz ON quiz_questions (quiz_id);
+"""
+_SUMMARY_COLUMNS = ("id", "source_hash", "source_kind", "source_label", "title", "model", "num_questions", "time_limit",
+                    "difficulty", "grade_level", "item_count", "created_at")
+
+
+def source_hash(text):
+    """소스 텍스트의 SHA-256 해시 (같은 콘텐츠로 만든 퀴즈 찾기용)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class QuizBank:
+    """스레드 안전 SQLite 퀴즈 보관함."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            try:
+                self._conn.execute(_FTS_SCHEMA)
+                self.full_text_search = True
+            except sqlite3.OperationalError: # FTS5/trigram 을 지원하지 않는 SQLite
+                logger.debug("FTS5 trigram 을 사용할 수 없어 질문 검색은 부분 문자열 검사로 처리합니다.")
+                self._conn.executescript(_PLAIN_SCHEMA)
+                self.full_text_search = False
+            self._conn.commit()
+
+    def save(self, source_hash, items, raw_output, num_questions, time_limit, difficulty, grade_level,
+             source_kind=None, source_label=None, title=None, model_name=None, options=None):
+        """퀴즈를 저장하고 id 를 반환합니다. 같은 소스·옵션·응답의 퀴즈가 이미 있으면 그 id 를 반환합니다."""
+        options_json = json.dumps(options or {}, ensure_ascii=False, sort_keys=True, default=str)
+        digest = hashlib.sha256()
+        for part in (source_hash, str(num_questions), str(time_limit), difficulty, grade_level, options_json, raw_output):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        quiz_key = digest.hexdigest()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO quizzes (quiz_key, source_hash, source_kind, source_label, title, model, num_questions, "
+                "time_limit, difficulty, grade_level, options, items, item_count, raw_output, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (quiz_key, source_hash, source_kind, source_label, title, model_name, num_questions, time_limit,
+                 difficulty, grade_level, options_json, json.dumps(items, ensure_ascii=False), len(items),
+                 raw_output, time.time()),
+            )
+            if cursor.rowcount:
+                quiz_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO quiz_questions (question, quiz_id) VALUES (?, ?)",
+                    [(str(item.get("Question Text") or ""), quiz_id) for item in items],
+                )
+            else:
+                quiz_id = self._conn.execute("SELECT id FROM quizzes WHERE quiz_key = ?", (quiz_key,)).fetchone()[0]
+            self._conn.commit()
+        return quiz_id
+
+    def get(self, quiz_id):
+        """저장된 퀴즈 (문항 목록 items, 원본 응답 raw_output, 옵션 options 포함) 를 반환합니다. 없으면 None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)}, options, items, raw_output FROM quizzes WHERE id = ?",
+                (quiz_id,)).fetchone()
+        if row is None:
+            return None
+        quiz = dict(zip(_SUMMARY_COLUMNS + ("options", "items", "raw_output"), row))
+        quiz["options"] = json.loads(quiz["options"])
+        quiz["items"] = json.loads(quiz["items"])
+        return quiz
+
+    def iter_quiz_items(self, after_id=0, page_size=500):
+        """id 가 after_id 보다 큰 퀴즈의 (id, 소스 해시, 문항 목록) 을 id 순서로 yield 합니다 (중복 검사 색인용)."""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, source_hash, items FROM quizzes WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, page_size)).fetchall()
+            for quiz_id, quiz_source_hash, items in rows:
+                yield quiz_id, quiz_source_hash, json.loads(items)
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1][0]
+
+    def search(self, query=None, source_hash=None, source_kind=None, grade_level=None, difficulty=None,
+               since=None, until=None, limit=DEFAULT_SEARCH_LIMIT):
+        """조건에 맞는 퀴즈 요약(문항 제외)을 최근 순으로 반환합니다. query 는 질문 본문에서 찾습니다."""
+        conditions, params = [], []
+        for column, value in (("source_hash", source_hash), ("source_kind", source_kind),
+                              ("grade_level", grade_level), ("difficulty", difficulty)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        query = (query or "").strip()
+        if query:
+            if self.full_text_search and len(query) >= _TRIGRAM_MIN_CHARS:
+                conditions.append("id IN (SELECT quiz_id FROM quiz_questions WHERE quiz_questions MATCH ?)")
+                params.append('"' + query.replace('"', '""') + '"')
+            else:
+                conditions.append("id IN (SELECT quiz_id FROM quiz_questions WHERE instr(question, ?) > 0)")
+                params.append(query)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM quizzes {where} ORDER BY created_at DESC LIMIT ?",
+                params + [limit]).fetchall()
+        return [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows]
+
+    def delete(self, quiz_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM quiz_questions WHERE quiz_id = ?", (quiz_id,))
+            self._conn.execute("DELETE FROM quizzes WHERE id = ?", (quiz_id,))
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, questions = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(item_count), 0) FROM quizzes").fetchone()
+        return {"quizzes": count, "questions": questions}
+
+
+_quiz_bank = None
+_quiz_bank_lock = threading.Lock()
+
+
+def get_quiz_bank():
+    """프로세스 공유 퀴즈 보관함. BLOOKET_QUIZ_BANK_PATH 를 빈 값으로 두면 사용하지 않습니다(None)."""
+    global _quiz_bank
+    with _quiz_bank_lock:
+        if _quiz_bank is None:
+            path = os.environ.get("BLOOKET_QUIZ_BANK_PATH", DEFAULT_PATH)
+            if not path:
+                return None
+            try:
+                _quiz_bank = QuizBank(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"퀴즈 보관함을 열 수 없어 사용하지 않습니다: {e}")
+                return None
+        return _quiz_bank
+
+
+def format_summary(quiz):
+    """목록 표시용 한 줄 요약. 예: 2026-10-17 14:03 · biology_quiz_5q (5문항, 중학교 1학년)"""
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(quiz["created_at"]))
+    details = [f"{quiz['item_count']}문항"]
+    if quiz["grade_level"] != "전체 (선택 안 함)":
+        details.append(quiz["grade_level"])
+    if quiz["difficulty"] != "선택 안 함":
+        details.append(quiz["difficulty"])
+    return f"{created} · {quiz['title'] or quiz['source_label'] or quiz['id']} ({', '.join(details)})"
+
+
+def main(argv=None):
+    from .export import convert_to_blooket_csv, convert_to_blooket_xlsx
+
+    parser = argparse.ArgumentParser(prog="python -m quizgen.quiz_bank", description="저장된 퀴즈 검색 및 내보내기")
+    parser.add_argument("command", choices=["stats", "search", "export", "delete"])
+    parser.add_argument("target", nargs="?", help="search: 질문 검색어, export/delete: 퀴즈 id")
+    parser.add_argument("--path", default=os.environ.get("BLOOKET_QUIZ_BANK_PATH") or DEFAULT_PATH)
+    parser.add_argument("--grade", help="학년/수준 (예: 중학교 1학년)")
+    parser.add_argument("--difficulty", help="난이도 (예: 쉬움)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT)
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv", help="export 형식")
+    parser.add_argument("--output", help="export 파일 경로 (기본값: <제목>.<형식>)")
+    args = parser.parse_args(argv)
+
+    bank = QuizBank(args.path)
+    if args.command == "stats":
+        stats = bank.stats()
+        print(f"{args.path}: 퀴즈 {stats['quizzes']}개, 문항 {stats['questions']}개")
+    elif args.command == "search":
+        for quiz in bank.search(args.target, grade_level=args.grade, difficulty=args.difficulty, limit=args.limit):
+            print(f"{quiz['id']:>6}  {format_summary(quiz)}")
+    else:
+        if not args.target or not args.target.isdigit():
+            parser.error(f"{args.command} 에는 퀴즈 id 가 필요합니다.")
+        quiz_id = int(args.target)
+        if args.command == "delete":
+            bank.delete(quiz_id)
+            print(f"퀴즈 {quiz_id} 를 삭제했습니다.")
+            return 0
+        quiz = bank.get(quiz_id)
+        if quiz is None:
+            print(f"퀴즈 {quiz_id} 를 찾을 수 없습니다.")
+            return 1
+        output = args.output or f"{quiz['title'] or f'quiz_{quiz_id}'}.{args.format}"
+        if args.format == "csv":
+            with open(output, "w", encoding="utf-8-sig", newline="") as f:
+                f.write(convert_to_blooket_csv(quiz["items"]))
+        else:
+            with open(output, "wb") as f:
+                f.write(convert_to_blooket_xlsx(quiz["items"]))
+        print(f"저장: {output} ({quiz['item_count']}문항)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+"""Gemini 응답 영구 캐시 (SQLite).
+
+최종 프롬프트와 모델 이름의 해시를 키로 원본 응답을 저장합니다.
+같은 소스와 같은 옵션으로 다시 생성하면 API를 호출하지 않고 즉시 응답을 재사용하며(데모 재현),
+파서가 바뀌었을 때 저장된 원본 응답으로 파싱만 다시 실행해 볼 수 있습니다.
+TTL이 지난 항목은 무시/삭제하고, 전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다.
+
+    python -m quizgen.response_cache stats
+    python -m quizgen.response_cache reparse --time-limit 20
+    python -m quizgen.response_cache clear
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .metrics import get_metrics, mark_cache_hit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "blooket", "responses.sqlite3")
+DEFAULT_TTL = 30 * 24 * 60 * 60 # 30일
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024 # 256MB
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+def response_cache_key(prompt, model_name):
+    """최종 프롬프트와 모델 이름으로 캐시 키를 만듭니다."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x1f")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def model_name_of(model):
+    return getattr(model, "model_name", None) or type(model).__name__
+
+
+class ResponseCache:
+    """스레드 안전 SQLite 응답 저장소."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def get(self, key):
+        """저장된 응답을 반환합니다. 없거나 TTL이 지났으면 None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+        return response
+
+    def put(self, key, model_name, response):
+        if not response:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model_name, response, size, now, now),
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        """만료 항목을 지우고, 크기 한도를 넘으면 마지막 사용 시각이 오래된 항목부터 지웁니다."""
+        if self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def iter_entries(self):
+        """(키, 모델 이름, 원본 응답) 을 저장 시각 순서로 yield 합니다 (파서 재실행용)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, model, response FROM responses ORDER BY created_at").fetchall()
+        for row in rows:
+            yield row
+
+    def stats(self):
+        with self._lock:
+            count, total, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total, "hits": hits}
+
+
+class _CachedResponse:
+    """캐시에서 꺼낸 응답. 일반 응답(.text)과 스트리밍 응답(반복) 양쪽으로 사용할 수 있습니다."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        yield self
+
+
+class CachedModel:
+    """generate_content 앞에 응답 캐시를 두는 모델 래퍼.
+
+    refresh=True 이면 저장된 응답을 무시하고 새로 생성한 뒤 결과로 캐시를 갱신합니다(강제 재생성).
+    hits / misses 는 이 래퍼를 통해 일어난 캐시 적중/미스 횟수입니다.
+    """
+
+    def __init__(self, model, cache, refresh=False):
+        self._model = model
+        self._cache = cache
+        self.refresh = refresh
+        self.model_name = model_name_of(model)
+        self.hits = 0
+        self.misses = 0
+        self._count_lock = threading.Lock()
+
+    def _count(self, hit):
+        with self._count_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        mark_cache_hit(hit)
+        get_metrics().increment("response_cache.hit" if hit else "response_cache.miss")
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        key = response_cache_key(prompt, self.model_name)
+        if not self.refresh:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._count(True)
+                return _CachedResponse(cached)
+        self._count(False)
+        if stream:
+            return self._stream_and_store(key, self._model.generate_content(prompt, stream=True, **kwargs))
+        response = self._model.generate_content(prompt, **kwargs)
+        self._cache.put(key, self.model_name, response.text)
+        return response
+
+    def _stream_and_store(self, key, response):
+        """스트리밍 조각을 그대로 넘기고, 끝까지 받은 경우에만 전체 응답을 저장합니다."""
+        parts = []
+        for chunk in response:
+            try:
+                parts.append(chunk.text)
+            except ValueError:
+                pass
+            yield chunk
+        self._cache.put(key, self.model_name, "".join(parts))
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """프로세스 공유 응답 캐시. BLOOKET_RESPONSE_CACHE_PATH 를 빈 값으로 두면 사용하지 않습니다(None).
+
+    BLOOKET_RESPONSE_CACHE_TTL (초), BLOOKET_RESPONSE_CACHE_MB 로 TTL과 크기 한도를 설정합니다.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            path = os.environ.get("BLOOKET_RESPONSE_CACHE_PATH", DEFAULT_PATH)
+            if not path:
+                return None
+            try:
+                ttl = int(os.environ.get("BLOOKET_RESPONSE_CACHE_TTL", DEFAULT_TTL))
+                max_bytes = int(os.environ.get("BLOOKET_RESPONSE_CACHE_MB", DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+                _response_cache = ResponseCache(path, ttl=ttl, max_bytes=max_bytes)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                logger.warning(f"Gemini 응답 캐시를 열 수 없어 사용하지 않습니다: {e}")
+                return None
+        return _response_cache
+
+
+def with_response_cache(model, refresh=False):
+    """응답 캐시를 사용할 수 있으면 CachedModel 로 감싸고, 아니면 모델을 그대로 반환합니다."""
+    cache = get_response_cache()
+    if cache is None:
+        return model
+    return CachedModel(model, cache, refresh=refresh)
+
+
+def main(argv=None):
+    from .parser import parse_response
+
+    parser = argparse.ArgumentParser(prog="python -m quizgen.response_cache", description="저장된 Gemini 응답 관리")
+    parser.add_argument("command", choices=["stats", "reparse", "clear"])
+    parser.add_argument("--path", default=os.environ.get("BLOOKET_RESPONSE_CACHE_PATH") or DEFAULT_PATH)
+    parser.add_argument("--time-limit", type=int, default=20, help="reparse 시 기본 시간 제한(초)")
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(args.path, ttl=0, max_bytes=0)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"{args.path}: 응답 {stats['entries']}개, {stats['bytes'] / 1024:,.0f}KB, 누적 재사용 {stats['hits']}회")
+    elif args.command == "clear":
+        cache.clear()
+        print("저장된 응답을 모두 삭제했습니다.")
+    else:
+        total_items = total_skipped = 0
+        for key, model_name, response in cache.iter_entries():
+            result = parse_response(response, args.time_limit)
+            total_items += len(result.items)
+            total_skipped += len(result.diagnostics)
+            print(f"{key[:12]} {model_name}: 문항 {len(result.items)}개, 건너뛴 블록 {len(result.diagnostics)}개")
+        print(f"합계: 문항 {total_items}개, 건너뛴 블록 {total_skipped}개")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
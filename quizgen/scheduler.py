@@ -0,0 +1,282 @@
+"""프로세스 전체에서 공유하는 Gemini 호출 스케줄러.
+
+여러 세션(선생님 여러 명)이 한 Streamlit 서버에서 동시에 생성해도 할당량을 넘지 않도록
+- 요청 수 / 토큰 수 토큰 버킷으로 분당 호출량을 제한하고
+- 할당량 초과(429), 일시적 서버 오류는 지수 백오프 + 지터로 다시 시도하며
+- 같은 프롬프트의 동시 요청은 진행 중인 호출 하나의 결과를 함께 사용합니다(single-flight).
+대기 중/실행 중 요청 수를 제공하므로 화면에 대기 상황을 보여줄 수 있습니다.
+
+환경 변수: BLOOKET_MODEL_RPM, BLOOKET_MODEL_TPM, BLOOKET_MODEL_CONCURRENCY, BLOOKET_MODEL_RETRIES (0이면 제한/재시도 없음)
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from .chunking import estimate_tokens
+from .response_cache import model_name_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TOKENS_PER_MINUTE = 1000000
+DEFAULT_MAX_CONCURRENT_CALLS = 8
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0 # 초
+DEFAULT_MAX_DELAY = 60.0 # 초
+
+_retryable_errors = None
+
+
+def retryable_errors():
+    """다시 시도할 예외 종류 (google.api_core 는 처음 필요할 때 가져옴)."""
+    global _retryable_errors
+    if _retryable_errors is None:
+        from google.api_core import exceptions as google_exceptions
+        _retryable_errors = (
+            google_exceptions.TooManyRequests, # ResourceExhausted(429) 포함
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.GatewayTimeout,
+            ConnectionError,
+            TimeoutError,
+        )
+    return _retryable_errors
+
+
+class TokenBucket:
+    """분당 rate_per_minute 만큼 채워지는 토큰 버킷 (최대 1분치까지 몰아 쓸 수 있음). rate가 0이면 제한 없음."""
+
+    def __init__(self, rate_per_minute):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = float(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_minute / 60.0)
+        self._updated_at = now
+
+    def acquire(self, amount=1):
+        """토큰을 amount 만큼 가져올 때까지 기다리고 기다린 시간(초)을 반환합니다."""
+        if not self.rate_per_minute:
+            return 0.0
+        amount = min(float(amount), self.capacity) # 버킷보다 큰 요청은 버킷 전체를 사용
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                self._refill_locked()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return time.monotonic() - started
+                self._condition.wait((amount - self._tokens) * 60.0 / self.rate_per_minute)
+
+
+class _Flight:
+    """진행 중인 호출 하나와, 그 결과를 기다리는 동일 요청들."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ModelScheduler:
+    """요청/토큰 제한, 재시도, 동일 요청 합치기를 담당하는 스레드 안전 스케줄러."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 max_concurrent_calls=DEFAULT_MAX_CONCURRENT_CALLS, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_calls) if max_concurrent_calls else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {"waiting": 0, "in_flight": 0, "completed": 0, "failed": 0, "retries": 0, "coalesced": 0}
+
+    # --- 상태 ---
+    def _add(self, name, delta=1):
+        with self._lock:
+            self._stats[name] += delta
+
+    @property
+    def queue_depth(self):
+        """대기 중이거나 실행 중인 호출 수."""
+        with self._lock:
+            return self._stats["waiting"] + self._stats["in_flight"]
+
+    def stats_snapshot(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # --- 제한과 재시도 ---
+    @contextmanager
+    def _slot(self, prompt):
+        """호출 한 번의 차례를 기다렸다가(요청/토큰 버킷, 동시 호출 수) 실행 중으로 표시합니다."""
+        self._add("waiting")
+        acquired = False
+        try:
+            self._request_bucket.acquire(1)
+            self._token_bucket.acquire(estimate_tokens(prompt))
+            if self._semaphore:
+                self._semaphore.acquire()
+            acquired = True
+        finally:
+            with self._lock:
+                self._stats["waiting"] -= 1
+                if acquired:
+                    self._stats["in_flight"] += 1
+        try:
+            yield
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+            self._add("in_flight", -1)
+
+    def _backoff(self, attempt, error):
+        """지수 백오프에 지터를 더한 시간만큼 (대기 중으로 표시한 채) 잠시 멈춥니다."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        logger.info(f"Gemini 호출이 일시적으로 실패해 {delay:.1f}초 후 다시 시도합니다 ({attempt + 1}/{self.max_retries}): {error}")
+        self._add("retries")
+        self._add("waiting")
+        try:
+            time.sleep(delay)
+        finally:
+            self._add("waiting", -1)
+
+    def _call_with_retry(self, model, prompt, kwargs):
+        attempt = 0
+        while True:
+            try:
+                with self._slot(prompt):
+                    response = model.generate_content(prompt, **kwargs)
+                    response.text # 응답 본문 오류도 이 호출 안에서 확인
+                self._add("completed")
+                return response
+            except retryable_errors() as e:
+                if attempt >= self.max_retries:
+                    self._add("failed")
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+            except Exception:
+                self._add("failed")
+                raise
+
+    def _stream_with_retry(self, model, prompt, kwargs):
+        """스트리밍 호출. 첫 조각을 받기 전의 일시 오류만 다시 시도합니다 (이미 보낸 조각은 되돌릴 수 없음)."""
+        attempt = 0
+        while True:
+            started = False
+            try:
+                with self._slot(prompt):
+                    for chunk in model.generate_content(prompt, stream=True, **kwargs):
+                        started = True
+                        yield chunk
+                self._add("completed")
+                return
+            except retryable_errors() as e:
+                if started or attempt >= self.max_retries:
+                    self._add("failed")
+                    raise
+                self._backoff(attempt, e)
+                attempt += 1
+            except Exception:
+                self._add("failed")
+                raise
+
+    # --- 호출 ---
+    def generate_content(self, model, prompt, stream=False, **kwargs):
+        """model.generate_content 를 스케줄러를 거쳐 호출합니다.
+
+        스트리밍이 아닌 호출은 같은 모델·프롬프트·옵션으로 이미 진행 중인 호출이 있으면 그 결과를 함께 받습니다.
+        """
+        if stream:
+            return self._stream_with_retry(model, prompt, kwargs)
+
+        key = (model_name_of(model), prompt, repr(sorted(kwargs.items())))
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            self._add("waiting")
+            try:
+                flight.done.wait()
+            finally:
+                self._add("waiting", -1)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call_with_retry(model, prompt, kwargs)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def bind(self, model):
+        return ScheduledModel(model, self)
+
+
+class ScheduledModel:
+    """generate_content 를 공유 스케줄러로 보내는 모델 래퍼."""
+
+    def __init__(self, model, scheduler):
+        self._model = model
+        self._scheduler = scheduler
+        self.model_name = model_name_of(model)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        return self._scheduler.generate_content(self._model, prompt, stream=stream, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logger.warning(f"환경 변수 {name} 값이 정수가 아니어서 기본값 {default}을(를) 사용합니다.")
+        return default
+
+
+def get_scheduler():
+    """프로세스 공유 스케줄러 (BLOOKET_MODEL_* 환경 변수로 설정)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ModelScheduler(
+                requests_per_minute=_env_int("BLOOKET_MODEL_RPM", DEFAULT_REQUESTS_PER_MINUTE),
+                tokens_per_minute=_env_int("BLOOKET_MODEL_TPM", DEFAULT_TOKENS_PER_MINUTE),
+                max_concurrent_calls=_env_int("BLOOKET_MODEL_CONCURRENCY", DEFAULT_MAX_CONCURRENT_CALLS),
+                max_retries=_env_int("BLOOKET_MODEL_RETRIES", DEFAULT_MAX_RETRIES),
+            )
+        return _scheduler
+
+
+def with_scheduler(model):
+    """모델을 프로세스 공유 스케줄러에 연결합니다."""
+    return get_scheduler().bind(model)
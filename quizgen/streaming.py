@@ -0,0 +1,71 @@
+"""스트리밍 응답에서 [질문시작]…[질문끝] 블록을 닫히는 즉시 꺼내는 점진적 파서.
+
+블록 표식은 전체 응답 파서와 같은 정규식(parser._MARKER_RE)으로 찾으므로 공백이 들어간 표식, 영문 표식,
+[질문끝] 없이 다음 [질문시작]이 오는 경우를 똑같이 허용합니다. 응답 조각(chunk)의 경계에서 표식이 잘려 들어와도
+올바르게 처리하며, 버퍼 전체를 반복해서 다시 검색하지 않도록 이미 확인한 위치를 기억합니다.
+"""
+from .parser import _MARKER_RE
+
+_MAX_MARKER_LENGTH = 40 # 조각 경계에서 잘린 표식을 다시 찾기 위해 남겨 두는 길이 (가장 긴 표식보다 넉넉하게)
+
+
+class IncrementalBlockParser:
+    """feed()로 텍스트 조각을 받아, 완성된 블록의 내부 텍스트 목록을 돌려줍니다.
+
+    feed() 와 마지막 close() 가 돌려준 블록을 이어 붙이면 응답 전체에 parser.iter_blocks 를 적용한 결과와 같습니다.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_block = False
+        self._scan_from = 0  # 다음 표식 검색을 시작할 버퍼 위치
+        self.blocks_emitted = 0
+
+    def feed(self, text):
+        if not text:
+            return []
+        self._buffer += text
+        blocks = []
+        while True:
+            marker = _MARKER_RE.search(self._buffer, self._scan_from)
+            if marker is None:
+                # 표식이 조각 경계에서 잘렸을 수 있으므로 끝부분만 다시 검색
+                if self._in_block:
+                    self._scan_from = max(0, len(self._buffer) - _MAX_MARKER_LENGTH)
+                else:
+                    self._buffer = self._buffer[-_MAX_MARKER_LENGTH:]
+                    self._scan_from = 0
+                break
+            if self._in_block:
+                # [질문끝], 또는 [질문끝] 없이 나온 다음 [질문시작] 이 이전 블록을 닫음
+                blocks.append(self._buffer[:marker.start()])
+                self.blocks_emitted += 1
+            self._in_block = bool(marker.group("start"))
+            self._buffer = self._buffer[marker.end():]
+            self._scan_from = 0
+        return blocks
+
+    def close(self):
+        """응답이 끝났을 때 [질문끝] 없이 남은 마지막 블록을 목록으로 돌려줍니다 (없으면 빈 목록)."""
+        blocks = []
+        if self._in_block:
+            blocks.append(self._buffer)
+            self.blocks_emitted += 1
+        self._buffer = ""
+        self._in_block = False
+        self._scan_from = 0
+        return blocks
+
+    @property
+    def pending_text(self):
+        """닫히지 않은 블록의 현재까지 내용 (응답이 중간에 끊긴 경우 진단용)."""
+        return self._buffer if self._in_block else ""
+
+
+def iter_stream_blocks(text_chunks, parser=None):
+    """텍스트 조각 이터러블을 받아 완성된 블록을 하나씩 yield 합니다 (마지막의 닫히지 않은 블록 포함)."""
+    parser = parser or IncrementalBlockParser()
+    for chunk in text_chunks:
+        for block in parser.feed(chunk):
+            yield block
+    yield from parser.close()
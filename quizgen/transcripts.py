@@ -0,0 +1,201 @@
+"""유튜브 자막 가져오기 계층.
+
+- 자막 제공자(TranscriptProvider): 기본값은 youtube-transcript-api, 테스트/벤치마크에서는 로컬 대체 구현으로 바꿀 수 있음
+- 영상별 자막 목록과 언어별 자막 조각(시작 시각, 길이 포함)을 추출 캐시에 따로 보관
+  (다른 언어를 고르거나 같은 영상을 다른 재생목록에서 다시 가져와도 목록/조각을 다시 받지 않음)
+- 여러 영상을 제한된 스레드 풀에서 동시에 가져오며, 영상 하나의 실패는 결과의 error 로만 남기고 나머지는 계속 진행
+- 시간 구간별로 조각을 묶어 "[분:초]" 표시가 붙은 문단으로 만들기 (이후 단계에서 시간 기준으로 나눌 수 있도록)
+
+이 모듈은 비디오 ID 만 다룹니다. URL 해석은 extractors.resolve_youtube_video_id 를 사용하세요.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import get_extraction_cache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+PREFERRED_LANGUAGES = ("ko", "en")
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_WINDOW_SECONDS = 120 # 타임스탬프 문단 하나의 길이
+_MAX_OPEN_LISTS = 64 # 목록 조회 후 자막을 가져올 때까지 보관할 자막 목록 객체 수
+
+
+# --- 1. 자막 제공자 ---
+def _segment(snippet):
+    """라이브러리 버전마다 다른 자막 조각 형식(dict / 객체)을 {"text", "start", "duration"} 으로 맞춥니다."""
+    if isinstance(snippet, dict):
+        return {"text": snippet["text"], "start": float(snippet["start"]), "duration": float(snippet.get("duration", 0.0))}
+    return {"text": snippet.text, "start": float(snippet.start), "duration": float(snippet.duration)}
+
+
+class YouTubeTranscriptProvider:
+    """youtube-transcript-api 로 자막 목록과 자막을 가져옵니다 (1.x 인스턴스 API 와 이전 버전의 list_transcripts 모두 지원).
+
+    list_transcripts 로 받은 목록 객체를 잠시 보관해 바로 이어지는 fetch 에서 목록을 다시 조회하지 않습니다.
+    """
+
+    def __init__(self):
+        # 유튜브 입력을 처음 사용할 때만 가져옴 (앱 시작 시간 단축)
+        from youtube_transcript_api import YouTubeTranscriptApi
+
+        self._api = YouTubeTranscriptApi() if hasattr(YouTubeTranscriptApi, "list") else YouTubeTranscriptApi
+        self._lock = threading.Lock()
+        self._open_lists = OrderedDict()
+
+    def _transcript_list(self, video_id):
+        with self._lock:
+            transcript_list = self._open_lists.pop(video_id, None)
+        if transcript_list is not None:
+            return transcript_list
+        if hasattr(self._api, "list_transcripts"):
+            return self._api.list_transcripts(video_id)
+        return self._api.list(video_id)
+
+    def list_transcripts(self, video_id):
+        """사용 가능한 자막 목록: {"language_code", "language", "is_generated"} 목록."""
+        transcript_list = self._transcript_list(video_id)
+        with self._lock:
+            self._open_lists[video_id] = transcript_list
+            while len(self._open_lists) > _MAX_OPEN_LISTS:
+                self._open_lists.popitem(last=False)
+        return [{"language_code": t.language_code, "language": t.language, "is_generated": bool(t.is_generated)}
+                for t in transcript_list]
+
+    def fetch(self, video_id, language_code, is_generated):
+        """한 언어의 자막 조각 목록: {"text", "start", "duration"} 목록."""
+        transcript_list = self._transcript_list(video_id)
+        if is_generated:
+            transcript = transcript_list.find_generated_transcript([language_code])
+        else:
+            transcript = transcript_list.find_manually_created_transcript([language_code])
+        return [_segment(snippet) for snippet in transcript.fetch()]
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_transcript_provider():
+    """프로세스 공유 자막 제공자 (기본값: youtube-transcript-api)."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = YouTubeTranscriptProvider()
+        return _provider
+
+
+def set_transcript_provider(provider):
+    """자막 제공자를 바꿉니다 (list_transcripts(video_id), fetch(video_id, language_code, is_generated) 를 제공하는 객체).
+
+    None 을 넘기면 다음 호출 때 기본 제공자를 다시 만듭니다. 이전 제공자를 반환합니다.
+    """
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
+
+
+# --- 2. 자막 선택과 캐시 ---
+def choose_transcript(listing, preferred_languages=PREFERRED_LANGUAGES):
+    """수동 자막(선호 언어 순) → 자동 생성 자막(선호 언어 순) → 첫 번째 자막 순서로 고릅니다. 자막이 없으면 None."""
+    for is_generated in (False, True):
+        for language_code in preferred_languages:
+            for transcript in listing:
+                if transcript["language_code"] == language_code and transcript["is_generated"] == is_generated:
+                    return transcript
+    return listing[0] if listing else None
+
+
+def describe_error(error):
+    """자막을 가져오지 못한 이유를 사용자에게 보여줄 문장으로 바꿉니다."""
+    from youtube_transcript_api import CouldNotRetrieveTranscript, NoTranscriptFound, TranscriptsDisabled
+
+    if isinstance(error, TranscriptsDisabled):
+        return "스크립트가 비활성화되어 있습니다."
+    if isinstance(error, NoTranscriptFound):
+        return "요청한 언어의 스크립트를 찾을 수 없습니다."
+    if isinstance(error, CouldNotRetrieveTranscript):
+        return f"스크립트를 가져오는 중 오류가 발생했습니다. 유튜브 응답에 문제가 있을 수 있습니다. 오류: {error}"
+    if "no element found" in str(error).lower() or "Unexpected status code 400" in str(error):
+        return (f"스크립트 데이터 파싱 또는 요청 중 오류가 발생했습니다. 영상의 스크립트 데이터가 비어있거나, 형식이 잘못되었거나, "
+                f"접근이 차단되었을 수 있습니다. 다른 영상을 시도해보세요. (오류: {error})")
+    return f"스크립트 추출 중 예상치 못한 오류가 발생했습니다: {error}"
+
+
+def fetch_transcript(video_id, provider=None, cache=None, preferred_languages=PREFERRED_LANGUAGES):
+    """영상 하나의 자막을 가져옵니다. 예외를 올리지 않고 결과 dict 의 error 에 담습니다.
+
+    반환값: {"video_id", "language_code", "language", "is_generated", "fallback", "segments", "error"}
+    fallback 은 선호 언어 자막이 없어 첫 번째 자막을 사용한 경우 True 입니다.
+    """
+    provider = provider or get_transcript_provider()
+    cache = cache or get_extraction_cache()
+    result = {"video_id": video_id, "language_code": None, "language": None, "is_generated": None,
+              "fallback": False, "segments": None, "error": None}
+    try:
+        listing = cache.get_or_compute(make_cache_key("ytlist", video_id), lambda: provider.list_transcripts(video_id))
+        transcript = choose_transcript(listing or [], preferred_languages)
+        if transcript is None:
+            result["error"] = "사용 가능한 스크립트가 전혀 없습니다."
+            return result
+        result.update(language_code=transcript["language_code"], language=transcript["language"],
+                      is_generated=transcript["is_generated"],
+                      fallback=transcript["language_code"] not in preferred_languages)
+        segments = cache.get_or_compute(
+            make_cache_key("ytseg", video_id, transcript["language_code"], transcript["is_generated"]),
+            lambda: provider.fetch(video_id, transcript["language_code"], transcript["is_generated"]))
+        if not segments:
+            result["error"] = "스크립트가 비어 있습니다."
+            return result
+        result["segments"] = segments
+    except Exception as e:
+        logger.debug(f"Error fetching transcript for {video_id}", exc_info=True)
+        result["error"] = describe_error(e)
+    return result
+
+
+def fetch_transcripts(video_ids, max_workers=DEFAULT_MAX_WORKERS, provider=None, cache=None,
+                      preferred_languages=PREFERRED_LANGUAGES):
+    """여러 영상의 자막을 동시에 가져와 입력 순서대로 fetch_transcript 결과 목록을 반환합니다 (중복 ID 는 한 번만)."""
+    video_ids = list(OrderedDict.fromkeys(video_ids))
+    if not video_ids:
+        return []
+    provider = provider or get_transcript_provider()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_ids))), thread_name_prefix="quizgen-youtube") as executor:
+        return list(executor.map(lambda video_id: fetch_transcript(video_id, provider, cache, preferred_languages), video_ids))
+
+
+# --- 3. 시간 구간 ---
+def format_timestamp(seconds):
+    """초를 "분:초" (한 시간 이상이면 "시:분:초") 로 표시합니다."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def group_segments(segments, window_seconds=DEFAULT_WINDOW_SECONDS):
+    """자막 조각을 시작 시각 기준 window_seconds 구간으로 묶습니다: {"start", "end", "text"} 목록."""
+    groups = []
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        end = segment["start"] + segment.get("duration", 0.0)
+        if groups and segment["start"] < groups[-1]["start"] + window_seconds:
+            groups[-1]["text"] += " " + text
+            groups[-1]["end"] = max(groups[-1]["end"], end)
+        else:
+            groups.append({"start": segment["start"], "end": end, "text": text})
+    return groups
+
+
+def segments_to_text(segments, window_seconds=None):
+    """자막 조각을 텍스트로 합칩니다. window_seconds 를 주면 구간마다 "[분:초]" 로 시작하는 문단으로 나눕니다."""
+    if not window_seconds:
+        return " ".join(segment["text"] for segment in segments)
+    return "\n\n".join(f"[{format_timestamp(group['start'])}] {group['text']}"
+                       for group in group_segments(segments, window_seconds))
@@ -0,0 +1,219 @@
+"""웹페이지 가져오기 계층.
+
+- 프로세스 전체에서 공유하는 requests.Session (연결 풀 재사용)
+- ETag / Last-Modified 조건부 요청으로 바뀌지 않은 페이지는 본문을 다시 받지 않음
+- 본문을 스트리밍으로 받으면서 최대 크기를 넘으면 즉시 중단
+- lxml 이 설치되어 있으면 더 빠른 HTML 파서 사용
+- 여러 URL, 또는 같은 사이트 링크를 깊이 제한까지 따라가며 동시에 가져오기
+"""
+import importlib.util
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+
+from .cache import cache_from_env, normalize_url, website_cache_key
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_TIMEOUT = 10 # 초
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024 # 페이지 하나의 최대 본문 크기
+DEFAULT_MAX_PAGES = 20
+DEFAULT_MAX_WORKERS = 8
+_STREAM_CHUNK_SIZE = 64 * 1024
+_ENCODING_SNIFF_BYTES = 64 * 1024
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_\-]+)""", re.IGNORECASE)
+_SKIP_LINK_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".mp4", ".mp3", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx")
+
+# 본문 추출에서 제외할 태그 / 본문으로 사용할 태그
+_REMOVED_TAGS = ['script', 'style', 'nav', 'footer', 'aside', 'header', 'form', 'button', 'iframe', 'img', 'a'] # a, img 태그도 내용 추출에서 제외
+_TEXT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'td', 'th', 'caption', 'blockquote', 'q', 'pre'] # div, span 제외하고 구체적인 태그 명시
+
+
+class ResponseTooLargeError(requests.RequestException):
+    """응답 본문이 허용된 최대 크기를 넘은 경우."""
+
+
+# --- 1. 공유 세션과 조건부 요청 캐시 ---
+_session = None
+_validator_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_session():
+    """연결 풀을 재사용하는 프로세스 공유 세션 (requests.Session 은 여러 스레드에서 요청을 보내도 안전하게 사용 가능)."""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=DEFAULT_MAX_WORKERS * 2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({'User-Agent': USER_AGENT})
+            _session = session
+        return _session
+
+
+def get_validator_cache():
+    """ETag / Last-Modified 와 본문을 보관하는 캐시 (BLOOKET_HTTP_CACHE_* 환경 변수로 설정)."""
+    global _validator_cache
+    with _shared_lock:
+        if _validator_cache is None:
+            _validator_cache = cache_from_env("BLOOKET_HTTP_CACHE")
+        return _validator_cache
+
+
+def html_parser_backend():
+    """설치되어 있으면 lxml, 아니면 표준 라이브러리 html.parser."""
+    return "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+# --- 2. 가져오기 ---
+def _decode_body(body, response):
+    """헤더의 charset → HTML meta charset → 내용 기반 추정 순서로 인코딩을 결정합니다."""
+    content_type = response.headers.get("Content-Type", "")
+    encoding = None
+    if "charset=" in content_type.lower():
+        encoding = response.encoding
+    if not encoding:
+        meta = _META_CHARSET_RE.search(body[:4096])
+        if meta:
+            encoding = meta.group(1).decode("ascii", "ignore")
+    if not encoding:
+        encoding = chardet.detect(body[:_ENCODING_SNIFF_BYTES]).get("encoding") if chardet else None
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def fetch_html(url, timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES, session=None):
+    """URL의 HTML 텍스트를 가져옵니다. 요청 오류는 requests.RequestException 으로 전달됩니다.
+
+    이전에 받은 ETag / Last-Modified 가 있으면 조건부 요청을 보내고, 304 응답이면 보관된 본문을 사용합니다.
+    """
+    session = session or get_session()
+    cache = get_validator_cache()
+    cache_key = website_cache_key(url, "validators")
+    cached = cache.get(cache_key)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 and cached:
+            logger.debug(f"변경 없음(304), 보관된 본문 사용: {url}")
+            return cached["html"]
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ResponseTooLargeError(f"응답 크기({int(content_length):,}바이트)가 최대 허용 크기({max_bytes:,}바이트)를 넘습니다: {url}")
+        chunks, size = [], 0
+        for chunk in response.iter_content(_STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseTooLargeError(f"응답 크기가 최대 허용 크기({max_bytes:,}바이트)를 넘어 다운로드를 중단했습니다: {url}")
+            chunks.append(chunk)
+        html = _decode_body(b"".join(chunks), response)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    if etag or last_modified:
+        cache.set(cache_key, {"etag": etag, "last_modified": last_modified, "html": html})
+    return html
+
+
+# --- 3. HTML → 텍스트 ---
+def _same_site_links(soup, base_url):
+    base_host = urlsplit(base_url).hostname
+    links = []
+    for anchor in soup.find_all("a", href=True):
+        link = urldefrag(urljoin(base_url, anchor["href"]))[0]
+        parts = urlsplit(link)
+        if parts.scheme not in ("http", "https") or parts.hostname != base_host:
+            continue
+        if parts.path.lower().endswith(_SKIP_LINK_EXTENSIONS):
+            continue
+        links.append(link)
+    return links
+
+
+def html_to_text(html, base_url=None, collect_links=False):
+    """HTML에서 본문 텍스트를 추출해 (텍스트, 같은 사이트 링크 목록) 을 반환합니다."""
+    from bs4 import BeautifulSoup # 웹사이트 입력을 처음 처리할 때만 가져옴
+
+    soup = BeautifulSoup(html, html_parser_backend())
+    links = _same_site_links(soup, base_url) if collect_links and base_url else []
+
+    for element in soup(_REMOVED_TAGS):
+        element.decompose()
+
+    main_content = soup.find('article') or soup.find('main') or soup.find('body')
+
+    if main_content:
+        text_parts = []
+        for element in main_content.find_all(_TEXT_TAGS):
+            # 클래스 기반 필터링 (예: 광고, 댓글 영역 제외) - 필요시 추가
+            # if 'ad' in element.get('class', []) or 'comment' in element.get('class', []):
+            #    continue
+            paragraph_text = element.get_text(separator=' ', strip=True)
+            if paragraph_text and len(paragraph_text.split()) > 3: # 너무 짧은 텍스트는 제외 (단어 3개 이상)
+                text_parts.append(paragraph_text)
+        text = "\n\n".join(text_parts) # 문단 구분을 명확히 하기 위해 \n\n 사용
+    else:
+        text = soup.get_text(separator='\n', strip=True) # 전체 텍스트 추출 시 줄바꿈 기준으로
+    return text, links
+
+
+# --- 4. 여러 페이지 동시 가져오기 ---
+def _fetch_page(url, collect_links, timeout, max_bytes):
+    """작업 스레드용: 예외를 올리지 않고 결과 dict 를 반환합니다."""
+    try:
+        text, links = html_to_text(fetch_html(url, timeout=timeout, max_bytes=max_bytes), url, collect_links)
+        return {"url": url, "text": text, "links": links, "error": None}
+    except Exception as e:
+        return {"url": url, "text": None, "links": [], "error": e}
+
+
+def fetch_pages(urls, follow_links_depth=0, max_pages=DEFAULT_MAX_PAGES, max_workers=DEFAULT_MAX_WORKERS,
+                timeout=DEFAULT_TIMEOUT, max_bytes=DEFAULT_MAX_BYTES):
+    """여러 URL을 동시에 가져오고, follow_links_depth 단계까지 같은 사이트 링크를 따라갑니다.
+
+    깊이별로 한 단계씩 동시에 가져오며, 전체 페이지 수는 max_pages 로 제한됩니다.
+    반환값은 {"url", "text", "links", "error"} dict 목록이며 입력 URL 순서 → 발견 순서로 정렬됩니다.
+    """
+    seen = set()
+    frontier = []
+    for url in urls:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            frontier.append(url)
+    frontier = frontier[:max_pages]
+    results = []
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="quizgen-web") as executor:
+        while frontier:
+            collect_links = depth < follow_links_depth
+            level = list(executor.map(lambda u: _fetch_page(u, collect_links, timeout, max_bytes), frontier))
+            results.extend(level)
+            frontier = []
+            if not collect_links:
+                break
+            for page in level:
+                for link in page["links"]:
+                    key = normalize_url(link)
+                    if key in seen or len(results) + len(frontier) >= max_pages:
+                        continue
+                    seen.add(key)
+                    frontier.append(link)
+            depth += 1
+    return results
@@ -0,0 +1,12 @@
+"""pytest 공통 설정: 저장소 루트와 benchmarks/ (합성 입력, 대체 모델) 를 가져올 수 있게 하고,
+테스트가 작업 디렉터리에 응답 캐시/퀴즈 보관함 파일을 만들지 않도록 끕니다."""
+import os
+import sys
+
+os.environ["BLOOKET_RESPONSE_CACHE_PATH"] = ""
+os.environ["BLOOKET_QUIZ_BANK_PATH"] = ""
+os.environ["BLOOKET_CONTEXT_CACHE"] = "local"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
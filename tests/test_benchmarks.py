@@ -0,0 +1,23 @@
+import argparse
+
+import pytest
+from bench_pipeline import KINDS, run_scenario
+from fixtures import FakeModel
+
+from quizgen.parser import parse_response
+
+
+def test_fake_model_honours_requested_count_and_malformed_ratio():
+    model = FakeModel(latency=0, malformed_ratio=1.0)
+    assert len(parse_response(model.build_response(4), 20).diagnostics) == 4
+    response = FakeModel(latency=0).generate_content("다음 내용으로 객관식 퀴즈 6개를 만들어 주세요.", stream=True)
+    assert len(parse_response("".join(chunk.text for chunk in response), 20).items) == 6
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_pipeline_scenarios_run_offline(kind):
+    args = argparse.Namespace(num_questions=4, model_workers=2, context_tokens=0, no_preprocess=False, memory=False)
+    result = run_scenario(kind, 2, FakeModel(latency=0), args)
+    assert result["questions"] == 4
+    assert result["text_chars"] > 0 and result["input_bytes"] > 0
+    assert all(stage["failures"] == 0 for stage in result["stages"].values())
@@ -0,0 +1,72 @@
+import os
+import time
+
+from quizgen.cache import (DiskCache, LRUCache, TwoTierCache, normalize_url, pdf_cache_key, website_cache_key,
+                           youtube_cache_key)
+
+
+def test_keys_depend_on_content_and_params():
+    assert pdf_cache_key(b"%PDF-a") == pdf_cache_key(b"%PDF-a")
+    assert pdf_cache_key(b"%PDF-a") != pdf_cache_key(b"%PDF-b")
+    assert pdf_cache_key(b"%PDF-a", "1-3") != pdf_cache_key(b"%PDF-a", "")
+    assert youtube_cache_key("dQw4w9WgXcQ").startswith("youtube-")
+
+
+def test_normalize_url_ignores_cosmetic_differences():
+    assert normalize_url("HTTPS://Example.com:443/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert website_cache_key("http://example.com/") == website_cache_key("http://EXAMPLE.com:80")
+    assert website_cache_key("http://example.com/?page=1") != website_cache_key("http://example.com/?page=2")
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=1000, ttl=None)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # a 를 최근 사용으로
+    cache.set("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl=None)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None and cache.get("b") == "y" * 6
+    cache.set("huge", "z" * 11)
+    assert cache.get("huge") is None and cache.total_bytes == 6
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None and len(cache) == 0
+
+
+def test_disk_cache_round_trip_and_prune(tmp_path):
+    disk = DiskCache(str(tmp_path), ttl=60)
+    disk.set("k", {"text": "본문"})
+    assert DiskCache(str(tmp_path)).get("k") == {"text": "본문"}
+    path = os.path.join(str(tmp_path), "k.json")
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert disk.prune() == 1 and disk.get("k") is None
+
+
+def test_get_or_compute_calls_compute_once_and_skips_failures(tmp_path):
+    cache = TwoTierCache(memory=LRUCache(), disk=DiskCache(str(tmp_path)))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "추출한 텍스트"
+
+    assert cache.get_or_compute("pdf-1", compute) == "추출한 텍스트"
+    assert cache.get_or_compute("pdf-1", compute) == "추출한 텍스트"
+    assert len(calls) == 1
+
+    cache.memory.clear()  # 스크립트 재실행이 아닌 프로세스 재시작 상황
+    assert cache.get_or_compute("pdf-1", compute) == "추출한 텍스트"
+    assert len(calls) == 1
+    assert cache.stats_snapshot()["disk_hits"] == 1
+
+    assert cache.get_or_compute("pdf-2", lambda: None) is None
+    assert cache.get_or_compute("pdf-2", compute) == "추출한 텍스트"
+    assert len(calls) == 2
@@ -0,0 +1,62 @@
+import pytest
+from fixtures import FakeModel
+
+from quizgen.chunking import allocate_questions, estimate_tokens, map_chunks, merge_chunk_outputs, split_into_chunks
+from quizgen.generation import generate_quiz_chunked
+from quizgen.parser import parse_response
+
+PARAGRAPHS = [" ".join(f"topic{p} word{i}" for i in range(40)) for p in range(6)]
+CONTEXT = "\n\n".join(PARAGRAPHS)
+BUDGET = estimate_tokens(PARAGRAPHS[0]) * 2 + 5
+
+
+def test_estimate_tokens_counts_korean_per_character():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("광합성") == 3
+
+
+def test_split_keeps_paragraphs_and_budget():
+    chunks = split_into_chunks(CONTEXT, BUDGET)
+    assert len(chunks) == 3
+    assert all(estimate_tokens(chunk) <= BUDGET for chunk in chunks)
+    assert "\n\n".join(chunks) == CONTEXT
+    assert split_into_chunks("  \n\n ") == []
+
+
+def test_split_breaks_oversized_paragraph():
+    paragraph = "가나다라마바사. " * 50
+    chunks = split_into_chunks(paragraph, 30)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 30 for chunk in chunks)
+
+
+def test_allocate_spreads_questions_over_document():
+    chunks = ["a" * 400] * 4
+    assert allocate_questions(chunks, 8) == [2, 2, 2, 2]
+    assert allocate_questions(chunks, 2) == [1, 0, 1, 0]
+    assert sum(allocate_questions(["a" * 100, "a" * 300], 10)) == 10
+    assert allocate_questions([], 5) == []
+
+
+def test_map_chunks_keeps_order_and_reports_failures():
+    def generate(chunk, n):
+        if chunk == "bad":
+            raise RuntimeError("quota")
+        return f"{chunk}:{n}"
+
+    results = map_chunks(["one", "bad", "two"], 3, generate, max_workers=3)
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert isinstance(results[1]["error"], RuntimeError)
+    assert merge_chunk_outputs(results) == "one:1\n---\ntwo:1"
+    assert merge_chunk_outputs([{"index": 0, "text": None}]) is None
+
+
+@pytest.mark.parametrize("num_questions", [3, 10])
+def test_chunked_generation_returns_requested_count(num_questions):
+    model = FakeModel(latency=0)
+    raw = generate_quiz_chunked(model, CONTEXT, num_questions, 20, "보통", "고등학생", chunk_token_budget=BUDGET)
+    parsed = parse_response(raw, 20)
+    assert model.calls == min(num_questions, 3)
+    assert len(parsed.items) == num_questions
+    assert [item["Question #"] for item in parsed.items] == list(range(1, num_questions + 1))
@@ -0,0 +1,74 @@
+from fixtures import FakeModel
+
+from quizgen.context_cache import ContextBoundModel, LocalContextCache
+from quizgen.generation import build_context_section, build_quiz_prompt
+from quizgen.metrics import get_metrics
+from quizgen.pipeline import build_options, build_variants, generate_variants
+
+CONTEXT = "광합성은 빛에너지로 포도당을 만드는 과정입니다. " * 50
+
+
+class RecordingModel(FakeModel):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+class StrippingCache:
+    """콘텐츠를 다시 보내지 않는 캐시 (Gemini 컨텍스트 캐시처럼 지침만 모델에 전달)."""
+
+    name = "stub"
+    saves_tokens = True
+
+    def __init__(self):
+        self.released = []
+
+    def create(self, model, context_section):
+        return "handle", model
+
+    def release(self, handle):
+        self.released.append(handle)
+
+
+def counter(name):
+    return get_metrics().snapshot()["counters"].get(name, 0)
+
+
+def test_local_cache_resends_content_and_reports_simulated_savings():
+    model = RecordingModel()
+    cache = LocalContextCache()
+    prompt = build_quiz_prompt(CONTEXT, 3, 20, "쉬움", "중학교 1학년")
+    before = counter("context_cache.saved_tokens")
+    with ContextBoundModel(model, CONTEXT, cache) as bound:
+        bound.generate_content(prompt)
+        bound.generate_content(prompt)
+    assert model.prompts == [prompt, prompt]
+    assert bound.cached_calls == 2
+    assert bound.saved_tokens == 0 and bound.simulated_saved_tokens > 0
+    assert counter("context_cache.saved_tokens") == before
+    assert cache.stats == {"created": 1, "released": 1} and cache.active == 0
+
+
+def test_stripping_cache_reports_real_savings():
+    model = RecordingModel()
+    cache = StrippingCache()
+    prompt = build_quiz_prompt(CONTEXT, 3, 20, "쉬움", "중학교 1학년")
+    with ContextBoundModel(model, CONTEXT, cache) as bound:
+        bound.generate_content(prompt)
+        bound.generate_content("콘텐츠가 없는 프롬프트 객관식 퀴즈 1개")
+    assert model.prompts[0] == prompt[:-len(build_context_section(CONTEXT))]
+    assert model.prompts[1] == "콘텐츠가 없는 프롬프트 객관식 퀴즈 1개"
+    assert bound.cached_calls == 1 and bound.saved_tokens > 0 and bound.simulated_saved_tokens == 0
+    assert cache.released == ["handle"]
+
+
+def test_generate_variants_makes_every_variant():
+    variants = build_variants(["쉬움", "어려움"], ["중학교 1학년"], 3)
+    options = build_options(3, chunked=False, preprocess=False, model_workers=2)
+    results = generate_variants(RecordingModel(), CONTEXT, variants, options, context_cache=LocalContextCache())
+    assert [r["variant"] for r in results] == variants
+    assert all(r["error"] is None and len(r["parsed"].items) == 3 for r in results)
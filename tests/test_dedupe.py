@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from quizgen import dedupe
+from quizgen.dedupe import QuestionIndex, find_duplicate_questions, remove_duplicate_questions
+from quizgen.parser import BLOOKET_COLUMNS
+from quizgen.quiz_bank import QuizBank
+
+
+def make_item(number, question, answers=("미토콘드리아", "엽록체", "핵", "리보솜"), correct=2):
+    return dict(zip(BLOOKET_COLUMNS, (number, question, *answers, 20, correct)))
+
+
+ORIGINAL = make_item(1, "식물 세포에서 광합성이 일어나는 세포 소기관은 무엇인가요?")
+PARAPHRASE = make_item(2, "식물 세포에서 광합성이 일어나는 세포 소기관은 어느 것인가요?")
+OTHER = make_item(3, "세포 호흡으로 에너지를 만드는 세포 소기관은 무엇인가요?", correct=1)
+
+
+def test_paraphrase_is_duplicate_within_set():
+    duplicates = find_duplicate_questions([ORIGINAL, PARAPHRASE, OTHER])
+    assert [(d["position"], d["match"]) for d in duplicates] == [(1, ("set", 0))]
+    assert duplicates[0]["similarity"] >= dedupe.DEFAULT_THRESHOLD
+
+
+def test_same_options_different_answer_is_not_duplicate():
+    other_answer = make_item(2, ORIGINAL["Question Text"], correct=3)
+    assert find_duplicate_questions([ORIGINAL, other_answer]) == []
+
+
+def test_index_query_and_ignore():
+    index = QuestionIndex()
+    index.add_items([("quiz", 1)], [ORIGINAL])
+    assert len(index) == 1
+    assert index.query(PARAPHRASE)[0] == ("quiz", 1)
+    assert index.query(PARAPHRASE, ignore=lambda key: key[0] == "quiz") is None
+    assert index.query(OTHER) is None
+
+
+def test_index_concurrent_add_and_query():
+    index = QuestionIndex()
+    items = [make_item(i, f"{i}번째 주제 {'가나다라마바사'[i % 7]}{i * 7919} 에 대한 질문은 무엇인가요?") for i in range(400)]
+    errors = []
+
+    def add(offset):
+        for i in range(offset, len(items), 4):
+            index.add_items([i], [items[i]])
+
+    def query():
+        try:
+            for item in items:
+                index.query(item)
+        except Exception as e: # 색인이 경쟁 상태로 망가지면 범위 밖 접근이 생김
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(k,)) for k in range(4)] + [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(index) == len(items)
+    assert all(index.query(item) is not None for item in items)
+
+
+@pytest.fixture
+def bank(tmp_path, monkeypatch):
+    quiz_bank = QuizBank(str(tmp_path / "bank.sqlite3"))
+    monkeypatch.setattr(dedupe, "get_quiz_bank", lambda: quiz_bank)
+    monkeypatch.setattr(dedupe, "_bank_index", None)
+    monkeypatch.setattr(dedupe, "_bank_index_last_id", 0)
+    monkeypatch.setattr(dedupe, "_bank_sources", {})
+    return quiz_bank
+
+
+def test_bank_duplicates_warn_or_drop(bank):
+    bank.save("old-source", [ORIGINAL], "raw", 1, 20, "보통", "중학교 1학년")
+    items = [make_item(1, PARAPHRASE["Question Text"]), make_item(2, OTHER["Question Text"], correct=1)]
+    assert len(remove_duplicate_questions([dict(item) for item in items])) == 2
+    kept = remove_duplicate_questions([dict(item) for item in items], drop_bank_duplicates=True)
+    assert [item["Question Text"] for item in kept] == [OTHER["Question Text"]]
+    assert kept[0]["Question #"] == 1
+    # 같은 소스로 다시 만든 경우 보관함 퀴즈와 비교하지 않음
+    assert len(remove_duplicate_questions([dict(item) for item in items], True, text_hash="old-source")) == 2
@@ -0,0 +1,50 @@
+import csv
+import io
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+from quizgen.export import (XLSX_SHEET_NAME, build_base_filename, build_quiz_bundle, convert_to_blooket_csv,
+                            convert_to_blooket_xlsx, get_export)
+from quizgen.parser import BLOOKET_COLUMNS
+
+ITEMS = [
+    dict(zip(BLOOKET_COLUMNS, (1, '쉼표, "따옴표"가 있는 질문', "보기1", "보기2", "보기3", "보기4", 20, 2))),
+    dict(zip(BLOOKET_COLUMNS, (2, "줄바꿈이\n있는 질문", "a", "b", "c", "d", 30, 4))),
+]
+
+
+def test_csv_matches_previous_pandas_output():
+    pd = pytest.importorskip("pandas")
+    expected = io.StringIO()
+    pd.DataFrame(ITEMS, columns=BLOOKET_COLUMNS).to_csv(expected, index=False, encoding="utf-8-sig")
+    assert convert_to_blooket_csv(ITEMS) == expected.getvalue()
+    assert convert_to_blooket_csv([]) is None
+
+
+def test_xlsx_round_trips_rows():
+    workbook = load_workbook(io.BytesIO(convert_to_blooket_xlsx(ITEMS)))
+    rows = list(workbook[XLSX_SHEET_NAME].iter_rows(values_only=True))
+    assert list(rows[0]) == BLOOKET_COLUMNS
+    assert [list(row) for row in rows[1:]] == [[item[column] for column in BLOOKET_COLUMNS] for item in ITEMS]
+
+
+def test_get_export_reuses_cached_bytes():
+    first = get_export(ITEMS, "xlsx")
+    assert get_export([dict(item) for item in ITEMS], "xlsx") is first
+    assert get_export(ITEMS, "csv") == convert_to_blooket_csv(ITEMS)
+    assert get_export([], "csv") is None
+
+
+def test_bundle_writes_each_quiz_with_unique_names():
+    quizzes = iter([("quiz", ITEMS), ("quiz", ITEMS[:1]), ("empty", [])])
+    with zipfile.ZipFile(io.BytesIO(build_quiz_bundle(quizzes))) as bundle:
+        assert sorted(bundle.namelist()) == ["quiz.csv", "quiz.xlsx", "quiz_2.csv", "quiz_2.xlsx"]
+        text = bundle.read("quiz_2.csv").decode("utf-8-sig")
+    assert list(csv.reader(io.StringIO(text))) == [BLOOKET_COLUMNS, [str(value) for value in ITEMS[0].values()]]
+
+
+def test_base_filename():
+    assert build_base_filename("bio quiz!", 5, "쉬움", "중학교 1학년") == "bioquiz_5q_쉬움_중학교_1학년"
+    assert build_base_filename("quiz", 3, "선택 안 함", "전체 (선택 안 함)") == "quiz_3q"
@@ -0,0 +1,80 @@
+import logging
+import threading
+
+from fixtures import FakeModel
+
+from quizgen.jobs import CANCELLED, DONE, FAILED, JobManager, generate_quiz_job, get_job_manager
+from quizgen.pipeline import build_options
+
+TEXT = "\n\n".join(f"문단 {i}: " + "광합성 엽록체 포도당 " * 40 for i in range(6))
+
+
+def wait(manager, job_id):
+    job = manager.get(job_id)
+    job._future.result(timeout=30)
+    return job
+
+
+def test_job_lifecycle():
+    manager = JobManager(max_workers=1)
+
+    def work(job, value):
+        job.report(0.5, "절반")
+        return value * 2
+
+    job = wait(manager, manager.submit(work, 21, label="계산", owner="me"))
+    assert (job.status, job.result, job.progress) == (DONE, 42, 1.0)
+    assert manager.jobs(owner="me") == [job]
+    failed = wait(manager, manager.submit(lambda job: 1 / 0))
+    assert failed.status == FAILED and "division" in failed.error
+
+
+def test_cancel_queued_job():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    blocker = manager.submit(lambda job: release.wait(10))
+    queued = manager.submit(lambda job: "실행되면 안 됨")
+    assert manager.cancel(queued)
+    assert manager.get(queued).status == CANCELLED
+    release.set()
+    assert wait(manager, blocker).status == DONE
+    assert manager.get(queued).result is None
+
+
+class CancellingModel(FakeModel):
+    """첫 호출에서 모든 작업의 취소를 요청하고, 형식이 잘못된 블록만 돌려주는 모델 (보충 단계가 필요해짐)."""
+
+    def __init__(self, manager):
+        super().__init__(latency=0, malformed_ratio=1.0)
+        self.manager = manager
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        for job in self.manager.jobs():
+            self.manager.cancel(job.id)
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+def test_cancel_stops_single_source_generation_before_top_up():
+    manager = JobManager(max_workers=1)
+    model = CancellingModel(manager)
+    options = build_options(5, chunked=False, preprocess=False)
+    job = wait(manager, manager.submit(generate_quiz_job, model, TEXT, options))
+    assert job.status == CANCELLED
+    assert model.calls == 1
+
+
+class WarningModel(FakeModel):
+    def generate_content(self, prompt, stream=False, **kwargs):
+        logging.getLogger("quizgen.tests").warning(f"구간 경고 {threading.current_thread().name}")
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+def test_chunk_worker_warnings_reach_job_log():
+    get_job_manager() # 작업 로그 처리기 설치
+    manager = JobManager(max_workers=1)
+    options = build_options(4, chunked=True, chunk_token_budget=200, model_workers=2, preprocess=False,
+                            top_up=False, dedupe=False)
+    job = wait(manager, manager.submit(generate_quiz_job, WarningModel(latency=0), TEXT, options))
+    assert job.status == DONE
+    worker_warnings = [w for w in job.warnings if w.startswith("구간 경고") and "quizgen-job" not in w]
+    assert len(worker_warnings) >= 2
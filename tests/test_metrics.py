@@ -0,0 +1,75 @@
+import io
+import logging
+
+import pytest
+from fixtures import make_pdf, make_pdf_pages
+
+from quizgen.extractors import extract_text_from_pdf
+from quizgen.metrics import get_metrics, instrumented, track
+from quizgen.pdf_pages import source_size
+
+
+@pytest.fixture
+def metrics():
+    registry = get_metrics()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def test_instrumented_records_input_size_and_output(metrics):
+    @instrumented("test.stage", input_text=lambda text: text, input_size=lambda text: len(text.encode("utf-8")))
+    def upper(text):
+        return text.upper()
+
+    upper("가나다 abc")
+    stats = metrics.snapshot()["stages"]["test.stage"]
+    assert stats["count"] == 1 and stats["failures"] == 0
+    assert stats["input_chars"] == 7
+    assert stats["input_bytes"] == len("가나다 abc".encode("utf-8"))
+    assert stats["output_size"] == 7
+
+
+def test_empty_result_uses_logged_warning_as_failure_reason(metrics):
+    @instrumented("test.empty")
+    def empty():
+        logging.getLogger("quizgen.test").warning("추출할 텍스트가 없습니다.")
+        return ""
+
+    empty()
+    stats = metrics.snapshot()["stages"]["test.empty"]
+    assert stats["failures"] == 1
+    assert stats["failure_reasons"] == {"추출할 텍스트가 없습니다.": 1}
+
+
+def test_exception_is_recorded_and_reraised(metrics):
+    with pytest.raises(ValueError):
+        with track("test.error"):
+            raise ValueError("boom")
+    assert metrics.snapshot()["stages"]["test.error"]["failure_reasons"] == {"ValueError: boom": 1}
+
+
+def test_source_size_accepts_every_pdf_input(tmp_path):
+    data = make_pdf(make_pdf_pages(2))
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    assert source_size(str(path)) == len(data)
+    assert source_size(path) == len(data)
+    assert source_size(data) == len(data)
+    assert source_size(io.BytesIO(data)) == len(data)
+    assert source_size(str(tmp_path / "missing.pdf")) is None
+
+
+def test_pdf_extraction_records_input_bytes(metrics):
+    data = make_pdf(make_pdf_pages(3))
+    assert extract_text_from_pdf(io.BytesIO(data))
+    stats = metrics.snapshot()["stages"]["extract.pdf"]
+    assert stats["input_bytes"] == len(data)
+    assert f'quizgen_stage_input_bytes_total{{stage="extract.pdf"}} {len(data)}' in metrics.render_prometheus()
+
+
+def test_counters_in_snapshot_and_prometheus(metrics):
+    metrics.increment("cache.hit")
+    metrics.increment("cache.hit", 2)
+    assert metrics.snapshot()["counters"] == {"cache.hit": 3}
+    assert 'quizgen_events_total{name="cache.hit"} 3' in metrics.render_prometheus()
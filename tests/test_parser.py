@@ -0,0 +1,62 @@
+import pytest
+
+from quizgen.parser import BLOOKET_COLUMNS, format_diagnostic, iter_blocks, parse_block, parse_response
+
+EXPECTED = dict(zip(BLOOKET_COLUMNS, (1, "광합성이 일어나는 곳은?", "미토콘드리아", "엽록체", "핵", "리보솜", 20, 2)))
+
+CANONICAL = """질문: 광합성이 일어나는 곳은?
+보기1: 미토콘드리아
+보기2: 엽록체
+보기3: 핵
+보기4: 리보솜
+정답번호: 2
+시간제한: 20
+"""
+
+
+@pytest.mark.parametrize("block", [
+    CANONICAL,
+    # 영문 항목명
+    "Question: 광합성이 일어나는 곳은?\nOption 1: 미토콘드리아\nOption 2: 엽록체\nOption 3: 핵\nOption 4: 리보솜\n"
+    "Correct Answer: 2\nTime Limit: 20\n",
+    # 전각 콜론, 마크다운 강조
+    "**질문**：광합성이 일어나는 곳은?\n**보기1**：미토콘드리아\n**보기2**：엽록체\n**보기3**：핵\n**보기4**：리보솜\n"
+    "**정답번호**：2\n",
+    # 콜론 누락, 알파벳 보기/정답
+    "질문 광합성이 일어나는 곳은?\nAnswer A: 미토콘드리아\nAnswer B: 엽록체\nAnswer C: 핵\nAnswer D: 리보솜\nAnswer B\n",
+    # 값이 다음 줄에 오는 경우
+    "질문:\n광합성이 일어나는 곳은?\n보기1: 미토콘드리아\n보기2: 엽록체\n보기3: 핵\n보기4: 리보솜\n정답: ②\n",
+])
+def test_parse_block_tolerates_drift(block):
+    item, reason = parse_block(block, 1, 20)
+    assert reason is None
+    assert item == EXPECTED
+
+
+@pytest.mark.parametrize("block, reason", [
+    ("질문: Q?\n보기1: a\n보기2: b\n보기3: c\n정답번호: 1\n", "필수 항목 누락: 보기4"),
+    ("질문: Q?\n보기1: a\n보기2: b\n보기3: c\n보기4: d\n", "정답번호 누락"),
+    ("질문: Q?\n보기1: a\n보기2: b\n보기3: c\n보기4: d\n정답번호: 없음\n", "정답번호 오류: 없음"),
+])
+def test_parse_block_reports_reason(block, reason):
+    assert parse_block(block, 1, 20) == (None, reason)
+
+
+def test_iter_blocks_tolerates_marker_drift():
+    text = "머리말 [질문 시작]A[질문 끝] 사이 [Question Start]B[질문시작]C"
+    assert list(iter_blocks(text)) == ["A", "B", "C"]
+
+
+def test_parse_response_numbers_valid_items_and_collects_diagnostics():
+    broken = "질문: 빠진 보기\n보기1: a\n정답번호: 1\n"
+    text = f"[질문시작]\n{CANONICAL}[질문끝]\n---\n[질문시작]\n{broken}[질문끝]\n[질문시작]\n{CANONICAL}"
+    result = parse_response(text, 30)
+    assert result.blocks_seen == 3
+    assert [item["Question #"] for item in result.items] == [1, 2]
+    assert [d["block_index"] for d in result.diagnostics] == [1]
+    assert "필수 항목 누락" in format_diagnostic(result.diagnostics[0])
+
+
+def test_parse_response_empty():
+    assert not parse_response("", 20).ok
+    assert not parse_response("형식이 없는 응답", 20).ok
@@ -0,0 +1,44 @@
+import io
+
+import pytest
+from fixtures import make_pdf
+
+from quizgen.pdf_pages import iter_pdf_pages, normalize_page_ranges, parse_page_ranges, resolve_pages
+
+PAGES = [f"Page {i} text about cells" if i != 3 else "" for i in range(1, 7)]  # 3페이지는 텍스트 없음
+
+
+def test_parse_page_ranges():
+    assert parse_page_ranges("") is None
+    assert parse_page_ranges("1-3, 5, 8-") == [(1, 3), (5, 5), (8, None)]
+    assert parse_page_ranges("2~4") == [(2, 4)]
+    assert parse_page_ranges("-3") == [(1, 3)]
+    for spec in ("a", "3-1", "0", "-"):
+        with pytest.raises(ValueError):
+            parse_page_ranges(spec)
+
+
+def test_normalize_and_resolve():
+    assert normalize_page_ranges("5, 1-2") == normalize_page_ranges(" 1-2,5 ") == "1-2,5-5"
+    assert normalize_page_ranges(None) == ""
+    assert resolve_pages(parse_page_ranges("2-3, 3, 9-"), 10) == [1, 2, 8, 9]
+    assert resolve_pages(parse_page_ranges("20-"), 10) == []
+    assert resolve_pages(None, 3) == [0, 1, 2]
+
+
+def test_iter_pages_skips_empty_pages_and_reports_progress():
+    progress = []
+    pages = list(iter_pdf_pages(make_pdf(PAGES), "2-4", on_progress=lambda done, total: progress.append((done, total))))
+    assert [number for number, _ in pages] == [2, 4]
+    assert "Page 4" in pages[1][1]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_parallel_extraction_matches_sequential(tmp_path):
+    data = make_pdf(PAGES)
+    sequential = list(iter_pdf_pages(io.BytesIO(data)))
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    assert list(iter_pdf_pages(str(path), workers=2, parallel_threshold=1, batch_size=2)) == sequential
+    # 업로드(파일 객체)는 임시 파일로 한 번 기록한 뒤 작업 프로세스에 넘김
+    assert list(iter_pdf_pages(io.BytesIO(data), workers=2, parallel_threshold=1, batch_size=2)) == sequential
@@ -0,0 +1,76 @@
+import json
+import os
+import zipfile
+
+from fixtures import FakeModel, make_pdf, make_pdf_pages
+
+from quizgen.cli import main
+from quizgen.pipeline import build_options, collect_sources, generate_for_source, load_manifest, run_batch
+
+
+def write_pdfs(directory, count):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, f"book{i}.pdf"), "wb") as f:
+            f.write(make_pdf(make_pdf_pages(2, lines_per_page=10, seed=i)))
+
+
+def test_collect_sources_classifies_and_deduplicates(tmp_path):
+    write_pdfs(str(tmp_path / "pdfs" / "sub"), 1)
+    urls = tmp_path / "urls.txt"
+    urls.write_text("# 주석\nhttps://youtu.be/dQw4w9WgXcQ\n\nhttps://example.com/a\nhttps://youtu.be/dQw4w9WgXcQ\n",
+                    encoding="utf-8")
+    sources = collect_sources(pdf_dir=str(tmp_path / "pdfs"), urls_file=str(urls))
+    assert [source["kind"] for source in sources] == ["pdf", "youtube", "web"]
+    assert sources[1]["id"] == "youtube:dQw4w9WgXcQ"
+
+
+def test_load_manifest_skips_truncated_line(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(json.dumps({"id": "a", "status": "failed"}) + "\n" + json.dumps({"id": "a", "status": "done"})
+                    + "\n{\"id\": \"b\", \"sta", encoding="utf-8")
+    assert load_manifest(str(path)) == {"a": {"id": "a", "status": "done"}}
+    assert load_manifest(str(tmp_path / "missing.jsonl")) == {}
+
+
+def test_run_batch_writes_outputs_and_resumes(tmp_path):
+    pdf_dir = str(tmp_path / "pdfs")
+    write_pdfs(pdf_dir, 3)
+    with open(os.path.join(pdf_dir, "broken.pdf"), "wb") as f:
+        f.write(b"not a pdf")
+    sources = collect_sources(pdf_dir=pdf_dir)
+    out_dir = str(tmp_path / "out")
+    model = FakeModel(latency=0)
+
+    summary = run_batch(model, sources, out_dir, num_questions=3, formats=["csv"],
+                        bundle_path=str(tmp_path / "quizzes.zip"))
+    assert (summary["done"], summary["failed"], summary["skipped"]) == (3, 1, 0)
+    records = load_manifest(os.path.join(out_dir, "manifest.jsonl"))
+    done = [record for record in records.values() if record["status"] == "done"]
+    assert all(record["questions"] == 3 and record["outputs"] for record in done)
+    with zipfile.ZipFile(str(tmp_path / "quizzes.zip")) as bundle:
+        assert len(bundle.namelist()) == 3
+    assert os.path.exists(summary["metrics_path"])
+
+    calls = model.calls
+    summary = run_batch(model, sources, out_dir, num_questions=3, formats=["csv"])
+    assert (summary["done"], summary["failed"], summary["skipped"]) == (0, 1, 3)
+    assert model.calls == calls
+
+
+def test_generate_for_source_streams_single_call_content():
+    text = " ".join(make_pdf_pages(1, lines_per_page=10))
+    options = build_options(num_questions=3, preprocess=False, top_up=False)
+    seen = []
+
+    raw_output, parsed = generate_for_source(FakeModel(latency=0), text, options,
+                                             on_item=lambda item, quiz_items: seen.append(item))
+    assert raw_output and len(parsed.items) == 3
+    assert [item["Question #"] for item in seen] == [1, 2, 3]
+
+
+def test_cli_rejects_missing_inputs(tmp_path, capsys):
+    assert main(["--out-dir", str(tmp_path), "--api-key", "x"]) == 2
+    assert main(["--out-dir", str(tmp_path), "--pdf-dir", str(tmp_path), "--api-key", "x", "--pdf-pages", "3-1"]) == 2
+    assert main(["--out-dir", str(tmp_path), "--pdf-dir", str(tmp_path), "--api-key", "x"]) == 1
+    assert "페이지 범위" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+import random
+
+from fixtures import KOREAN_WORDS, make_pdf_pages, sentence
+
+from quizgen.chunking import estimate_tokens
+from quizgen.preprocess import (find_near_duplicates, preprocess_context, remove_boilerplate_lines, remove_filler,
+                                select_passages, split_passages)
+
+
+def test_keeps_headings_and_lone_numbers():
+    text = "Chapter 1\n도입\nChapter 2\n전개\nChapter 3\n정리\n1945\n제1장\n제2장\n제3장"
+    assert remove_boilerplate_lines(text) == (text, 0)
+
+
+def test_keeps_unordered_number_lines():
+    text = "표 1\n34\n7\n1945\n12"
+    assert remove_boilerplate_lines(text) == (text, 0)
+
+
+def test_removes_page_numbers_headers_and_page_markers():
+    pages = ["교과서 머리말\n본문 A\n- 12 -", "교과서 머리말\n본문 B\n- 13 -", "교과서 머리말\n본문 C\n- 14 -",
+             "3장 - 15쪽\n본문 D\n3장 - 16쪽\n본문 E\n3장 - 17쪽"]
+    text, removed = remove_boilerplate_lines("\n".join(pages))
+    assert text == "본문 A\n본문 B\n본문 C\n본문 D\n본문 E"
+    assert removed == 9
+
+
+def test_pdf_fixture_boilerplate_is_removed():
+    text, removed = remove_boilerplate_lines("\n".join(make_pdf_pages(5, lines_per_page=3)))
+    assert removed == 10
+    assert "Biology Textbook" not in text and "- 3 -" not in text
+
+
+def test_remove_filler():
+    assert remove_filler("[음악] 오늘은  음음 광합성을 um 배웁니다") == " 오늘은 광합성을 배웁니다"
+    assert remove_filler("광합성은 어~ 빛을 어 어 이용합니다") == "광합성은 빛을 이용합니다"
+
+
+def test_remove_filler_keeps_single_syllable_words():
+    text = "그 결과 조선은 그 당시 개항을 했다. 음 그러니까 어 이건 아 그렇구나"
+    assert remove_filler(text) == text
+
+
+def test_near_duplicates_and_selection():
+    rng = random.Random(1)
+    passage = " ".join(sentence(rng, KOREAN_WORDS, 10) for _ in range(8))
+    other = " ".join(sentence(rng, KOREAN_WORDS, 10) for _ in range(8))
+    passages = [passage, passage[:-1] + " 추가.", passage + "!!", other]
+    assert find_near_duplicates(passages) == {1, 2}
+    assert select_passages(passages, None) == [0, 1, 2, 3]
+    assert len(select_passages(passages, estimate_tokens(passage) * 2 + 10)) == 2
+
+
+def test_preprocess_report_and_budget():
+    text = "\n\n".join(f"문단 {i}: " + " ".join(f"단어{i}_{j}" for j in range(40)) for i in range(30))
+    result, report = preprocess_context(text, token_budget=500)
+    assert report["final_tokens"] <= 500
+    assert report["saved_tokens"] == report["original_tokens"] - report["final_tokens"] > 0
+    assert report["dropped_passages"] > 0
+    assert split_passages(result)
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from quizgen.parser import BLOOKET_COLUMNS
+from quizgen.quiz_bank import QuizBank, main, source_hash
+
+
+def make_items(*questions):
+    return [dict(zip(BLOOKET_COLUMNS, (i, q, "a", "b", "c", "d", 20, 1))) for i, q in enumerate(questions, start=1)]
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuizBank(str(tmp_path / "bank.sqlite3"))
+
+
+def save(bank, text, questions, grade="중학교 1학년", difficulty="쉬움", raw="raw"):
+    return bank.save(source_hash(text), make_items(*questions), raw, len(questions), 20, difficulty, grade,
+                     source_kind="text", title=f"quiz_{text}", options={"chunked": True})
+
+
+def test_save_is_idempotent_and_round_trips(bank):
+    quiz_id = save(bank, "광합성", ["광합성이 일어나는 곳은?"])
+    assert save(bank, "광합성", ["광합성이 일어나는 곳은?"]) == quiz_id
+    assert save(bank, "광합성", ["다른 응답"], raw="raw2") != quiz_id
+    quiz = bank.get(quiz_id)
+    assert quiz["items"] == make_items("광합성이 일어나는 곳은?")
+    assert quiz["options"] == {"chunked": True}
+    assert bank.stats() == {"quizzes": 2, "questions": 2}
+    assert bank.get(999) is None
+
+
+def test_search_by_question_text_and_filters(bank):
+    photosynthesis = save(bank, "광합성", ["엽록체에서 일어나는 반응은?"])
+    time.sleep(0.01)
+    cells = save(bank, "세포", ["세포막의 역할은?"], grade="고등학교 1학년", difficulty="어려움")
+    assert [quiz["id"] for quiz in bank.search()] == [cells, photosynthesis]
+    assert [quiz["id"] for quiz in bank.search("엽록체")] == [photosynthesis]
+    assert [quiz["id"] for quiz in bank.search("세포")] == [cells]  # trigram 보다 짧은 검색어
+    assert [quiz["id"] for quiz in bank.search(grade_level="고등학교 1학년")] == [cells]
+    assert [quiz["id"] for quiz in bank.search(source_hash=source_hash("광합성"))] == [photosynthesis]
+    assert bank.search("없는 질문입니다") == []
+    assert "items" not in bank.search()[0]
+
+    bank.delete(cells)
+    assert bank.search("세포") == [] and bank.get(cells) is None
+
+
+def test_iter_quiz_items_pages_through_all_quizzes(bank):
+    ids = [save(bank, str(i), [f"질문 {i}"]) for i in range(5)]
+    assert [quiz_id for quiz_id, _, _ in bank.iter_quiz_items(page_size=2)] == ids
+    assert [quiz_id for quiz_id, _, _ in bank.iter_quiz_items(after_id=ids[2])] == ids[3:]
+
+
+def test_cli_search_and_export(bank, tmp_path, capsys):
+    quiz_id = save(bank, "광합성", ["엽록체에서 일어나는 반응은?"])
+    assert main(["search", "엽록체", "--path", bank.path]) == 0
+    assert "quiz_광합성 (1문항, 중학교 1학년, 쉬움)" in capsys.readouterr().out
+    output = tmp_path / "out.csv"
+    assert main(["export", str(quiz_id), "--path", bank.path, "--output", str(output)]) == 0
+    assert "엽록체에서 일어나는 반응은?" in output.read_text(encoding="utf-8-sig")
+    assert main(["export", "999", "--path", bank.path]) == 1
@@ -0,0 +1,63 @@
+import time
+
+from fixtures import FakeModel
+
+from quizgen.response_cache import CachedModel, ResponseCache, main, response_cache_key
+
+PROMPT = "다음 내용으로 객관식 퀴즈 3개를 만들어 주세요."
+
+
+def make_cache(**kwargs):
+    return ResponseCache(":memory:", **kwargs)
+
+
+def test_key_depends_on_prompt_and_model():
+    assert response_cache_key(PROMPT, "a") == response_cache_key(PROMPT, "a")
+    assert response_cache_key(PROMPT, "a") != response_cache_key(PROMPT, "b")
+    assert response_cache_key(PROMPT, "a") != response_cache_key(PROMPT + " ", "a")
+
+
+def test_replay_returns_identical_response_without_calling_model():
+    model = FakeModel(latency=0)
+    cache = make_cache()
+    cached = CachedModel(model, cache)
+    first = cached.generate_content(PROMPT).text
+    assert cached.generate_content(PROMPT).text == first
+    assert model.calls == 1 and (cached.hits, cached.misses) == (1, 1)
+
+    refreshed = CachedModel(model, cache, refresh=True)
+    refreshed.generate_content(PROMPT)
+    assert model.calls == 2
+
+
+def test_streamed_response_is_stored_only_when_complete():
+    model = FakeModel(latency=0)
+    cache = make_cache()
+    cached = CachedModel(model, cache)
+    stream = cached.generate_content(PROMPT, stream=True)
+    next(iter(stream))
+    assert cache.stats()["entries"] == 0  # 중간에 멈춘 스트림은 저장하지 않음
+
+    text = "".join(chunk.text for chunk in cached.generate_content(PROMPT, stream=True))
+    assert [chunk.text for chunk in cached.generate_content(PROMPT, stream=True)] == [text]
+    assert model.calls == 2
+
+
+def test_ttl_and_size_limit():
+    cache = make_cache(ttl=0.01, max_bytes=0)
+    cache.put("k", "m", "응답")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+    cache = make_cache(ttl=0, max_bytes=10)
+    cache.put("old", "m", "x" * 6)
+    cache.put("new", "m", "y" * 6)
+    assert cache.get("old") is None and cache.get("new") == "y" * 6
+
+
+def test_reparse_command(tmp_path, capsys):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path)
+    cache.put("k", "fake-model", FakeModel(latency=0).build_response(2))
+    assert main(["reparse", "--path", path]) == 0
+    assert "합계: 문항 2개, 건너뛴 블록 0개" in capsys.readouterr().out
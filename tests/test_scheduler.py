@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+from fixtures import FakeModel, FakeResponse
+from google.api_core import exceptions as google_exceptions
+
+from quizgen.scheduler import ModelScheduler, TokenBucket
+
+
+class FlakyModel(FakeModel):
+    """처음 failures 번은 429 를 올리는 모델."""
+
+    def __init__(self, failures, error=google_exceptions.TooManyRequests("quota")):
+        super().__init__(latency=0)
+        self.failures = failures
+        self.error = error
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+class SlowModel(FakeModel):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.release = threading.Event()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        return FakeResponse(f"응답: {prompt}")
+
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault("requests_per_minute", 0)
+    kwargs.setdefault("tokens_per_minute", 0)
+    return ModelScheduler(base_delay=0.001, max_delay=0.002, **kwargs)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(600)  # 0.1초에 1개
+    bucket.acquire(600)  # 1분치를 모두 사용
+    assert bucket.acquire(1) >= 0.05
+    assert TokenBucket(0).acquire(10 ** 6) == 0.0
+
+
+def test_retries_transient_errors():
+    scheduler = make_scheduler(max_retries=3)
+    model = FlakyModel(failures=2)
+    assert scheduler.bind(model).generate_content("객관식 퀴즈 1개").text
+    assert scheduler.stats_snapshot()["retries"] == 2
+
+
+def test_gives_up_after_max_retries_and_does_not_retry_other_errors():
+    scheduler = make_scheduler(max_retries=1)
+    with pytest.raises(google_exceptions.TooManyRequests):
+        scheduler.bind(FlakyModel(failures=5)).generate_content("prompt")
+    model = FlakyModel(failures=1, error=ValueError("bad request"))
+    with pytest.raises(ValueError):
+        scheduler.bind(model).generate_content("prompt")
+    assert scheduler.stats_snapshot()["failed"] == 2
+    assert scheduler.stats_snapshot()["retries"] == 1
+
+
+def test_identical_concurrent_requests_share_one_call():
+    scheduler = make_scheduler()
+    model = SlowModel()
+    scheduled = scheduler.bind(model)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scheduled.generate_content("같은 프롬프트").text))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while scheduler.stats_snapshot()["coalesced"] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert scheduler.queue_depth == 4
+    model.release.set()
+    for thread in threads:
+        thread.join()
+    assert model.calls == 1
+    assert results == ["응답: 같은 프롬프트"] * 4
+    assert scheduler.queue_depth == 0
+
+
+def test_streaming_retries_only_before_first_chunk():
+    scheduler = make_scheduler(max_retries=2)
+    chunks = list(scheduler.bind(FlakyModel(failures=1)).generate_content("객관식 퀴즈 2개", stream=True))
+    assert "".join(chunk.text for chunk in chunks).count("[질문시작]") == 2
@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+from bench_startup import HEAVY_MODULES, QUIZGEN_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_quizgen_defers_heavy_libraries():
+    modules = list(QUIZGEN_MODULES) + ["quizgen.pipeline", "quizgen.jobs", "quizgen.cli", "quizgen.transcripts"]
+    script = (
+        "import importlib, json, sys\n"
+        f"for name in {modules!r}:\n"
+        "    importlib.import_module(name)\n"
+        f"print(json.dumps([name for name in {list(HEAVY_MODULES)!r} if name in sys.modules]))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == []
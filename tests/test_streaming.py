@@ -0,0 +1,115 @@
+import pytest
+
+from quizgen.generation import generate_quiz_streaming
+from quizgen.parser import iter_blocks, parse_response
+from quizgen.streaming import IncrementalBlockParser, iter_stream_blocks
+
+CANONICAL = """[질문시작]
+질문: 광합성이 일어나는 곳은?
+보기1: 미토콘드리아
+보기2: 엽록체
+보기3: 핵
+보기4: 리보솜
+정답번호: 2
+시간제한: 20
+[질문끝]
+---
+"""
+
+# 공백이 들어간 표식, 영문 표식, 마지막 [질문끝] 누락
+DRIFTED = """다음은 퀴즈입니다.
+[질문 시작]
+질문: 광합성에 필요한 기체는?
+보기1: 산소
+보기2: 질소
+보기3: 이산화탄소
+보기4: 수소
+정답번호: 3
+[질문 끝]
+---
+[Question Start]
+Question: 엽록체에 있는 색소는?
+Option 1: 헤모글로빈
+Option 2: 엽록소
+Option 3: 멜라닌
+Option 4: 케라틴
+Correct Answer: 2
+"""
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StreamingModel:
+    """응답을 chunk_size 글자씩 나누어 스트리밍하는 대체 모델."""
+
+    def __init__(self, response_text, chunk_size):
+        self.response_text = response_text
+        self.chunk_size = chunk_size
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        text = self.response_text
+        return [_Chunk(text[i:i + self.chunk_size]) for i in range(0, len(text), self.chunk_size)]
+
+
+def split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("text", [CANONICAL * 3, DRIFTED, CANONICAL + DRIFTED, "[질문시작] a [질문시작] b [질문끝] c"])
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 50, 10000])
+def test_stream_blocks_match_iter_blocks(text, size):
+    assert list(iter_stream_blocks(split(text, size))) == list(iter_blocks(text))
+
+
+def test_pending_text_is_unclosed_block():
+    parser = IncrementalBlockParser()
+    assert parser.feed("[질문시작]\n질문: 끊긴") == []
+    assert parser.pending_text == "\n질문: 끊긴"
+    assert parser.close() == ["\n질문: 끊긴"]
+    assert parser.pending_text == ""
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_streaming_drifted_response_matches_full_parser(size):
+    expected = parse_response(DRIFTED, 20).items
+    assert len(expected) == 2
+    raw, items = generate_quiz_streaming(StreamingModel(DRIFTED, size), "내용", 2, 20, "선택 안 함", "전체 (선택 안 함)")
+    assert raw == DRIFTED
+    assert items == expected
+
+
+def test_streaming_reports_items_as_they_close():
+    seen = []
+    generate_quiz_streaming(StreamingModel(CANONICAL * 3, 16), "내용", 3, 20, "선택 안 함", "전체 (선택 안 함)",
+                            on_item=lambda item, items: seen.append(len(items)))
+    assert seen == [1, 2, 3]
+
+
+class InterruptedModel(StreamingModel):
+    """응답 앞부분만 보낸 뒤 연결이 끊기는 대체 모델."""
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        def chunks():
+            yield from super(InterruptedModel, self).generate_content(prompt, stream=stream)
+            raise ConnectionError("stream reset")
+        return chunks()
+
+
+def test_interrupted_stream_keeps_completed_items():
+    partial = CANONICAL * 2 + "[질문시작]\n질문: 끊긴"
+    raw, items = generate_quiz_streaming(InterruptedModel(partial, 16), "내용", 3, 20, "선택 안 함", "전체 (선택 안 함)")
+    assert raw == partial
+    assert [item["Question #"] for item in items] == [1, 2]
+    assert generate_quiz_streaming(InterruptedModel("", 16), "내용", 3, 20, "선택 안 함", "전체 (선택 안 함)") == (None, [])
+
+
+def test_on_item_errors_propagate():
+    def on_item(item, items):
+        raise RuntimeError("preview failed")
+
+    with pytest.raises(RuntimeError, match="preview failed"):
+        generate_quiz_streaming(StreamingModel(CANONICAL * 2, 16), "내용", 2, 20, "선택 안 함", "전체 (선택 안 함)",
+                                on_item=on_item)
@@ -0,0 +1,76 @@
+from fixtures import FakeModel
+
+from quizgen.chunking import estimate_tokens, select_top_up_context, split_into_chunks
+from quizgen.generation import build_context_section, top_up_quiz
+from quizgen.parser import BLOOKET_COLUMNS
+
+TOPICS = ("alpha", "bravo", "charlie")
+CONTEXT = "\n\n".join(" ".join(f"{topic}{i} {topic} lesson" for i in range(60)) for topic in TOPICS)
+BUDGET = max(estimate_tokens(paragraph) for paragraph in CONTEXT.split("\n\n")) + 10
+
+
+class RecordingModel(FakeModel):
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, **kwargs)
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+class DuplicateModel(RecordingModel):
+    """기존 문항과 같은 문항만 돌려주는 모델."""
+
+    def __init__(self, response_text):
+        super().__init__()
+        self.response_text = response_text
+
+    def build_response(self, num_questions):
+        self.calls += 1
+        return self.response_text
+
+
+def make_item(number, question, answers=("a1", "a2", "a3", "a4"), correct=1):
+    return dict(zip(BLOOKET_COLUMNS, (number, question, *answers, 20, correct)))
+
+
+def test_chunks_fit_budget():
+    chunks = split_into_chunks(CONTEXT, BUDGET)
+    assert len(chunks) == 3
+    assert all(estimate_tokens(chunk) <= BUDGET for chunk in chunks)
+
+
+def test_select_top_up_context_prefers_uncovered_chunk():
+    chunks = split_into_chunks(CONTEXT, BUDGET)
+    covered = ["alpha lesson alpha3 에 대한 질문", "bravo lesson bravo7 에 대한 질문"]
+    assert select_top_up_context(chunks, covered, 3, BUDGET) == chunks[2]
+
+
+def test_top_up_sends_only_a_budget_sized_chunk():
+    chunks = split_into_chunks(CONTEXT, BUDGET)
+    model = RecordingModel()
+    existing = [make_item(1, "alpha lesson alpha3 은?"), make_item(2, "bravo lesson bravo7 은?", ("b1", "b2", "b3", "b4"))]
+    items, raw_outputs = top_up_quiz(model, CONTEXT, existing, 3, 20, "선택 안 함", "전체 (선택 안 함)",
+                                     chunks=chunks, chunk_token_budget=BUDGET)
+    assert len(items) == 3 and len(raw_outputs) == 1
+    assert [item["Question #"] for item in items] == [1, 2, 3]
+    assert model.prompts[0].endswith(build_context_section(chunks[2]))
+    assert CONTEXT not in model.prompts[0]
+
+
+def test_top_up_without_chunks_uses_whole_context():
+    model = RecordingModel()
+    items, _ = top_up_quiz(model, CONTEXT, [], 2, 20, "선택 안 함", "전체 (선택 안 함)")
+    assert len(items) == 2
+    assert model.prompts[0].endswith(build_context_section(CONTEXT))
+
+
+def test_top_up_stops_when_round_adds_nothing():
+    existing = [make_item(1, "광합성이 일어나는 세포 기관은 무엇인가요?", ("미토콘드리아", "엽록체", "핵", "리보솜"), 2)]
+    duplicate = ("[질문시작]\n질문: 광합성이 일어나는 세포 기관은 무엇인가요?\n보기1: 미토콘드리아\n보기2: 엽록체\n"
+                 "보기3: 핵\n보기4: 리보솜\n정답번호: 2\n[질문끝]\n")
+    model = DuplicateModel(duplicate)
+    items, raw_outputs = top_up_quiz(model, "내용", existing, 3, 20, "선택 안 함", "전체 (선택 안 함)", max_rounds=3)
+    assert len(items) == 1
+    assert model.calls == 1 and raw_outputs == [duplicate]
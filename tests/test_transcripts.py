@@ -0,0 +1,58 @@
+from fixtures import FakeTranscriptProvider, fake_transcripts
+
+from quizgen.cache import TwoTierCache
+from quizgen.extractors import extract_text_from_youtube_videos
+from quizgen.transcripts import choose_transcript, fetch_transcript, fetch_transcripts, format_timestamp, segments_to_text
+
+SEGMENTS = [{"text": f"문장 {i}", "start": i * 50.0, "duration": 5.0} for i in range(6)]
+VIDEO_IDS = [f"video{i:06d}" for i in range(6)]  # 11자리 비디오 ID
+
+
+def listing(*entries):
+    return [{"language_code": code, "language": code, "is_generated": generated} for code, generated in entries]
+
+
+def test_choose_transcript_prefers_manual_then_generated_then_first():
+    assert choose_transcript(listing(("en", True), ("ko", False)))["language_code"] == "ko"
+    assert choose_transcript(listing(("ja", False), ("en", True)))["language_code"] == "en"
+    assert choose_transcript(listing(("ja", False), ("fr", False)))["language_code"] == "ja"
+    assert choose_transcript([]) is None
+
+
+def test_fetch_caches_listing_and_segments():
+    provider = FakeTranscriptProvider(default=SEGMENTS, language_code="ja")
+    cache = TwoTierCache()
+    first = fetch_transcript("abc", provider, cache)
+    assert first["segments"] == SEGMENTS and first["fallback"] and first["error"] is None
+    assert fetch_transcript("abc", provider, cache) == first
+    assert (provider.list_calls, provider.fetch_calls) == (1, 1)
+
+
+def test_failures_are_reported_per_video():
+    provider = FakeTranscriptProvider(transcripts={"ok": SEGMENTS, "empty": None}, failing={"broken"})
+    results = fetch_transcripts(["ok", "broken", "empty", "ok"], provider=provider, cache=TwoTierCache())
+    assert [result["video_id"] for result in results] == ["ok", "broken", "empty"]
+    assert results[0]["error"] is None
+    assert results[1]["error"] and results[2]["error"] == "사용 가능한 스크립트가 전혀 없습니다."
+
+
+def test_fetch_transcripts_runs_concurrently():
+    provider = FakeTranscriptProvider(default=SEGMENTS, latency=0.05)
+    fetch_transcripts(VIDEO_IDS, max_workers=3, provider=provider, cache=TwoTierCache())
+    assert provider.max_in_flight == 3
+
+
+def test_segments_to_text_groups_by_window():
+    assert format_timestamp(3725) == "1:02:05"
+    assert segments_to_text(SEGMENTS[:2]) == "문장 0 문장 1"
+    assert segments_to_text(SEGMENTS, window_seconds=120) == "[0:00] 문장 0 문장 1 문장 2\n\n[2:30] 문장 3 문장 4 문장 5"
+
+
+def test_multi_video_extraction_skips_failed_videos():
+    provider = FakeTranscriptProvider(default=SEGMENTS, failing={VIDEO_IDS[1]})
+    urls = [f"https://youtu.be/{video_id}" for video_id in VIDEO_IDS[:2]] + ["https://example.com/not-youtube"]
+    with fake_transcripts(provider=provider):
+        text = extract_text_from_youtube_videos(urls, window_seconds=120)
+        assert text.startswith(f"[출처: {urls[0]}]\n[0:00] 문장 0")
+        assert VIDEO_IDS[1] not in text
+        assert extract_text_from_youtube_videos([urls[1]]) is None
@@ -0,0 +1,75 @@
+import http.server
+import threading
+from contextlib import contextmanager
+
+import pytest
+from fixtures import make_site, serve_site
+
+from quizgen.web_fetch import ResponseTooLargeError, fetch_html, fetch_pages, html_to_text
+
+PAGE = "<html><body><nav>menu links here</nav><article><p>Cells are the basic unit of life.</p><p>Too short</p></article></body></html>"
+
+
+@contextmanager
+def serve_with_etag(body, etag):
+    """ETag 가 같으면 304 를 돌려주는 서버. 요청마다 받은 If-None-Match 를 기록합니다."""
+    requests_seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.end_headers()  # Content-Length 없이 보내 스트리밍 중 크기 제한을 확인
+            self.wfile.write(data)
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/page", requests_seen
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_html_to_text_keeps_body_paragraphs():
+    text, links = html_to_text(PAGE)
+    assert text == "Cells are the basic unit of life."
+    assert links == []
+
+
+def test_conditional_get_reuses_cached_body():
+    with serve_with_etag(PAGE, '"v1"') as (url, requests_seen):
+        assert fetch_html(url) == PAGE
+        assert fetch_html(url) == PAGE
+    assert requests_seen == [None, '"v1"']
+
+
+def test_streamed_body_over_limit_is_rejected():
+    with serve_with_etag(PAGE * 10, '"big"') as (url, _):
+        with pytest.raises(ResponseTooLargeError):
+            fetch_html(url + "?big", max_bytes=100)
+
+
+def test_fetch_pages_follows_same_site_links_within_limits():
+    site = make_site(5, paragraphs_per_page=2)
+    with serve_site(site) as base_url:
+        pages = fetch_pages([base_url], follow_links_depth=1, max_pages=4, max_workers=4)
+        # 메뉴의 "/" 링크는 이미 가져온 페이지라 건너뛰고, 없는 /about 은 오류 결과로 남음
+        assert [page["url"] for page in pages] == [base_url + path for path in ("", "about", "p1", "p2")]
+        assert pages[1]["error"] is not None
+        assert "Lesson 2" in pages[3]["text"]
+
+        pages = fetch_pages([base_url + "p1", base_url + "p1#top", base_url + "missing"])
+        assert len(pages) == 2
+        assert pages[1]["text"] is None and pages[1]["error"] is not None